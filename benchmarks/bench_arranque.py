@@ -0,0 +1,49 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPETICIONES = 7
+ESCENARIOS = (
+    ("sin interfaz", "import proyecto2"),
+    ("interfaz", "import proyecto2; proyecto2.importar_gui()"),
+    ("cli --top", "import sys, proyecto2; sys.argv[1:] = ['--top']; proyecto2.main(sys.argv[1:])"),
+)
+
+def medir_importaciones(codigo):
+    #E: String (código para python -c)
+    #S: Tupla (segundos de reloj, diccionario nombre -> microsegundos acumulados de las importaciones de primer nivel)
+    #R:
+    #F: Ejecuta el código en un intérprete nuevo con -X importtime
+    inicio = time.perf_counter()
+    proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo], cwd=RAIZ,
+                             capture_output=True, text=True, check=True)
+    segundos = time.perf_counter() - inicio
+    tiempos = {}
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, nombre = linea[len("import time:"):].split("|")
+        if not nombre.startswith("  "):
+            tiempos[nombre.strip()] = int(acumulado)
+    return segundos, tiempos
+
+def main():
+    _, base = medir_importaciones("pass")
+    print(f"{'escenario':>14} {'importaciones':>14} {'proceso':>10}  más pesadas")
+    for nombre, codigo in ESCENARIOS:
+        relojes = []
+        totales = []
+        for _ in range(REPETICIONES):
+            segundos, tiempos = medir_importaciones(codigo)
+            propias = {modulo: micros for modulo, micros in tiempos.items() if modulo not in base}
+            relojes.append(segundos)
+            totales.append(sum(propias.values()))
+        pesadas = sorted(propias.items(), key=lambda x: x[1], reverse=True)[:3]
+        detalle = ", ".join(f"{modulo} {micros / 1000:.1f}" for modulo, micros in pesadas)
+        print(f"{nombre:>14} {statistics.median(totales) / 1000:11.1f} ms {statistics.median(relojes) * 1000:7.1f} ms  {detalle}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import proyecto2
+
+TAMANOS = (101, 501, 2001)
+TAMANO_MAX_REFERENCIA = 501
+
+def camino_con_copias(laberinto, inicio, fin):
+    #E: Matriz, tupla, tupla
+    #S: Set de tuplas
+    #R:
+    #F: Versión anterior de obtener_camino_solucion (pop(0) y copia del camino por nodo), solo como referencia
+    filas = len(laberinto)
+    cols = len(laberinto[0])
+    cola = [(inicio, [inicio])]
+    visitados = {inicio}
+    while cola:
+        (fila, columna), camino = cola.pop(0)
+        if (fila, columna) == fin:
+            return set(camino)
+        for delta_fila, delta_columna in proyecto2.DIRECCIONES:
+            nueva_fila, nueva_columna = fila + delta_fila, columna + delta_columna
+            if 0 <= nueva_fila < filas and 0 <= nueva_columna < cols and laberinto[nueva_fila][nueva_columna] != proyecto2.PARED and (nueva_fila, nueva_columna) not in visitados:
+                visitados.add((nueva_fila, nueva_columna))
+                cola.append(((nueva_fila, nueva_columna), camino + [(nueva_fila, nueva_columna)]))
+    return set()
+
+def medir(funcion, *args):
+    #E: Función, argumentos
+    #S: Tupla (segundos, resultado)
+    #R:
+    #F: Mide una llamada con perf_counter
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return time.perf_counter() - inicio, resultado
+
+def main():
+    print(f"{'tamaño':>10} {'largo':>8} {'deque+padres':>14} {'copias (ant.)':>14}")
+    for n in TAMANOS:
+        laberinto = proyecto2.generar_laberinto(n, n, semilla=n)
+        inicio, fin = (1, 1), (n - 2, n - 2)
+        segundos, camino = medir(proyecto2.obtener_camino_solucion, laberinto, inicio, fin)
+        if n <= TAMANO_MAX_REFERENCIA:
+            referencia, camino_ref = medir(camino_con_copias, laberinto, inicio, fin)
+            assert camino_ref == camino
+            texto_ref = f"{referencia:13.3f}s"
+        else:
+            texto_ref = f"{'-':>14}"
+        print(f"{n:>5}x{n:<4} {len(camino):>8} {segundos:13.3f}s {texto_ref}")
+
+if __name__ == "__main__":
+    main()
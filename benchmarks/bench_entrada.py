@@ -0,0 +1,130 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import proyecto2
+
+#(lado del tablero, ms extra por redibujado para simular una máquina lenta)
+ESCENARIOS = ((21, 0), (201, 0), (21, 40))
+DURACION = 5.0
+REPETICION_MS = 33
+RAFAGA = 10
+TECLAS = ("d", "s", "a", "w")
+
+class Evento:
+    #E: String, Int (instante previsto de la pulsación en ns)
+    #S:
+    #R:
+    #F: Evento de teclado sintético con el instante en que el sistema lo habría entregado
+    def __init__(self, keysym, instante):
+        self.keysym = keysym
+        self.instante = instante
+
+class Medida:
+    #E:
+    #S:
+    #R: Mezclar antes de AplicacionJuego
+    #F: Cuenta redibujados y pasos, y reinicia la partida al terminar, sin diálogos, overlay ni puntajes en disco
+    redibujados = 0
+    pasos = 0
+    costo_extra = 0.0
+
+    def dibujar_mapa(self):
+        self.redibujados += 1
+        super().dibujar_mapa()
+        if self.costo_extra:
+            time.sleep(self.costo_extra)
+
+    def aplicar_entrada(self):
+        self.pasos += 1
+        super().aplicar_entrada()
+
+    def actualizar_overlay(self):
+        pass
+
+    def guardar_puntaje(self, evento):
+        pass
+
+    def procesar_eventos(self):
+        self.estado.tomar_eventos()
+        if self.estado.resultado is not None:
+            self.iniciar_modo(self.estado.modo)
+
+class AplicacionCola(Medida, proyecto2.AplicacionJuego):
+    #E: Tk root, Enteros
+    #S:
+    #R:
+    #F: Entrada encolada y aplicada una vez por paso lógico (comportamiento actual)
+    def pulsar(self, evento):
+        self.cola_entrada.reloj = lambda: evento.instante
+        self.al_presionar_tecla(evento)
+
+class AplicacionInmediata(Medida, proyecto2.AplicacionJuego):
+    #E: Tk root, Enteros
+    #S:
+    #R:
+    #F: Manejo anterior, solo como referencia: cada evento de teclado mueve y redibuja en el momento
+    def pulsar(self, evento):
+        if not self.jugando:
+            return
+        tecla = evento.keysym.lower()
+        if tecla in proyecto2.MOVIMIENTOS:
+            self.estado.aplicar_accion(tecla)
+            self.procesar_eventos()
+            self.dibujar_mapa()
+            self.actualizar_etiquetas_ui()
+            self.perfil.registrar("entrada", time.perf_counter_ns() - evento.instante)
+
+def correr(clase, n, extra_ms):
+    #E: Clase de aplicación, Int (lado del tablero), Int (ms extra por redibujado)
+    #S: Diccionario con pulsaciones, redibujados por segundo, pasos lógicos por segundo y latencias en ms
+    #R: Requiere una pantalla para Tk
+    #F: Mantiene teclas apretadas con autorepetición cada REPETICION_MS durante DURACION segundos
+    root = proyecto2.tk.Tk()
+    app = clase(root, n, n)
+    app.perfil = proyecto2.PerfilTick()
+    app.nombre_jugador = "bench"
+    app.costo_extra = extra_ms / 1000.0
+    app.iniciar_modo("Escapa")
+    periodo = REPETICION_MS * 1000000
+    inicio = time.perf_counter_ns()
+    pulsaciones = [0]
+
+    def entregar():
+        #Las pulsaciones atrasadas (el loop estuvo ocupado) se entregan juntas, como las encola el sistema
+        ahora = time.perf_counter_ns()
+        while inicio + pulsaciones[0] * periodo <= ahora:
+            k = pulsaciones[0]
+            app.pulsar(Evento(TECLAS[k // RAFAGA % len(TECLAS)], inicio + k * periodo))
+            pulsaciones[0] += 1
+        if ahora - inicio < DURACION * 1e9:
+            root.after(max(1, (inicio + pulsaciones[0] * periodo - ahora) // 1000000), entregar)
+        else:
+            root.quit()
+
+    app.redibujados = 0
+    root.after(0, entregar)
+    root.mainloop()
+    segundos = (time.perf_counter_ns() - inicio) / 1e9
+    entrada = app.perfil.resumen().get("entrada", {})
+    datos = {"pulsaciones": pulsaciones[0], "redibujados_s": app.redibujados / segundos, "pasos_s": app.pasos / segundos,
+             "unidas": app.cola_entrada.unidas, "p50_ms": entrada.get("p50_ms", 0.0), "p95_ms": entrada.get("p95_ms", 0.0),
+             "max_ms": entrada.get("max_ms", 0.0)}
+    app.pool_tableros.cerrar()
+    root.destroy()
+    return datos
+
+def main():
+    proyecto2.importar_gui()
+    proyecto2.GRABAR_PARTIDAS = False
+    print(f"{'tamaño':>10} {'extra':>6} {'manejo':>10} {'pulsac.':>8} {'unidas':>7} {'redib./s':>9} {'pasos/s':>8} {'p50':>8} {'p95':>8} {'máx':>8}")
+    for n, extra_ms in ESCENARIOS:
+        for nombre, clase in (("inmediato", AplicacionInmediata), ("cola", AplicacionCola)):
+            d = correr(clase, n, extra_ms)
+            print(f"{n:>5}x{n:<4} {extra_ms:>3} ms {nombre:>10} {d['pulsaciones']:>8} {d['unidas']:>7} {d['redibujados_s']:9.1f} {d['pasos_s']:8.1f}"
+                  f" {d['p50_ms']:5.1f} ms {d['p95_ms']:5.1f} ms {d['max_ms']:5.1f} ms")
+
+if __name__ == "__main__":
+    main()
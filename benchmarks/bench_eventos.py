@@ -0,0 +1,97 @@
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import proyecto2
+
+EVENTOS_POR_LOTE = 20000
+REPETICIONES = 7
+TIPOS = (proyecto2.EVENTO_CAZA, proyecto2.EVENTO_TRAMPA, proyecto2.EVENTO_ESCAPE, proyecto2.EVENTO_AVISO)
+
+def lista_anterior(n):
+    #E: Int
+    #S: Float (segundos)
+    #R:
+    #F: Mecanismo anterior, solo como referencia: tuplas (titulo, texto, modal) en una lista que la interfaz vaciaba
+    eventos = []
+    inicio = time.perf_counter()
+    for i in range(n):
+        eventos.append(("Cazador", "Cazaste a un enemigo! +50 pts", True))
+        if i % 8 == 7:
+            for titulo, texto, modal in eventos:
+                pass
+            eventos = []
+    return time.perf_counter() - inicio
+
+def con_bus(n, preparar):
+    #E: Int, función(BusEventos)
+    #S: Float (segundos)
+    #R:
+    #F: Publica n eventos y despacha cada 8, como un cuadro con varios eventos
+    bus = proyecto2.BusEventos()
+    preparar(bus)
+    inicio = time.perf_counter()
+    for i in range(n):
+        bus.publicar(proyecto2.EventoJuego(TIPOS[i & 3], i, "Cazaste a un enemigo! +50 pts", 50, i))
+        if i % 8 == 7:
+            bus.despachar()
+    bus.despachar()
+    return time.perf_counter() - inicio
+
+def escenarios(ruta_registro):
+    #E: String
+    #S: Lista de tuplas (nombre, función(n) -> segundos)
+    #R:
+    #F: Mecanismo anterior y bus con cero, uno y tres suscriptores (avisos, puntajes y registro en disco)
+    avisos = deque(maxlen=proyecto2.MAX_AVISOS)
+
+    def sin_suscriptores(bus):
+        pass
+
+    def solo_avisos(bus):
+        bus.suscribir(lambda evento: avisos.append((evento.texto, None)))
+
+    def completo(bus):
+        solo_avisos(bus)
+        bus.suscribir(lambda evento: None, proyecto2.EVENTOS_FIN)
+        bus.suscribir(proyecto2.RegistroEventos(ruta_registro).escribir)
+
+    return [("lista anterior", lista_anterior),
+            ("bus sin suscriptores", lambda n: con_bus(n, sin_suscriptores)),
+            ("bus + avisos", lambda n: con_bus(n, solo_avisos)),
+            ("bus + avisos, puntajes, registro", lambda n: con_bus(n, completo))]
+
+def en_partida(n, enemigos, ticks):
+    #E: Int (lado), Int, Int
+    #S: Tupla (eventos, ticks hechos, resumen de "despacho" o None)
+    #R:
+    #F: Partida Cazador con muchos enemigos y jugador al azar; mide cada entrega con el perfil del bus
+    bus = proyecto2.BusEventos()
+    bus.perfil = proyecto2.PerfilTick()
+    bus.suscribir(lambda evento: None)
+    estado = proyecto2.EstadoJuego("Cazador", semilla=n, num_enemigos=enemigos, filas=n, columnas=n, bus=bus)
+    rng = random.Random(n)
+    eventos = 0
+    while estado.jugando and estado.tick < ticks:
+        eventos += len(estado.paso((rng.choice("wasd"),)))
+    return eventos, estado.tick, bus.perfil.resumen().get("despacho")
+
+def main():
+    with tempfile.TemporaryDirectory() as carpeta:
+        print(f"{'mecanismo':>34} {'ns/evento':>10}")
+        for nombre, funcion in escenarios(os.path.join(carpeta, "eventos.jsonl")):
+            tiempos = [funcion(EVENTOS_POR_LOTE) for _ in range(REPETICIONES)]
+            print(f"{nombre:>34} {statistics.median(tiempos) / EVENTOS_POR_LOTE * 1e9:10.0f}")
+    eventos, ticks, despacho = en_partida(201, 2000, 3000)
+    print(f"\nCazador 201x201, 2000 enemigos: {eventos} eventos en {ticks} ticks")
+    if despacho:
+        print(f"despacho por evento: p50 {despacho['p50_ms'] * 1e6:.0f} ns, p99 {despacho['p99_ms'] * 1e6:.0f} ns, máx {despacho['max_ms'] * 1e6:.0f} ns")
+
+if __name__ == "__main__":
+    main()
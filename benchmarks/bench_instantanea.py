@@ -0,0 +1,126 @@
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import proyecto2
+
+TAMANOS = (101, 501, 1001, 2001)
+REPETICIONES = 5
+TICKS_ANTES = 600
+TICKS_DESPUES = 600
+ACCIONES = ("w", "a", "s", "d", "w", "a", "s", "d", "trampa", "correr")
+
+def jugar(estado, rng, ticks):
+    #E: EstadoJuego, Random, Int
+    #S:
+    #R:
+    #F: Jugador al azar que también pone trampas y alterna correr
+    for _ in range(ticks):
+        if not estado.jugando:
+            break
+        estado.paso((rng.choice(ACCIONES),))
+
+def huella(estado):
+    #E: EstadoJuego
+    #S: Tupla comparable
+    #R:
+    #F: Todo lo que debe sobrevivir a guardar y cargar
+    return (estado.modo, estado.nombre_jugador, estado.semilla, estado.tick, estado.turnos, estado.tiempo, estado.puntaje,
+            estado.energia, estado.corriendo, estado.jugando, estado.resultado, estado.pos_jugador.fila, estado.pos_jugador.columna,
+            estado.tiempo_ultima_trampa if estado.tiempo - estado.tiempo_ultima_trampa < proyecto2.TIEMPO_RECARGA_TRAMPA else None,
+            estado.rng.getstate(), b"".join(estado.mapa),
+            [(e.id_enemigo, e.posicion.fila, e.posicion.columna, e.muerto, e.tiempo_muerte) for e in estado.enemigos],
+            [(t.posicion.fila, t.posicion.columna, t.activa, t.tiempo_colocacion) for t in estado.trampas],
+            sorted((p.fila, p.columna, sorted(e.id_enemigo for e in lista)) for p, lista in estado.enemigos_por_celda.items()),
+            sorted((p.fila, p.columna, len(lista)) for p, lista in estado.trampas_por_celda.items()),
+            sorted((t0, estado.trampas.index(t)) for t0, _, t in estado.expiracion_trampas))
+
+def verificar(modo, n, carpeta):
+    #E: String, Int (lado del tablero), String (carpeta temporal)
+    #S: Int (tiros de trampa durante la prueba)
+    #R:
+    #F: Ida y vuelta: la partida cargada es igual a la guardada, guardarla de nuevo da los mismos bytes y, con las mismas
+    #   acciones, sigue exactamente igual que la original
+    ruta = os.path.join(carpeta, f"{modo}_{n}.p2s")
+    original = proyecto2.EstadoJuego(modo, nombre_jugador="bench ñ", semilla=n, filas=n, columnas=n, num_enemigos=n // 5)
+    jugar(original, random.Random(n), TICKS_ANTES)
+    proyecto2.guardar_partida(original, ruta)
+    cargada = proyecto2.cargar_partida(ruta)
+    assert huella(cargada) == huella(original), f"{modo} {n}: la partida cargada no coincide"
+    with open(ruta, "rb") as f:
+        bytes_original = f.read()
+    proyecto2.guardar_partida(cargada, ruta + ".2")
+    with open(ruta + ".2", "rb") as f:
+        assert f.read() == bytes_original, f"{modo} {n}: guardar la partida cargada cambia el archivo"
+    for estado in (original, cargada):
+        jugar(estado, random.Random(-n), TICKS_DESPUES)
+    assert huella(cargada) == huella(original), f"{modo} {n}: la partida retomada diverge"
+    return len(original.trampas)
+
+def guardar_json(estado, ruta):
+    #E: EstadoJuego, String
+    #S:
+    #R:
+    #F: Base de comparación: el mismo contenido como JSON, con el mapa como lista de listas
+    datos = {"modo": estado.modo, "jugador": estado.nombre_jugador, "semilla": estado.semilla, "tick": estado.tick,
+             "turnos": estado.turnos, "puntaje": estado.puntaje, "energia": estado.energia, "corriendo": estado.corriendo,
+             "jugador_pos": [estado.pos_jugador.fila, estado.pos_jugador.columna], "ultima_trampa": estado.tiempo_ultima_trampa,
+             "rng": list(estado.rng.getstate()[1]), "mapa": [list(fila) for fila in estado.mapa],
+             "enemigos": [[e.id_enemigo, e.posicion.fila, e.posicion.columna, e.muerto, e.tiempo_muerte] for e in estado.enemigos],
+             "trampas": [[t.posicion.fila, t.posicion.columna, t.activa, t.tiempo_colocacion] for t in estado.trampas]}
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(datos, f)
+
+def cargar_json(ruta):
+    #E: String
+    #S: Lista de filas bytearray
+    #R:
+    #F: Base de comparación: parsea el JSON y reconstruye las filas del mapa (el resto del estado es despreciable)
+    with open(ruta, "r", encoding="utf-8") as f:
+        datos = json.load(f)
+    return [bytearray(fila) for fila in datos["mapa"]]
+
+def mediana(funcion):
+    #E: Función sin argumentos
+    #S: Float (segundos)
+    #R:
+    #F: Mediana de REPETICIONES llamadas
+    tiempos = []
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos)
+
+def main():
+    with tempfile.TemporaryDirectory() as carpeta:
+        for modo in ("Escapa", "Cazador"):
+            for n in (21, 101):
+                trampas = verificar(modo, n, carpeta)
+                print(f"ida y vuelta {modo} {n}x{n}: ok ({trampas} trampas en juego)")
+        print(f"\n{'tamaño':>10} {'binario':>10} {'guardar':>10} {'cargar':>10} {'1er turno':>10} {'json':>10} {'guardar':>10} {'cargar':>10}")
+        for n in TAMANOS:
+            estado = proyecto2.EstadoJuego("Escapa", nombre_jugador="bench", semilla=n, filas=n, columnas=n)
+            jugar(estado, random.Random(n), 60)
+            binario = os.path.join(carpeta, f"bench_{n}.p2s")
+            texto = os.path.join(carpeta, f"bench_{n}.json")
+            guardar_bin = mediana(lambda: proyecto2.guardar_partida(estado, binario))
+            cargar_bin = mediana(lambda: proyecto2.cargar_partida(binario))
+            cargada = proyecto2.cargar_partida(binario)
+            inicio = time.perf_counter()
+            while cargada.turnos == estado.turnos:
+                cargada.paso(("d",))
+            primer_turno = time.perf_counter() - inicio
+            guardar_texto = mediana(lambda: guardar_json(estado, texto))
+            cargar_texto = mediana(lambda: cargar_json(texto))
+            print(f"{n:>5}x{n:<4} {os.path.getsize(binario) / 1e6:7.2f} MB {guardar_bin * 1e3:7.2f} ms {cargar_bin * 1e3:7.2f} ms"
+                  f" {primer_turno * 1e3:7.1f} ms {os.path.getsize(texto) / 1e6:7.2f} MB {guardar_texto * 1e3:7.1f} ms {cargar_texto * 1e3:7.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import proyecto2
+
+TAMANOS = (101, 501, 1001, 2001)
+PASOS = 2000
+PASOS_RECALCULO = 20
+
+def paseo_jugador(mapa, pasos, semilla):
+    #E: Matriz, Int, Int
+    #S: Lista de Posicion
+    #R:
+    #F: Paseo al azar del jugador por celdas CAMINO/TUNEL (sin retroceder salvo en callejones), como lo recorrería al jugar
+    rng = random.Random(semilla)
+    filas, columnas = len(mapa), len(mapa[0])
+    actual, previa = (1, 1), None
+    recorrido = []
+    for _ in range(pasos):
+        opciones = [(actual[0] + df, actual[1] + dc) for df, dc in proyecto2.DIRECCIONES
+                    if 0 <= actual[0] + df < filas and 0 <= actual[1] + dc < columnas
+                    and mapa[actual[0] + df][actual[1] + dc] in (proyecto2.CAMINO, proyecto2.TUNEL)]
+        adelante = [celda for celda in opciones if celda != previa] or opciones
+        actual, previa = rng.choice(adelante), actual
+        recorrido.append(proyecto2.Posicion(*actual))
+    return recorrido
+
+def medir(mapa, recorrido):
+    #E: Matriz, lista de Posicion
+    #S: Tupla (segundos por paso incremental, segundos por recálculo, celdas recorridas por BFS por paso)
+    #R:
+    #F: Mide mover_raiz paso a paso contra recalcular el campo desde cero, y verifica que ambos coincidan
+    n = len(mapa[0])
+    campo = proyecto2.CampoPersecucion(mapa, proyecto2.Posicion(1, 1))
+    reparadas = campo.celdas_reparadas
+    inicio = time.perf_counter()
+    for pos in recorrido:
+        campo.mover_raiz(pos)
+    incremental = (time.perf_counter() - inicio) / len(recorrido)
+    reparadas = (campo.celdas_reparadas - reparadas) / len(recorrido)
+
+    #Recalcular desde cero en cada paso: BFS de todas las componentes que toca el jugador
+    otro = proyecto2.CampoPersecucion(mapa, proyecto2.Posicion(1, 1))
+    inicio = time.perf_counter()
+    for pos in recorrido[:PASOS_RECALCULO]:
+        otro.enraizar(pos.fila * n + pos.columna)
+    recalculo = (time.perf_counter() - inicio) / PASOS_RECALCULO
+
+    completo = proyecto2.CampoPersecucion(mapa, recorrido[-1])
+    for fila in range(1, len(mapa) - 1, max(1, n // 50)):
+        for columna in range(1, n - 1, max(1, n // 50)):
+            assert campo.paso(proyecto2.Posicion(fila, columna)) == completo.paso(proyecto2.Posicion(fila, columna))
+    return incremental, recalculo, reparadas
+
+def main():
+    print(f"{'tamaño':>10} {'tablero':>12} {'incremental':>14} {'recálculo':>14} {'mejora':>9} {'celdas BFS/paso':>16}")
+    for n in TAMANOS:
+        escapa = proyecto2.preparar_tablero("Escapa", n, None, n, n)["mapa"]
+        liso = proyecto2.generar_laberinto(n, n, semilla=n)
+        for nombre, mapa in (("Escapa", escapa), ("sin túneles", liso)):
+            incremental, recalculo, reparadas = medir(mapa, paseo_jugador(mapa, PASOS, n))
+            print(f"{n:>5}x{n:<4} {nombre:>12} {incremental * 1e6:11.1f} µs {recalculo * 1e3:11.2f} ms {recalculo / incremental:8.0f}x {reparadas:16.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import proyecto2
+
+ETAPAS = (25, 50, 100, 200, 400, 800, 1600)
+ACCIONES_POR_SEGUNDO = 8
+CALENTAMIENTO = 1.0
+DURACION_ETAPA = 5.0
+ACCIONES = ("w", "a", "s", "d", "w", "a", "s", "d", "trampa", "correr")
+
+class Cliente:
+    #E: Int (índice; negativo = conexión de control sin partida)
+    #S:
+    #R:
+    #F: Una sesión de carga: juega al azar, empieza otra partida al terminar y cuenta lo recibido sin parsear los deltas
+    def __init__(self, indice):
+        self.indice = indice
+        self.rng = random.Random(indice)
+        self.bytes = 0
+        self.mensajes = 0
+        self.tamano_inicio = 0
+        self.partidas = 0
+        self.respuestas = asyncio.Queue()
+        self.tareas = []
+
+    async def conectar(self, puerto):
+        #E: Int
+        #S:
+        #R:
+        #F: Abre la conexión y, salvo el control, pide una partida y empieza a jugar
+        self.lector, self.escritor = await asyncio.open_connection("127.0.0.1", puerto, limit=2 ** 22)
+        self.tareas.append(asyncio.create_task(self.leer()))
+        if self.indice >= 0:
+            self.nueva()
+            self.tareas.append(asyncio.create_task(self.jugar()))
+
+    def enviar(self, mensaje):
+        self.escritor.write((json.dumps(mensaje) + "\n").encode("utf-8"))
+
+    def nueva(self):
+        self.enviar({"tipo": "nueva", "modo": proyecto2.MODOS_PARTIDA[self.indice % 2], "nombre": f"carga{self.indice}"})
+
+    async def leer(self):
+        #E:
+        #S:
+        #R:
+        #F: Solo se parsean el mapa inicial y las estadísticas; de los deltas basta saber si la partida terminó
+        while True:
+            linea = await self.lector.readline()
+            if not linea:
+                return
+            self.bytes += len(linea)
+            self.mensajes += 1
+            if linea.startswith(b'{"tipo":"delta"'):
+                if b'"fin":' in linea:
+                    self.partidas += 1
+                    self.nueva()
+            elif linea.startswith(b'{"tipo":"inicio"'):
+                self.tamano_inicio = len(linea)
+            else:
+                self.respuestas.put_nowait(json.loads(linea))
+
+    async def jugar(self):
+        #E:
+        #S:
+        #R:
+        #F: Acciones al azar a ACCIONES_POR_SEGUNDO en promedio
+        while True:
+            await asyncio.sleep(self.rng.expovariate(ACCIONES_POR_SEGUNDO))
+            self.enviar({"tipo": "accion", "accion": self.rng.choice(ACCIONES)})
+
+    async def estadisticas(self, reiniciar=False):
+        #E: Bool
+        #S: Diccionario
+        #R: Solo en la conexión de control
+        #F: Pide las estadísticas del servidor (y opcionalmente las reinicia)
+        self.enviar({"tipo": "estadisticas", "reiniciar": reiniciar})
+        return await self.respuestas.get()
+
+    def cerrar(self):
+        for tarea in self.tareas:
+            tarea.cancel()
+        self.escritor.close()
+
+def fase(datos, nombre, clave):
+    #E: Diccionario de estadísticas, Strings
+    #S: Float (ms)
+    #R:
+    #F: Percentil de una fase del perfil del servidor, 0 si no hubo muestras
+    return datos["fases"].get(nombre, {}).get(clave, 0.0)
+
+async def principal(etapas, duracion):
+    #E: Lista de Int (sesiones por etapa), Float
+    #S:
+    #R:
+    #F: Levanta el servidor en otro proceso sobre loopback y sube la cantidad de sesiones hasta que deja de sostener el paso fijo
+    tps = proyecto2.TICKS_LOGICOS_POR_SEGUNDO
+    with tempfile.TemporaryDirectory() as carpeta:
+        proceso = await asyncio.create_subprocess_exec(sys.executable, os.path.join(RAIZ, "proyecto2.py"), "--servidor", "0",
+                                                       stdout=asyncio.subprocess.PIPE, cwd=carpeta)
+        puerto = int((await proceso.stdout.readline()).rsplit(b":", 1)[1])
+        control = Cliente(-1)
+        await control.conectar(puerto)
+        clientes = []
+        mejor = None
+        print(f"{'sesiones':>8} {'cpu':>6} {'ses/núcleo':>10} {'ticks/s':>8} {'tick p50':>9} {'tick p99':>9} {'retraso p99':>11}"
+              f" {'entrada p99':>11} {'delta/ses':>10} {'mapa/ses':>10}")
+        try:
+            for n in etapas:
+                while len(clientes) < n:
+                    cliente = Cliente(len(clientes))
+                    await cliente.conectar(puerto)
+                    clientes.append(cliente)
+                await asyncio.sleep(CALENTAMIENTO)
+                await control.estadisticas(reiniciar=True)
+                recibidos = sum(c.bytes for c in clientes)
+                await asyncio.sleep(duracion)
+                datos = await control.estadisticas()
+                segundos = datos["segundos"]
+                por_sesion = (sum(c.bytes for c in clientes) - recibidos) / segundos / n
+                mapa = max(c.tamano_inicio for c in clientes) * tps
+                ticks = datos["ticks"] / segundos
+                por_nucleo = n / datos["cpu"] if datos["cpu"] > 0 else 0.0
+                sostenido = ticks >= 0.95 * tps and datos["descartados"] == 0
+                print(f"{n:>8} {100 * datos['cpu']:5.0f}% {por_nucleo:10.0f} {ticks:8.1f} {fase(datos, 'tick', 'p50_ms'):6.2f} ms"
+                      f" {fase(datos, 'tick', 'p99_ms'):6.2f} ms {fase(datos, 'retraso', 'p99_ms'):8.2f} ms"
+                      f" {fase(datos, 'entrada', 'p99_ms'):8.2f} ms {por_sesion / 1000:6.2f} kB/s {mapa / 1000:6.1f} kB/s"
+                      f"{'' if sostenido else '  (no sostiene el paso fijo)'}", flush=True)
+                if not sostenido:
+                    break
+                mejor = (n, por_nucleo)
+        finally:
+            for cliente in clientes + [control]:
+                cliente.cerrar()
+            #Como Ctrl+C: el servidor cierra el pool de tableros y sus procesos
+            proceso.send_signal(signal.SIGINT)
+            try:
+                await asyncio.wait_for(proceso.wait(), 10)
+            except asyncio.TimeoutError:
+                proceso.kill()
+                await proceso.wait()
+    if mejor:
+        print(f"\nMáximo sostenido: {mejor[0]} sesiones a {tps} ticks/s (~{mejor[1]:.0f} sesiones por núcleo del servidor)")
+    print("Nota: el cliente de carga corre en la misma máquina y compite por la CPU con el servidor")
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del modo servidor sobre loopback")
+    parser.add_argument("--etapas", default=",".join(map(str, ETAPAS)), help="sesiones por etapa, separadas por coma")
+    parser.add_argument("--duracion", type=float, default=DURACION_ETAPA, help="segundos medidos por etapa")
+    args = parser.parse_args()
+    asyncio.run(principal([int(n) for n in args.etapas.split(",")], args.duracion))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import argparse
+import copy
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import proyecto2
+
+VERSION_RESULTADOS = 1
+TAMANOS = (21, 101, 501, 1001, 2001)
+TICKS_POR_MODO = 20000
+PRESUPUESTO_TICKS = 0.5
+TIEMPO_MINIMO = 0.25
+MAX_REPETICIONES = 200
+UMBRAL_REGRESION = 0.10
+ARCHIVO_RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados.json")
+TECLAS = ("w", "a", "s", "d")
+
+def repeticiones_para(n):
+    #E: Int (lado del tablero)
+    #S: Int
+    #R:
+    #F: Repeticiones mínimas; menos en tableros grandes para que la suite termine en minutos
+    if n <= 101:
+        return 7
+    if n <= 501:
+        return 3
+    return 1
+
+def casos_tablero(n):
+    #E: Int (lado del tablero)
+    #S: Lista de tuplas (nombre, preparar() -> argumentos, función)
+    #R:
+    #F: Casos de la suite para un tamaño; la semilla es el propio tamaño para que los resultados sean comparables
+    mapa = proyecto2.generar_laberinto(n, n, semilla=n)
+    especial = [bytearray(fila) for fila in mapa]
+    proyecto2.distribuir_celdas_especiales(especial, "Escapa", frac_tunel=0.03, frac_liana=0.04, rng=random.Random(n))
+    inicio, fin = (1, 1), (n - 2, n - 2)
+    especial[inicio[0]][inicio[1]] = especial[fin[0]][fin[1]] = proyecto2.CAMINO
+    #El campo se mide sobre el laberinto sin túneles para que la BFS recorra todo el tablero
+    estado = proyecto2.EstadoJuego("Cazador", semilla=n, tablero={"modo": "Cazador", "semilla": n, "mapa": mapa, "spawns": []})
+    campo = proyecto2.calcular_campo_distancias(mapa, fin, (proyecto2.CAMINO, proyecto2.LIANA))
+    celdas = [p for p in (proyecto2.Posicion(f, c) for f in range(1, n - 1, 2) for c in range(1, n - 1, 2)) if campo[p.fila * n + p.columna] >= 0]
+
+    def pasos_campo(posiciones):
+        for pos in posiciones:
+            estado.siguiente_paso_campo(pos, campo)
+
+    return [
+        ("generar_laberinto_dfs", lambda: (), lambda: proyecto2.generar_laberinto(n, n, algoritmo="dfs", semilla=n)),
+        ("generar_laberinto_kruskal", lambda: (), lambda: proyecto2.generar_laberinto(n, n, algoritmo="kruskal", semilla=n)),
+        ("distribuir_celdas_especiales", lambda: ([bytearray(fila) for fila in mapa],),
+         lambda matriz: proyecto2.distribuir_celdas_especiales(matriz, "Escapa", frac_tunel=0.03, frac_liana=0.04, rng=random.Random(n))),
+        ("obtener_camino_solucion", lambda: (mapa, inicio, fin), proyecto2.obtener_camino_solucion),
+        ("verificar_alcanzabilidad", lambda: (especial, proyecto2.Posicion(*inicio), proyecto2.Posicion(*fin), (proyecto2.CAMINO, proyecto2.TUNEL)),
+         proyecto2.verificar_alcanzabilidad),
+        ("calcular_campo_distancias", lambda: (mapa, fin, (proyecto2.CAMINO, proyecto2.LIANA)), proyecto2.calcular_campo_distancias),
+        ("siguiente_paso_campo", lambda: (celdas[:10000],), pasos_campo),
+    ]
+
+def medir(preparar, funcion, repeticiones):
+    #E: función sin argumentos -> tupla, función, Int
+    #S: Diccionario con segundos (mediana, la métrica que se compara), mínimo, repeticiones y pico de memoria en bytes
+    #R:
+    #F: Cronometra sin tracemalloc (al menos TIEMPO_MINIMO en total) y mide el pico de memoria en una corrida aparte
+    tiempos = []
+    while len(tiempos) < repeticiones or (sum(tiempos) < TIEMPO_MINIMO and len(tiempos) < MAX_REPETICIONES):
+        argumentos = preparar()
+        gc.collect()
+        inicio = time.perf_counter()
+        funcion(*argumentos)
+        tiempos.append(time.perf_counter() - inicio)
+    argumentos = preparar()
+    gc.collect()
+    tracemalloc.start()
+    funcion(*argumentos)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"segundos": statistics.median(tiempos), "minimo": min(tiempos), "repeticiones": len(tiempos), "pico_bytes": pico}
+
+tableros = {}
+
+def tablero_para(modo, semilla, n):
+    #E: String, Int, Int
+    #S: Diccionario de tablero (copia)
+    #R:
+    #F: Prepara cada tablero una sola vez por corrida; las partidas reciben copias de lo que el motor modifica
+    clave = (modo, semilla, n)
+    if clave not in tableros:
+        tableros[clave] = proyecto2.preparar_tablero(modo, semilla, None, n, n)
+    tablero = dict(tableros[clave])
+    tablero["mapa"] = [bytearray(fila) for fila in tablero["mapa"]]
+    tablero.pop("libres")
+    if "persecucion" in tablero:
+        tablero["persecucion"] = copy.deepcopy(tablero["persecucion"])
+    return tablero
+
+def jugar_ticks(modo, n, ticks, rastrear=False):
+    #E: String, Int, Int, Bool
+    #S: Tupla (ticks hechos, segundos dentro del bucle de ticks, pico de memoria o 0)
+    #R:
+    #F: Ejecuta hasta ticks pasos (o PRESUPUESTO_TICKS segundos) con un jugador al azar; si la partida termina sigue con la siguiente semilla
+    rng = random.Random(n)
+    semilla = n
+    hechos = 0
+    segundos = 0.0
+    pico = 0
+    while hechos < ticks and segundos < PRESUPUESTO_TICKS:
+        estado = proyecto2.EstadoJuego(modo, nombre_jugador="bench", tablero=tablero_para(modo, semilla, n))
+        gc.collect()
+        if rastrear:
+            tracemalloc.start()
+        inicio = time.perf_counter()
+        while estado.jugando and hechos < ticks and (hechos & 63 or time.perf_counter() - inicio + segundos < PRESUPUESTO_TICKS):
+            estado.paso((rng.choice(TECLAS),))
+            hechos += 1
+        segundos += time.perf_counter() - inicio
+        if rastrear:
+            pico = max(pico, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        semilla += 1
+    return hechos, segundos, pico
+
+def medir_ticks(modo, n, ticks):
+    #E: String, Int, Int
+    #S: Diccionario con ticks por segundo y pico de memoria en bytes
+    #R:
+    #F: Rendimiento del motor sin interfaz (sin contar la generación de tableros); mediana de cinco corridas
+    tasas = []
+    for _ in range(5):
+        hechos, segundos, _ = jugar_ticks(modo, n, ticks)
+        tasas.append(hechos / segundos)
+    _, _, pico = jugar_ticks(modo, n, min(ticks, 500), rastrear=True)
+    return {"ticks_por_segundo": statistics.median(tasas), "ticks": hechos, "pico_bytes": pico}
+
+def ejecutar(tamanos, ticks, filtro):
+    #E: Lista de enteros, Int, String o None
+    #S: Diccionario de resultados por "caso/tamaño"
+    #R:
+    #F: Corre la suite completa e imprime cada resultado al obtenerlo
+    resultados = {}
+    for n in tamanos:
+        casos = casos_tablero(n)
+        for modo in ("Escapa", "Cazador"):
+            casos.append((f"ticks_{modo.lower()}", None, modo))
+        for nombre, preparar, funcion in casos:
+            if filtro and filtro not in nombre:
+                continue
+            if preparar is None:
+                resultado = medir_ticks(funcion, n, ticks)
+                texto = f"{resultado['ticks_por_segundo']:12.0f} ticks/s"
+            else:
+                resultado = medir(preparar, funcion, repeticiones_para(n))
+                texto = f"{resultado['segundos'] * 1000:12.2f} ms    "
+            clave = f"{nombre}/{n}"
+            resultados[clave] = resultado
+            print(f"{clave:>36} {texto} {resultado['pico_bytes'] / 1e6:10.2f} MB", flush=True)
+    return resultados
+
+def comparar(ruta_base, ruta_nueva, umbral):
+    #E: Strings (rutas JSON), float
+    #S: Int (1 si hay regresiones)
+    #R: Archivos escritos por esta suite
+    #F: Compara dos corridas y marca los casos que empeoran más que el umbral en tiempo, ticks/s o memoria
+    with open(ruta_base, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    with open(ruta_nueva, "r", encoding="utf-8") as f:
+        nueva = json.load(f)
+    if base.get("version") != VERSION_RESULTADOS or nueva.get("version") != VERSION_RESULTADOS:
+        raise ValueError("Versión de resultados no soportada")
+    regresiones = 0
+    print(f"{'caso':>36} {'métrica':>18} {'base':>12} {'nuevo':>12} {'cambio':>8}")
+    for clave in sorted(set(base["resultados"]) & set(nueva["resultados"])):
+        antes = base["resultados"][clave]
+        despues = nueva["resultados"][clave]
+        metricas = (("ticks_por_segundo", True), ("pico_bytes", False)) if "ticks_por_segundo" in antes else (("segundos", False), ("pico_bytes", False))
+        for metrica, mayor_es_mejor in metricas:
+            if not antes.get(metrica) or not despues.get(metrica):
+                continue
+            empeora = antes[metrica] / despues[metrica] - 1 if mayor_es_mejor else despues[metrica] / antes[metrica] - 1
+            marca = ""
+            if empeora > umbral:
+                marca = "REGRESIÓN"
+                regresiones += 1
+            elif empeora < -umbral:
+                marca = "mejora"
+            print(f"{clave:>36} {metrica:>18} {antes[metrica]:12.4g} {despues[metrica]:12.4g} {100 * empeora:+7.1f}% {marca}")
+    faltan = sorted(set(base["resultados"]) ^ set(nueva["resultados"]))
+    if faltan:
+        print(f"Casos presentes en una sola corrida: {', '.join(faltan)}")
+    print(f"{regresiones} regresiones (umbral {100 * umbral:.0f}%)")
+    return 1 if regresiones else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de rendimiento: laberintos, caminos y ticks por segundo")
+    parser.add_argument("--tamanos", default=",".join(map(str, TAMANOS)), help="lados impares separados por coma")
+    parser.add_argument("--ticks", type=int, default=TICKS_POR_MODO, help="máximo de ticks por corrida (cada corrida dura a lo sumo %.1fs)" % PRESUPUESTO_TICKS)
+    parser.add_argument("--casos", default=None, help="solo los casos cuyo nombre contiene este texto")
+    parser.add_argument("--salida", default=ARCHIVO_RESULTADOS, help="archivo JSON de resultados")
+    parser.add_argument("--comparar", nargs=2, metavar=("BASE", "NUEVO"), help="compara dos archivos de resultados")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_REGRESION, help="empeoramiento relativo tolerado (0.10 = 10%%)")
+    args = parser.parse_args()
+    if args.comparar:
+        return comparar(args.comparar[0], args.comparar[1], args.umbral)
+
+    tamanos = [int(t) for t in args.tamanos.split(",")]
+    resultados = ejecutar(tamanos, args.ticks, args.casos)
+    datos = {"version": VERSION_RESULTADOS, "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+             "python": platform.python_version(), "plataforma": platform.platform(),
+             "numpy": proyecto2.usar_numpy(), "resultados": resultados}
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(datos, f, indent=2)
+    print(f"Resultados guardados en {args.salida}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,86 @@
-import tkinter as tk
-from tkinter import simpledialog, messagebox
 import random
 import json
+import os
+import struct
+import sys
 import time
+import threading
+import heapq
+from array import array
+from collections import deque
+from itertools import permutations
+
+#tkinter, numpy, sqlite3 y concurrent.futures se importan al primer uso (ver importar_gui y usar_numpy)
+tk = simpledialog = messagebox = None
+np = None
+numpy_disponible = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
 
 #Configuración básica
 TAMANO_CELDA = 24
 FILAS = 21
 COLUMNAS = 21
+VISTA_FILAS = 21
+VISTA_COLUMNAS = 21
+MARGEN_VISTA = 2
+TAMANO_BLOQUE = 16
 TIEMPO_RECARGA_TRAMPA = 5.0
 MAX_TRAMPAS_ACTIVAS = 3
 TIEMPO_REAPARICION_ENEMIGO = 10.0
 INTERVALO_TICK_MS = 250
+TICKS_LOGICOS_POR_SEGUNDO = 30
+FPS_MAXIMO = 20
+MAX_PASOS_POR_CUADRO = 8
+CAPACIDAD_COLA_ENTRADA = 16
+DURACION_AVISO = 2.5
+MAX_AVISOS = 3
+UMBRAL_MOVIMIENTO_LOTE = 32
+MAX_POSICIONES_INTERNADAS = 1 << 22
+ALGORITMO_LABERINTO = "dfs"
+DURACION_TURNO = INTERVALO_TICK_MS / 1000.0
+DURACION_TICK = 1.0 / TICKS_LOGICOS_POR_SEGUNDO
 ARCHIVO_PUNTAJES = "top_scores.json"
+ARCHIVO_REGISTRO_PUNTAJES = "top_scores.log"
+TOP_PUNTAJES = 5
+COMPACTAR_CADA = 50
+BACKEND_PUNTAJES = os.environ.get("PROYECTO2_PUNTAJES", "registro")
+ARCHIVO_BD_PUNTAJES = "puntajes.sqlite3"
+LOTE_INSERCION = 1
+ESPERA_MAXIMA_LOTE = 2.0
+PERFILAR = os.environ.get("PROYECTO2_PERFIL", "") not in ("", "0")
+ARCHIVO_PERFIL = "perfil_ticks.json"
+CAPACIDAD_PERFIL = 2048
+ARCHIVO_EVENTOS = os.environ.get("PROYECTO2_EVENTOS", "")
+GRABAR_PARTIDAS = False
+DIRECTORIO_REPETICIONES = "repeticiones"
+MAX_REPETICIONES = 20
+VERSION_REPETICION = 2
+ARCHIVO_PARTIDA = "partida_guardada.p2s"
+MAGIA_PARTIDA = b"P2SV"
+VERSION_PARTIDA = 1
+#Cabecera: magia, versión, modo, banderas (jugando, corriendo, hay componentes, es bosque), resultado, filas, columnas, semilla, tick, turnos, puntaje,
+#energía, energía máxima, jugador (fila, columna), recarga de trampa restante, gauss del generador, enemigos, trampas, largo del nombre
+FORMATO_CABECERA_PARTIDA = "<4sHBBBxIIqqqqiiiiddIIH"
+FORMATO_ESTADO_RNG = "<625I"
+#Enemigo: id, fila, columna, muerto, segundos hasta reaparecer (NaN si nunca murió)
+FORMATO_ENEMIGO = "<IiiBd"
+#Trampa: fila, columna, activa, segundos desde que se colocó
+FORMATO_TRAMPA = "<iiBd"
+#Sección opcional tras las casillas (alineada a 4 bytes): etiquetas int32 del campo de persecución, para no recalcularlas
+PARTIDA_JUGANDO = 1
+PARTIDA_CORRIENDO = 2
+PARTIDA_COMPONENTES = 4
+PARTIDA_BOSQUE = 8
+MODOS_PARTIDA = ("Escapa", "Cazador")
+RESULTADOS_PARTIDA = (None, "victoria", "derrota")
+PUERTO_SERVIDOR = 8765
+TABLEROS_SERVIDOR = 16
+LIMITE_BUFFER_SESION = 256 * 1024
 
 #Tipos de casilla
 CAMINO = 0
@@ -20,26 +88,88 @@ PARED = 1
 TUNEL = 2
 LIANA = 3
 
+DIRECCIONES = ((-1, 0), (1, 0), (0, -1), (0, 1))
+MOVIMIENTOS = {
+    'w': (-1, 0), 'up': (-1, 0),
+    's': (1, 0), 'down': (1, 0),
+    'a': (0, -1), 'left': (0, -1),
+    'd': (0, 1), 'right': (0, 1)
+}
+TECLA_CANONICA = {delta: tecla for tecla, delta in MOVIMIENTOS.items() if len(tecla) == 1}
+
+EVENTO_CAZA = "caza"
+EVENTO_TRAMPA = "trampa"
+EVENTO_ESCAPE = "escape"
+EVENTO_VICTORIA = "victoria"
+EVENTO_DERROTA = "derrota"
+EVENTO_AVISO = "aviso"
+EVENTO_CELDA = "celda"
+EVENTOS_FIN = (EVENTO_VICTORIA, EVENTO_DERROTA)
+EVENTOS_AVISO = (EVENTO_CAZA, EVENTO_TRAMPA, EVENTO_ESCAPE, EVENTO_AVISO) + EVENTOS_FIN
+
+def importar_gui():
+    #E:
+    #S:
+    #R: Solo desde la interfaz
+    #F: Importa tkinter y sus diálogos la primera vez que se abre la interfaz
+    global tk, simpledialog, messagebox
+    if tk is None:
+        import tkinter
+        from tkinter import simpledialog as dialogos, messagebox as mensajes
+        tk, simpledialog, messagebox = tkinter, dialogos, mensajes
+
+def usar_numpy():
+    #E:
+    #S: Bool (si numpy está disponible)
+    #R:
+    #F: Importa numpy la primera vez que se necesita; sin numpy se usan los caminos en Python puro
+    global np, numpy_disponible
+    if numpy_disponible is None:
+        try:
+            import numpy
+            np = numpy
+            numpy_disponible = True
+        except ImportError:
+            numpy_disponible = False
+    return numpy_disponible
+
 class Posicion:
     #E: Enteros (fila, columna)
     #S:
-    #R:
-    #F: Representa una coordenada en la matriz
-    def __init__(self, fila, columna):
-        self.fila = fila
-        self.columna = columna
+    #R: Inmutable (las instancias se comparten); columnas entre -1 y 1000000
+    #F: Representa una coordenada en la matriz; Posicion(f, c) devuelve la misma instancia mientras siga en la caché, que se
+    #   vacía al pasar MAX_POSICIONES_INTERNADAS (alcanza para todas las casillas de un tablero de 2001x2001)
+    __slots__ = ("fila", "columna")
+    cache = {}
+
+    def __new__(cls, fila, columna):
+        clave = fila * 2097152 + columna
+        pos = cls.cache.get(clave)
+        if pos is None:
+            if len(cls.cache) >= MAX_POSICIONES_INTERNADAS:
+                cls.cache.clear()
+            pos = object.__new__(cls)
+            pos.fila = fila
+            pos.columna = columna
+            cls.cache[clave] = pos
+        return pos
+
+    def __reduce__(self):
+        return (Posicion, (self.fila, self.columna))
 
     def __eq__(self, other):
-        return isinstance(other, Posicion) and self.fila == other.fila and self.columna == other.columna
+        return self is other or (isinstance(other, Posicion) and self.fila == other.fila and self.columna == other.columna)
 
     def __hash__(self):
-        return hash((self.fila, self.columna))
+        return self.fila * 2097152 + self.columna
 
 class Trampa:
     #E: Posicion, float
     #S:
     #R:
     #F: Representa una trampa colocada por el jugador
+    __slots__ = ("posicion", "tiempo_colocacion", "activa")
+
     def __init__(self, posicion, tiempo_colocacion):
         self.posicion = posicion
         self.tiempo_colocacion = tiempo_colocacion
@@ -50,68 +180,246 @@ class Enemigo:
     #S:
     #R:
     #F: Representa un enemigo en el juego
+    __slots__ = ("id_enemigo", "posicion", "muerto", "tiempo_muerte")
+
     def __init__(self, id_enemigo, posicion):
         self.id_enemigo = id_enemigo
         self.posicion = posicion
         self.muerto = False
         self.tiempo_muerte = None
 
-def generar_laberinto(filas, columnas):
-    #E: Enteros
-    #S: Matriz de enteros
+class EventoJuego:
+    #E: String (EVENTO_*), Int (tick), String, Int (puntos ganados o perdidos), Int (puntaje después del evento),
+    #   Posicion o None (casilla afectada)
+    #S:
+    #R:
+    #F: Algo que pasó en la partida y que la interfaz, los puntajes o el registro pueden querer saber
+    __slots__ = ("tipo", "tick", "texto", "puntos", "total", "posicion")
+
+    def __init__(self, tipo, tick, texto, puntos=0, total=0, posicion=None):
+        self.tipo = tipo
+        self.tick = tick
+        self.texto = texto
+        self.puntos = puntos
+        self.total = total
+        self.posicion = posicion
+
+class BusEventos:
+    #E:
+    #S:
+    #R:
+    #F: Publicación sin bloqueo: el motor solo encola y los suscriptores reciben los eventos cuando la interfaz despacha
+    def __init__(self):
+        self.suscriptores = {}
+        self.pendientes = []
+        self.perfil = None
+
+    def suscribir(self, funcion, tipos=None):
+        #E: función(EventoJuego), tupla de tipos o None (todos)
+        #S:
+        #R:
+        #F: Registra un suscriptor
+        for tipo in tipos or (None,):
+            self.suscriptores.setdefault(tipo, []).append(funcion)
+
+    def publicar(self, evento):
+        #E: EventoJuego
+        #S:
+        #R:
+        #F: Deja el evento pendiente; no llama a nadie
+        self.pendientes.append(evento)
+
+    def despachar(self):
+        #E:
+        #S: Lista de EventoJuego entregados
+        #R:
+        #F: Entrega los pendientes en orden a los suscriptores de su tipo y luego a los de todos; con perfil mide cada entrega
+        pendientes = self.pendientes
+        if not pendientes:
+            return []
+        self.pendientes = []
+        todos = self.suscriptores.get(None, ())
+        perfil = self.perfil
+        for evento in pendientes:
+            inicio = time.perf_counter_ns() if perfil is not None else 0
+            for funcion in self.suscriptores.get(evento.tipo, ()):
+                funcion(evento)
+            for funcion in todos:
+                funcion(evento)
+            if perfil is not None:
+                perfil.registrar("despacho", time.perf_counter_ns() - inicio)
+        return pendientes
+
+class RegistroEventos:
+    #E: String (ruta)
+    #S:
+    #R:
+    #F: Suscriptor opcional que agrega cada evento como una línea JSON
+    def __init__(self, ruta):
+        self.archivo = open(ruta, "a", encoding="utf-8")
+
+    def escribir(self, evento):
+        #E: EventoJuego
+        #S:
+        #R:
+        #F: Escribe el evento (con el buffer del archivo; se vuelca al cerrar)
+        datos = {"tick": evento.tick, "tipo": evento.tipo, "texto": evento.texto, "puntos": evento.puntos, "total": evento.total}
+        if evento.posicion is not None:
+            datos["posicion"] = [evento.posicion.fila, evento.posicion.columna]
+        self.archivo.write(json.dumps(datos, ensure_ascii=False) + "\n")
+
+    def cerrar(self):
+        #E:
+        #S:
+        #R:
+        #F: Cierra el archivo
+        self.archivo.close()
+
+ORDENES_DIRECCION = tuple(permutations(range(4)))
+
+def generar_laberinto(filas, columnas, rng=random, algoritmo=ALGORITMO_LABERINTO, semilla=None):
+    #E: Enteros, generador aleatorio, String ("dfs" o "kruskal"), Int o None
+    #S: Lista de filas bytearray (se indexa como matriz)
     #R: Dimensiones impares
-    #F: Genera un laberinto usando DFS
-    laberinto = [[PARED for _ in range(columnas)] for _ in range(filas)]
-
-    def vecinos(celda):
-        fila, columna = celda
-        direcciones = [(-2, 0), (2, 0), (0, -2), (0, 2)]
-        random.shuffle(direcciones)
-        for delta_fila, delta_columna in direcciones:
-            nueva_fila, nueva_columna = fila + delta_fila, columna + delta_columna
-            if 0 < nueva_fila < filas - 1 and 0 < nueva_columna < columnas - 1 and laberinto[nueva_fila][nueva_columna] == PARED:
-                yield (nueva_fila, nueva_columna, delta_fila, delta_columna)
+    #F: Genera un laberinto perfecto; con semilla el resultado es reproducible
+    if semilla is not None:
+        rng = random.Random(semilla)
+    celdas = bytearray([PARED]) * (filas * columnas)
+    if algoritmo == "dfs":
+        tallar_dfs(celdas, filas, columnas, rng)
+    elif algoritmo == "kruskal":
+        tallar_kruskal(celdas, filas, columnas, rng)
+    else:
+        raise ValueError(f"Algoritmo de laberinto desconocido: {algoritmo}")
+    return [celdas[fila * columnas:(fila + 1) * columnas] for fila in range(filas)]
 
-    pila = [(1, 1)]
-    laberinto[1][1] = CAMINO
+def tallar_dfs(celdas, filas, columnas, rng):
+    #E: bytearray plano, Enteros, generador aleatorio
+    #S:
+    #R:
+    #F: Backtracker recursivo (iterativo) sobre el arreglo plano
+    saltos = (-2 * columnas, 2 * columnas, -2, 2)
+    ordenes = ORDENES_DIRECCION
+    aleatorio = rng.random
+    inicio = columnas + 1
+    celdas[inicio] = CAMINO
+    pila = [inicio]
     while pila:
-        celda = pila[-1]
-        encontrado = False
-        for nueva_fila, nueva_columna, delta_fila, delta_columna in vecinos(celda):
-            if laberinto[nueva_fila][nueva_columna] == PARED:
-                laberinto[celda[0] + delta_fila // 2][celda[1] + delta_columna // 2] = CAMINO
-                laberinto[nueva_fila][nueva_columna] = CAMINO
-                pila.append((nueva_fila, nueva_columna))
-                encontrado = True
-                break
-        if not encontrado:
+        actual = pila[-1]
+        fila, columna = divmod(actual, columnas)
+        posibles = (fila > 2, fila < filas - 3, columna > 2, columna < columnas - 3)
+        for direccion in ordenes[int(aleatorio() * 24)]:
+            if posibles[direccion]:
+                vecino = actual + saltos[direccion]
+                if celdas[vecino] == PARED:
+                    celdas[actual + saltos[direccion] // 2] = CAMINO
+                    celdas[vecino] = CAMINO
+                    pila.append(vecino)
+                    break
+        else:
             pila.pop()
-    return laberinto
+
+def tallar_kruskal(celdas, filas, columnas, rng):
+    #E: bytearray plano, Enteros, generador aleatorio
+    #S:
+    #R:
+    #F: Kruskal aleatorio con union-find; tiempo casi lineal en el número de celdas
+    paredes = []
+    for fila in range(1, filas - 1, 2):
+        base = fila * columnas
+        for columna in range(1, columnas - 1, 2):
+            celdas[base + columna] = CAMINO
+            if columna + 2 < columnas - 1:
+                paredes.append(base + columna + 1)
+            if fila + 2 < filas - 1:
+                paredes.append(base + columna + columnas)
+    rng.shuffle(paredes)
+    padre = list(range(filas * columnas))
+    for pared in paredes:
+        if (pared // columnas) % 2 == 1:
+            a, b = pared - 1, pared + 1
+        else:
+            a, b = pared - columnas, pared + columnas
+        while padre[a] != a:
+            padre[a] = a = padre[padre[a]]
+        while padre[b] != b:
+            padre[b] = b = padre[padre[b]]
+        if a != b:
+            padre[a] = b
+            celdas[pared] = CAMINO
+
+def camino_mas_corto(laberinto, inicio, fin, tipos_validos=None):
+    #E: Matriz, tupla, tupla, tupla o None (None = todo lo que no es PARED)
+    #S: Lista de tuplas desde inicio hasta fin, o None si no hay camino
+    #R:
+    #F: BFS con cola deque y punteros al padre en un arreglo plano
+    filas = len(laberinto)
+    cols = len(laberinto[0])
+    padre = array("i", [-1]) * (filas * cols)
+    origen = inicio[0] * cols + inicio[1]
+    destino = fin[0] * cols + fin[1]
+    padre[origen] = origen
+    cola = deque([origen])
+    while cola:
+        actual = cola.popleft()
+        if actual == destino:
+            camino = [divmod(actual, cols)]
+            while actual != origen:
+                actual = padre[actual]
+                camino.append(divmod(actual, cols))
+            camino.reverse()
+            return camino
+        fila, columna = divmod(actual, cols)
+        for delta_fila, delta_columna in DIRECCIONES:
+            nueva_fila, nueva_columna = fila + delta_fila, columna + delta_columna
+            if 0 <= nueva_fila < filas and 0 <= nueva_columna < cols:
+                vecino = nueva_fila * cols + nueva_columna
+                if padre[vecino] == -1:
+                    tipo = laberinto[nueva_fila][nueva_columna]
+                    if (tipo != PARED) if tipos_validos is None else (tipo in tipos_validos):
+                        padre[vecino] = actual
+                        cola.append(vecino)
+    return None
 
 def obtener_camino_solucion(laberinto, inicio, fin):
     #E: Matriz, tupla, tupla
     #S: Set de tuplas
     #R:
     #F: Encuentra el camino desde inicio a fin
+    camino = camino_mas_corto(laberinto, inicio, fin)
+    return set(camino) if camino else set()
+
+def calcular_campo_distancias(laberinto, objetivo, tipos_validos, obstaculo=None):
+    #E: Matriz, tupla, tupla, tupla o None
+    #S: array plano de enteros (-1 = inalcanzable)
+    #R: El objetivo debe ser de un tipo válido
+    #F: BFS inversa desde el objetivo; el índice de (fila, columna) es fila * columnas + columna
     filas = len(laberinto)
     cols = len(laberinto[0])
-    cola = [(inicio, [inicio])]
-    visitados = set()
-    visitados.add(inicio)
+    campo = array("i", [-1]) * (filas * cols)
+    fila, columna = objetivo
+    if laberinto[fila][columna] not in tipos_validos or objetivo == obstaculo:
+        return campo
+    if obstaculo is not None:
+        campo[obstaculo[0] * cols + obstaculo[1]] = -2
+    campo[fila * cols + columna] = 0
+    cola = deque([(fila, columna)])
     while cola:
-        (fila, columna), camino = cola.pop(0)
-        if (fila, columna) == fin:
-            return set(camino)
-        direcciones = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        for delta_fila, delta_columna in direcciones:
+        fila, columna = cola.popleft()
+        siguiente = campo[fila * cols + columna] + 1
+        for delta_fila, delta_columna in DIRECCIONES:
             nueva_fila, nueva_columna = fila + delta_fila, columna + delta_columna
-            if 0 <= nueva_fila < filas and 0 <= nueva_columna < cols and laberinto[nueva_fila][nueva_columna] != PARED and (nueva_fila, nueva_columna) not in visitados:
-                visitados.add((nueva_fila, nueva_columna))
-                cola.append(((nueva_fila, nueva_columna), camino + [(nueva_fila, nueva_columna)]))
-    return set()
+            if 0 <= nueva_fila < filas and 0 <= nueva_columna < cols:
+                indice = nueva_fila * cols + nueva_columna
+                if campo[indice] == -1 and laberinto[nueva_fila][nueva_columna] in tipos_validos:
+                    campo[indice] = siguiente
+                    cola.append((nueva_fila, nueva_columna))
+    if obstaculo is not None:
+        campo[obstaculo[0] * cols + obstaculo[1]] = -1
+    return campo
 
-def distribuir_celdas_especiales(matriz, modo, frac_tunel=0.03, frac_liana=0.03):
-    #E: Matriz, floats
+def distribuir_celdas_especiales(matriz, modo, frac_tunel=0.03, frac_liana=0.03, rng=random):
+    #E: Matriz, String, floats, generador aleatorio
     #S:
     #R:
     #F: Convierte caminos en túneles o lianas aleatoriamente
@@ -123,7 +431,7 @@ def distribuir_celdas_especiales(matriz, modo, frac_tunel=0.03, frac_liana=0.03)
     for fila in range(1, filas - 1):
         for columna in range(1, cols - 1):
             if matriz[fila][columna] == CAMINO:
-                rnd = random.random()
+                rnd = rng.random()
                 if rnd < frac_tunel:
                     if modo == "Cazador" and (fila, columna) in camino_seguro:
                         pass
@@ -135,60 +443,2010 @@ def distribuir_celdas_especiales(matriz, modo, frac_tunel=0.03, frac_liana=0.03)
                     else:
                         matriz[fila][columna] = LIANA
 
-def cargar_puntajes():
-    #E:
-    #S: Diccionario
-    #R:
-    #F: Carga los puntajes desde archivo JSON
-    try:
-        with open(ARCHIVO_PUNTAJES, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {"Escapa": [], "Cazador": []}
+class BloqueoArchivo:
+    #E: String (ruta del archivo de bloqueo)
+    #S:
+    #R:
+    #F: Bloqueo exclusivo entre procesos (flock en POSIX, msvcrt en Windows) usable con "with"; con crear=False no crea
+    #   el archivo y, si todavía no existe, no bloquea (nadie escribió aún)
+    def __init__(self, ruta, crear=True):
+        self.ruta = ruta
+        self.crear = crear
+        self.fd = None
+
+    def __enter__(self):
+        try:
+            self.fd = os.open(self.ruta, os.O_RDWR | os.O_CREAT if self.crear else os.O_RDWR, 0o644)
+        except FileNotFoundError:
+            if self.crear:
+                raise
+            return self
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(self.fd, msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *error):
+        if self.fd is None:
+            return False
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self.fd, 0, os.SEEK_SET)
+            msvcrt.locking(self.fd, msvcrt.LK_UNLCK, 1)
+        os.close(self.fd)
+        self.fd = None
+        return False
+
+def escribir_atomico(ruta, contenido):
+    #E: String, String o bytes
+    #S:
+    #R:
+    #F: Escribe un archivo completo a través de un temporal y os.replace; si falla, el archivo anterior queda intacto
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    binario = isinstance(contenido, (bytes, bytearray))
+    try:
+        with open(temporal, "wb" if binario else "w", encoding=None if binario else "utf-8") as f:
+            f.write(contenido)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, ruta)
+    except OSError:
+        #Disco lleno o sin permisos: no dejar el temporal a medias
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+        raise
+
+class AlmacenPuntajes:
+    #E: Strings (rutas), Int, Int
+    #S:
+    #R:
+    #F: Puntajes en un registro de solo anexado con bloqueo; índice top-k por modo en montículos y compactación al JSON
+    def __init__(self, archivo_json=ARCHIVO_PUNTAJES, archivo_registro=ARCHIVO_REGISTRO_PUNTAJES, k=TOP_PUNTAJES, compactar_cada=COMPACTAR_CADA):
+        self.archivo_json = archivo_json
+        self.archivo_registro = archivo_registro
+        self.bloqueo = BloqueoArchivo(archivo_registro + ".lock")
+        self.bloqueo_lectura = BloqueoArchivo(archivo_registro + ".lock", crear=False)
+        self.k = k
+        self.compactar_cada = compactar_cada
+        self.montones = {}
+        self.secuencia = 0
+        self.firma_json = None
+        self.desplazamiento = 0
+        self.anexados = 0
+
+    def firma(self):
+        #E:
+        #S: Tupla o None
+        #R:
+        #F: Identifica la versión del JSON (cambia cuando otro proceso compacta)
+        try:
+            info = os.stat(self.archivo_json)
+        except OSError:
+            return None
+        return (info.st_ino, info.st_mtime_ns, info.st_size)
+
+    def insertar(self, modo, nombre, puntaje):
+        #E: Strings, int
+        #S:
+        #R:
+        #F: Inserta en el montículo de tamaño k del modo (a igual puntaje se conserva el más antiguo)
+        monton = self.montones.setdefault(modo, [])
+        self.secuencia += 1
+        entrada = (puntaje, -self.secuencia, nombre)
+        if len(monton) < self.k:
+            heapq.heappush(monton, entrada)
+        elif entrada > monton[0]:
+            heapq.heapreplace(monton, entrada)
+
+    def refrescar(self):
+        #E:
+        #S:
+        #R: Llamar con el bloqueo tomado
+        #F: Lee solo lo nuevo del registro; recarga todo si el JSON fue compactado por otro proceso
+        firma = self.firma()
+        if firma != self.firma_json:
+            self.firma_json = firma
+            self.montones = {"Escapa": [], "Cazador": []}
+            self.secuencia = 0
+            self.desplazamiento = 0
+            try:
+                with open(self.archivo_json, "r", encoding="utf-8") as f:
+                    datos = json.load(f)
+            except Exception:
+                datos = {}
+            for modo, lista in datos.items():
+                self.montones.setdefault(modo, [])
+                for entrada in lista:
+                    self.insertar(modo, entrada["name"], entrada["score"])
+        try:
+            with open(self.archivo_registro, "rb") as f:
+                f.seek(self.desplazamiento)
+                nuevo = f.read()
+        except OSError:
+            return
+        fin = nuevo.rfind(b"\n") + 1
+        for linea in nuevo[:fin].splitlines():
+            try:
+                registro = json.loads(linea)
+            except ValueError:
+                continue
+            self.insertar(registro["modo"], registro["name"], registro["score"])
+        self.desplazamiento += fin
+
+    def agregar(self, modo, nombre, puntaje):
+        #E: Strings, int
+        #S:
+        #R:
+        #F: Anexa un resultado al registro (una sola escritura) y actualiza el índice en O(log k)
+        linea = json.dumps({"modo": modo, "name": nombre, "score": puntaje}, ensure_ascii=False) + "\n"
+        with self.bloqueo:
+            self.refrescar()
+            fd = os.open(self.archivo_registro, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, linea.encode("utf-8"))
+            finally:
+                os.close(fd)
+            self.refrescar()
+            self.anexados += 1
+            if self.anexados >= self.compactar_cada:
+                self.compactar_bloqueado()
+
+    def top(self, modo):
+        #E: String
+        #S: Lista de diccionarios {"name", "score"} de mayor a menor
+        #R:
+        #F: Mejores k puntajes del modo
+        with self.bloqueo_lectura:
+            self.refrescar()
+        return [{"name": nombre, "score": puntaje} for puntaje, _, nombre in sorted(self.montones.get(modo, []), reverse=True)]
+
+    def datos(self):
+        #E:
+        #S: Diccionario con la forma de top_scores.json
+        #R:
+        #F: Top k de todos los modos
+        with self.bloqueo_lectura:
+            self.refrescar()
+        return {modo: [{"name": nombre, "score": puntaje} for puntaje, _, nombre in sorted(monton, reverse=True)]
+                for modo, monton in self.montones.items()}
+
+    def compactar_bloqueado(self):
+        #E:
+        #S:
+        #R: Llamar con el bloqueo tomado
+        #F: Vuelca el top k al JSON de forma atómica y vacía el registro
+        self.refrescar()
+        datos = {modo: [{"name": nombre, "score": puntaje} for puntaje, _, nombre in sorted(monton, reverse=True)]
+                 for modo, monton in self.montones.items()}
+        escribir_atomico(self.archivo_json, json.dumps(datos, ensure_ascii=False, indent=2))
+        open(self.archivo_registro, "wb").close()
+        self.firma_json = self.firma()
+        self.desplazamiento = 0
+        self.anexados = 0
+
+    def compactar(self):
+        #E:
+        #S:
+        #R:
+        #F: Compacta tomando el bloqueo
+        with self.bloqueo:
+            self.compactar_bloqueado()
+
+    def reemplazar(self, datos):
+        #E: Diccionario con la forma de top_scores.json
+        #S:
+        #R:
+        #F: Reemplaza el JSON de forma atómica y descarta el registro pendiente
+        with self.bloqueo:
+            escribir_atomico(self.archivo_json, json.dumps(datos, ensure_ascii=False, indent=2))
+            open(self.archivo_registro, "wb").close()
+            self.firma_json = None
+            self.refrescar()
+
+class AlmacenPuntajesSQLite:
+    #E: String (ruta de la base), Int, Int
+    #S:
+    #R:
+    #F: Historial completo de partidas en SQLite (WAL) con índices para top-N, mejores por jugador y por día
+    def __init__(self, ruta=ARCHIVO_BD_PUNTAJES, k=TOP_PUNTAJES, lote=LOTE_INSERCION, espera=ESPERA_MAXIMA_LOTE):
+        self.ruta = ruta
+        self.k = k
+        self.lote = lote
+        self.espera = espera
+        self.pendientes = []
+        import sqlite3
+        self.conexion = sqlite3.connect(ruta, timeout=10.0)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        with self.conexion:
+            self.conexion.execute("""CREATE TABLE IF NOT EXISTS partidas (
+                id INTEGER PRIMARY KEY,
+                modo TEXT NOT NULL,
+                jugador TEXT NOT NULL,
+                puntaje INTEGER NOT NULL,
+                fecha REAL NOT NULL)""")
+            self.conexion.execute("CREATE INDEX IF NOT EXISTS partidas_modo_puntaje ON partidas (modo, puntaje DESC, id)")
+            self.conexion.execute("CREATE INDEX IF NOT EXISTS partidas_jugador_modo ON partidas (jugador, modo, puntaje DESC)")
+            self.conexion.execute("CREATE INDEX IF NOT EXISTS partidas_modo_fecha ON partidas (modo, fecha)")
+            self.conexion.execute("CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT)")
+
+    def agregar(self, modo, nombre, puntaje):
+        #E: Strings, int
+        #S:
+        #R:
+        #F: Inserta el resultado al terminar la partida (lote = 1, visible enseguida para otros procesos); con lote > 1 lo
+        #   acumula hasta completar el lote o hasta que el más viejo pendiente lleve "espera" segundos
+        ahora = time.time()
+        self.pendientes.append((modo, nombre, puntaje, ahora))
+        if len(self.pendientes) >= self.lote or ahora - self.pendientes[0][3] >= self.espera:
+            self.vaciar()
+
+    def vaciar(self):
+        #E:
+        #S:
+        #R:
+        #F: Inserta los resultados pendientes en una sola transacción
+        if not self.pendientes:
+            return
+        with self.conexion:
+            self.conexion.executemany("INSERT INTO partidas (modo, jugador, puntaje, fecha) VALUES (?, ?, ?, ?)", self.pendientes)
+        self.pendientes = []
+
+    def top(self, modo, n=None):
+        #E: String, Int o None
+        #S: Lista de diccionarios {"name", "score"} de mayor a menor
+        #R:
+        #F: Consulta indexada (modo, puntaje) con LIMIT
+        self.vaciar()
+        filas = self.conexion.execute("SELECT jugador, puntaje FROM partidas WHERE modo = ? ORDER BY puntaje DESC, id LIMIT ?",
+                                      (modo, n or self.k))
+        return [{"name": nombre, "score": puntaje} for nombre, puntaje in filas]
+
+    def datos(self):
+        #E:
+        #S: Diccionario con la forma de top_scores.json
+        #R:
+        #F: Top k de cada modo
+        return {modo: self.top(modo) for modo in ("Escapa", "Cazador")}
+
+    def mejor_de(self, nombre, modo):
+        #E: Strings
+        #S: Int o None
+        #R:
+        #F: Mejor puntaje de un jugador en un modo (índice jugador, modo)
+        self.vaciar()
+        fila = self.conexion.execute("SELECT MAX(puntaje) FROM partidas WHERE jugador = ? AND modo = ?", (nombre, modo)).fetchone()
+        return fila[0]
+
+    def percentil(self, modo, puntaje):
+        #E: String, int
+        #S: Float entre 0 y 100
+        #R:
+        #F: Porcentaje de partidas del modo con puntaje menor al dado
+        self.vaciar()
+        total = self.conexion.execute("SELECT COUNT(*) FROM partidas WHERE modo = ?", (modo,)).fetchone()[0]
+        if total == 0:
+            return 0.0
+        menores = self.conexion.execute("SELECT COUNT(*) FROM partidas WHERE modo = ? AND puntaje < ?", (modo, puntaje)).fetchone()[0]
+        return 100.0 * menores / total
+
+    def top_del_dia(self, modo, dia=None, n=None):
+        #E: String, float (cualquier instante del día, hora local) o None para hoy, Int o None
+        #S: Lista de diccionarios {"name", "score"}
+        #R:
+        #F: Mejores puntajes del modo jugados ese día
+        self.vaciar()
+        local = time.localtime(time.time() if dia is None else dia)
+        inicio = time.mktime((local.tm_year, local.tm_mon, local.tm_mday, 0, 0, 0, 0, 0, -1))
+        filas = self.conexion.execute("SELECT jugador, puntaje FROM partidas WHERE modo = ? AND fecha >= ? AND fecha < ? ORDER BY puntaje DESC, id LIMIT ?",
+                                      (modo, inicio, inicio + 86400, n or self.k))
+        return [{"name": nombre, "score": puntaje} for nombre, puntaje in filas]
+
+    def reemplazar(self, datos):
+        #E: Diccionario con la forma de top_scores.json
+        #S:
+        #R:
+        #F: Reemplaza las partidas de los modos incluidos por las de datos
+        self.vaciar()
+        ahora = time.time()
+        with self.conexion:
+            for modo, lista in datos.items():
+                self.conexion.execute("DELETE FROM partidas WHERE modo = ?", (modo,))
+                self.conexion.executemany("INSERT INTO partidas (modo, jugador, puntaje, fecha) VALUES (?, ?, ?, ?)",
+                                          [(modo, e["name"], e["score"], ahora) for e in lista])
+
+    def importar_json(self, ruta=ARCHIVO_PUNTAJES):
+        #E: String
+        #S: Int (partidas importadas)
+        #R: Se ejecuta una sola vez por base de datos
+        #F: Trae los puntajes del top_scores.json existente
+        if self.conexion.execute("SELECT 1 FROM meta WHERE clave = 'json_importado'").fetchone():
+            return 0
+        try:
+            with open(ruta, "r", encoding="utf-8") as f:
+                datos = json.load(f)
+            fecha = os.path.getmtime(ruta)
+        except (OSError, ValueError):
+            datos, fecha = {}, time.time()
+        filas = [(modo, e["name"], e["score"], fecha) for modo, lista in datos.items() for e in lista]
+        with self.conexion:
+            self.conexion.executemany("INSERT INTO partidas (modo, jugador, puntaje, fecha) VALUES (?, ?, ?, ?)", filas)
+            self.conexion.execute("INSERT INTO meta (clave, valor) VALUES ('json_importado', ?)", (ruta,))
+        return len(filas)
+
+    def compactar(self):
+        #E:
+        #S:
+        #R:
+        #F: Inserta lo pendiente y consolida el WAL en la base
+        self.vaciar()
+        self.conexion.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+almacen = None
+
+def almacen_puntajes():
+    #E:
+    #S: AlmacenPuntajes o AlmacenPuntajesSQLite
+    #R: BACKEND_PUNTAJES es "registro" o "sqlite"
+    #F: Almacén de puntajes compartido por el proceso (se crea al primer uso)
+    global almacen
+    if almacen is None:
+        if BACKEND_PUNTAJES == "sqlite":
+            almacen = AlmacenPuntajesSQLite()
+            almacen.importar_json()
+        else:
+            almacen = AlmacenPuntajes()
+    return almacen
+
+def cargar_puntajes():
+    #E:
+    #S: Diccionario
+    #R:
+    #F: Carga los mejores puntajes (JSON compactado más el registro pendiente)
+    return almacen_puntajes().datos()
+
+def guardar_puntajes(datos):
+    #E: Diccionario
+    #S:
+    #R:
+    #F: Reemplaza los puntajes guardados por los de datos
+    almacen_puntajes().reemplazar(datos)
+
+def actualizar_puntajes(modo, nombre, puntaje):
+    #E: Strings, int
+    #S:
+    #R:
+    #F: Actualiza la lista de mejores puntajes
+    almacen_puntajes().agregar(modo, nombre, puntaje)
+
+def verificar_alcanzabilidad(mapa, inicio, fin, tipos_validos):
+    #E: Matriz, Posicion, Posicion, tupla
+    #S: Bool
+    #R:
+    #F: Verifica si existe un camino entre inicio y fin usando solo tipos_validos
+    return camino_mas_corto(mapa, (inicio.fila, inicio.columna), (fin.fila, fin.columna), tipos_validos) is not None
+
+def etiquetar_componentes(mapa, tipos_validos):
+    #E: Matriz, tupla
+    #S: array plano de etiquetas (-1 = celda fuera de tipos_validos)
+    #R:
+    #F: Numera las componentes conexas formadas por celdas de tipos_validos
+    filas = len(mapa)
+    cols = len(mapa[0])
+    etiquetas = array("i", [-1]) * (filas * cols)
+    siguiente = 0
+    for fila in range(filas):
+        for columna in range(cols):
+            if etiquetas[fila * cols + columna] != -1 or mapa[fila][columna] not in tipos_validos:
+                continue
+            etiquetas[fila * cols + columna] = siguiente
+            cola = deque([(fila, columna)])
+            while cola:
+                f, c = cola.popleft()
+                for delta_fila, delta_columna in DIRECCIONES:
+                    nf, nc = f + delta_fila, c + delta_columna
+                    if 0 <= nf < filas and 0 <= nc < cols and etiquetas[nf * cols + nc] == -1 and mapa[nf][nc] in tipos_validos:
+                        etiquetas[nf * cols + nc] = siguiente
+                        cola.append((nf, nc))
+            siguiente += 1
+    return etiquetas
+
+class IndiceCeldasLibres:
+    #E: Matriz
+    #S:
+    #R:
+    #F: Listas precalculadas de celdas libres (y de la franja del borde) para muestrear en O(1)
+    def __init__(self, mapa):
+        self.filas = len(mapa)
+        self.columnas = len(mapa[0])
+        self.libres = []
+        self.borde = []
+        self.lugar_libres = {}
+        self.lugar_borde = {}
+        for fila in range(1, self.filas - 1):
+            for columna in range(1, self.columnas - 1):
+                if mapa[fila][columna] in (CAMINO, LIANA):
+                    self.agregar(fila, columna)
+
+    def en_borde(self, fila, columna):
+        #E: Enteros
+        #S: Bool
+        #R:
+        #F: Indica si la celda está en la franja de dos casillas junto al borde
+        return fila <= 2 or columna <= 2 or fila >= self.filas - 3 or columna >= self.columnas - 3
+
+    def agregar(self, fila, columna):
+        #E: Enteros
+        #S:
+        #R:
+        #F: Registra una celda libre
+        indice = fila * self.columnas + columna
+        if indice in self.lugar_libres:
+            return
+        self.lugar_libres[indice] = len(self.libres)
+        self.libres.append(indice)
+        if self.en_borde(fila, columna):
+            self.lugar_borde[indice] = len(self.borde)
+            self.borde.append(indice)
+
+    def quitar(self, fila, columna):
+        #E: Enteros
+        #S:
+        #R:
+        #F: Elimina una celda intercambiándola con la última de cada lista
+        indice = fila * self.columnas + columna
+        for lista, lugares in ((self.libres, self.lugar_libres), (self.borde, self.lugar_borde)):
+            lugar = lugares.pop(indice, None)
+            if lugar is None:
+                continue
+            ultimo = lista.pop()
+            if ultimo != indice:
+                lista[lugar] = ultimo
+                lugares[ultimo] = lugar
+
+    def actualizar(self, fila, columna, tipo):
+        #E: Enteros, Int
+        #S:
+        #R:
+        #F: Mantiene el índice al cambiar el tipo de una casilla interior
+        if not (0 < fila < self.filas - 1 and 0 < columna < self.columnas - 1):
+            return
+        if tipo in (CAMINO, LIANA):
+            self.agregar(fila, columna)
+        else:
+            self.quitar(fila, columna)
+
+    def candidatos(self, cerca_borde=False):
+        #E: Bool
+        #S: Lista de Posicion
+        #R:
+        #F: Todas las celdas candidatas del grupo pedido
+        return [Posicion(*divmod(indice, self.columnas)) for indice in (self.borde if cerca_borde else self.libres)]
+
+    def elegir(self, rng, cerca_borde=False):
+        #E: Generador aleatorio, Bool
+        #S: Posicion
+        #R:
+        #F: Encuentra una celda válida aleatoria
+        lista = self.borde if cerca_borde else self.libres
+        if not lista:
+            return Posicion(1, 1)
+        return Posicion(*divmod(rng.choice(lista), self.columnas))
+
+class CampoPersecucion:
+    #E: Matriz, Posicion (raíz, el jugador), tupla de tipos, etiquetas de componentes y Bool ya calculados (opcionales)
+    #S:
+    #R:
+    #F: Siguiente paso hacia la raíz para cada celda transitable por enemigos; cuando la raíz se mueve se repara solo lo afectado
+    def __init__(self, mapa, raiz, tipos_validos=(CAMINO, LIANA), componentes=None, es_bosque=None):
+        self.filas = len(mapa)
+        self.columnas = len(mapa[0])
+        self.componentes = etiquetar_componentes(mapa, tipos_validos) if componentes is None else componentes
+        if es_bosque is None:
+            es_bosque = self.contar_aristas() == sum(1 for etiqueta in self.componentes if etiqueta >= 0) - (max(self.componentes, default=-1) + 1)
+        self.es_bosque = es_bosque
+        self.siguiente = array("i", [-1]) * (self.filas * self.columnas)
+        self.marca = array("i", [0]) * (self.filas * self.columnas)
+        self.generacion = 0
+        self.raiz = -1
+        self.enraizadas = set()
+        self.celdas_reparadas = 0
+        self.enraizar(raiz.fila * self.columnas + raiz.columna)
+
+    def contar_aristas(self):
+        #E:
+        #S: Int
+        #R:
+        #F: Cuenta los pares de celdas transitables adyacentes (sin ciclos hay celdas - componentes aristas)
+        componentes = self.componentes
+        columnas = self.columnas
+        aristas = 0
+        for indice in range(self.filas * columnas):
+            if componentes[indice] >= 0:
+                if indice % columnas + 1 < columnas and componentes[indice + 1] >= 0:
+                    aristas += 1
+                if indice + columnas < len(componentes) and componentes[indice + columnas] >= 0:
+                    aristas += 1
+        return aristas
+
+    def vecinos_validos(self, indice):
+        #E: Int (índice plano)
+        #S: Lista de índices planos
+        #R:
+        #F: Vecinos transitables de una celda
+        fila, columna = divmod(indice, self.columnas)
+        vecinos = []
+        for delta_fila, delta_columna in DIRECCIONES:
+            nueva_fila, nueva_columna = fila + delta_fila, columna + delta_columna
+            if 0 <= nueva_fila < self.filas and 0 <= nueva_columna < self.columnas and self.componentes[nueva_fila * self.columnas + nueva_columna] >= 0:
+                vecinos.append(nueva_fila * self.columnas + nueva_columna)
+        return vecinos
+
+    def componentes_de(self, indice):
+        #E: Int (índice plano)
+        #S: Set de etiquetas
+        #R:
+        #F: Componentes que toca una celda: la propia si es transitable, o las de sus vecinos (p. ej. un túnel)
+        if self.componentes[indice] >= 0:
+            return {self.componentes[indice]}
+        return {self.componentes[vecino] for vecino in self.vecinos_validos(indice)}
+
+    def enraizar(self, raiz):
+        #E: Int (índice plano)
+        #S:
+        #R:
+        #F: Reconstruye el campo de todas las componentes que toca la raíz
+        self.raiz = raiz
+        self.enraizadas = set()
+        for componente in self.componentes_de(raiz):
+            self.enraizar_componente(componente, raiz)
+
+    def enraizar_componente(self, componente, raiz):
+        #E: Int (etiqueta), Int (índice plano)
+        #S:
+        #R:
+        #F: BFS limitada a una componente; sus celdas quedan apuntando hacia la raíz
+        siguiente = self.siguiente
+        marca = self.marca
+        componentes = self.componentes
+        columnas = self.columnas
+        total = len(componentes)
+        self.generacion += 1
+        generacion = self.generacion
+        if componentes[raiz] == componente:
+            semillas = [raiz]
+            siguiente[raiz] = raiz
+        else:
+            semillas = [vecino for vecino in self.vecinos_validos(raiz) if componentes[vecino] == componente]
+            for vecino in semillas:
+                siguiente[vecino] = raiz
+        marca[raiz] = generacion
+        for vecino in semillas:
+            marca[vecino] = generacion
+        cola = deque(semillas)
+        while cola:
+            actual = cola.popleft()
+            columna = actual % columnas
+            for vecino in (actual - columnas, actual + columnas, actual - 1 if columna > 0 else -1, actual + 1 if columna + 1 < columnas else -1):
+                if 0 <= vecino < total and marca[vecino] != generacion and componentes[vecino] >= 0:
+                    marca[vecino] = generacion
+                    siguiente[vecino] = actual
+                    cola.append(vecino)
+            self.celdas_reparadas += 1
+        self.enraizadas.add(componente)
+
+    def mover_raiz(self, posicion):
+        #E: Posicion (nueva posición del jugador)
+        #S:
+        #R:
+        #F: Actualiza el campo; en un laberinto sin ciclos un paso de la raíz solo cambia dos punteros
+        nueva = posicion.fila * self.columnas + posicion.columna
+        anterior = self.raiz
+        if nueva == anterior:
+            return
+        componentes = self.componentes
+        adyacente = nueva - anterior in (1, -1, self.columnas, -self.columnas) and (nueva // self.columnas == anterior // self.columnas or nueva % self.columnas == anterior % self.columnas)
+        if self.es_bosque and adyacente:
+            propia_anterior = componentes[anterior]
+            propia_nueva = componentes[nueva]
+            if propia_anterior >= 0 and propia_nueva >= 0:
+                self.siguiente[anterior] = nueva
+                self.siguiente[nueva] = nueva
+                self.raiz = nueva
+                return
+            if propia_nueva >= 0 and sum(1 for v in self.vecinos_validos(anterior) if componentes[v] == propia_nueva) == 1:
+                #Sale de un túnel: solo sigue conectada la componente a la que entra
+                self.siguiente[nueva] = nueva
+                self.raiz = nueva
+                self.enraizadas = {propia_nueva}
+                return
+            if propia_anterior >= 0 and sum(1 for v in self.vecinos_validos(nueva) if componentes[v] == propia_anterior) == 1:
+                #Entra a un túnel: su componente cuelga de él y se enraízan las demás que lo tocan
+                self.siguiente[anterior] = nueva
+                self.raiz = nueva
+                self.enraizadas = {propia_anterior}
+                for componente in self.componentes_de(nueva):
+                    if componente != propia_anterior:
+                        self.enraizar_componente(componente, nueva)
+                return
+        self.enraizar(nueva)
+
+    def paso(self, posicion):
+        #E: Posicion
+        #S: Posicion, o None si la celda no está conectada con la raíz
+        #R:
+        #F: Siguiente celda hacia el jugador; si el jugador está en una celda no transitable se queda al lado
+        indice = posicion.fila * self.columnas + posicion.columna
+        componente = self.componentes[indice]
+        if componente < 0 or componente not in self.enraizadas:
+            return None
+        destino = self.siguiente[indice]
+        if destino == indice or self.componentes[destino] < 0:
+            return posicion
+        return Posicion(*divmod(destino, self.columnas))
+
+def preparar_tablero(modo, semilla, num_enemigos=None, filas=FILAS, columnas=COLUMNAS):
+    #E: String, Int, Int o None (None = 3 en Escapa, 4 en Cazador), Enteros
+    #S: Diccionario con modo, semilla, mapa, spawns, índice de celdas libres y (en Escapa) el campo de persecución
+    #R: Debe poder ejecutarse en otro proceso (solo datos serializables); dimensiones impares
+    #F: Genera el laberinto, las celdas especiales y posiciones de aparición válidas
+    rng = random.Random(semilla)
+    mapa = generar_laberinto(filas, columnas, rng)
+    distribuir_celdas_especiales(mapa, modo, frac_tunel=0.03, frac_liana=0.04, rng=rng)
+    filas = len(mapa)
+    cols = len(mapa[0])
+    pos_jugador = Posicion(1, 1)
+    pos_salida = Posicion(filas - 2, cols - 2)
+
+    libres = IndiceCeldasLibres(mapa)
+    candidatos = libres.candidatos(cerca_borde=True)
+    if modo == "Cazador":
+        #El enemigo debe poder huir a la salida y el cazador debe poder alcanzarlo
+        huida = etiquetar_componentes(mapa, (CAMINO, LIANA))
+        caza = etiquetar_componentes(mapa, (CAMINO, TUNEL))
+        componente_salida = huida[pos_salida.fila * cols + pos_salida.columna]
+        componente_jugador = caza[pos_jugador.fila * cols + pos_jugador.columna]
+        validos = [p for p in candidatos
+                   if huida[p.fila * cols + p.columna] == componente_salida != -1
+                   and caza[p.fila * cols + p.columna] == componente_jugador != -1]
+        if validos:
+            candidatos = validos
+    if not candidatos:
+        candidatos = [pos_jugador]
+    if num_enemigos is None:
+        num_enemigos = 3 if modo == "Escapa" else 4
+    spawns = []
+    for _ in range(num_enemigos):
+        spawn = rng.choice(candidatos)
+        spawns.append((spawn.fila, spawn.columna))
+    tablero = {"modo": modo, "semilla": semilla, "mapa": mapa, "spawns": spawns, "libres": libres}
+    if modo == "Escapa":
+        tablero["persecucion"] = CampoPersecucion(mapa, pos_jugador)
+    return tablero
+
+class PoolTableros:
+    #E: Int, Int, Enteros (dimensiones de los tableros)
+    #S:
+    #R: capacidad >= 0
+    #F: Mantiene por modo una cola acotada de tableros listos, preparados en otros procesos
+    def __init__(self, capacidad=2, trabajadores=1, filas=FILAS, columnas=COLUMNAS):
+        self.capacidad = capacidad
+        self.trabajadores = trabajadores
+        self.filas = filas
+        self.columnas = columnas
+        self.colas = {"Escapa": deque(), "Cazador": deque()}
+        self.pendientes = {"Escapa": 0, "Cazador": 0}
+        self.aciertos = 0
+        self.fallos = 0
+        self.candado = threading.Lock()
+        self.ejecutor = None
+        self.deshabilitado = capacidad <= 0
+
+    def rellenar(self):
+        #E:
+        #S:
+        #R:
+        #F: Encola trabajos hasta completar la capacidad de cada modo
+        if self.deshabilitado:
+            return
+        if self.ejecutor is None:
+            from concurrent.futures import ProcessPoolExecutor
+            try:
+                self.ejecutor = ProcessPoolExecutor(max_workers=self.trabajadores)
+            except (OSError, NotImplementedError):
+                self.deshabilitado = True
+                return
+        for modo, cola in self.colas.items():
+            with self.candado:
+                faltan = self.capacidad - len(cola) - self.pendientes[modo]
+                self.pendientes[modo] += max(0, faltan)
+            for _ in range(faltan):
+                futuro = self.ejecutor.submit(preparar_tablero, modo, random.randrange(2 ** 31), None, self.filas, self.columnas)
+                futuro.add_done_callback(lambda f, modo=modo: self.al_terminar(modo, f))
+
+    def al_terminar(self, modo, futuro):
+        #E: String, Future
+        #S:
+        #R: Se llama desde un hilo del ejecutor
+        #F: Guarda el tablero terminado en la cola de su modo
+        with self.candado:
+            self.pendientes[modo] -= 1
+            if not futuro.cancelled() and futuro.exception() is None:
+                self.colas[modo].append(futuro.result())
+
+    def obtener(self, modo):
+        #E: String
+        #S: Diccionario de tablero
+        #R:
+        #F: Saca un tablero listo o lo prepara en el momento si la cola está vacía
+        with self.candado:
+            tablero = self.colas[modo].popleft() if self.colas[modo] else None
+            if tablero is None:
+                self.fallos += 1
+            else:
+                self.aciertos += 1
+        if tablero is None:
+            tablero = preparar_tablero(modo, random.randrange(2 ** 31), None, self.filas, self.columnas)
+        self.rellenar()
+        return tablero
+
+    def estadisticas(self):
+        #E:
+        #S: Diccionario con tableros entregados listos (aciertos) y preparados en el momento (fallos)
+        #R:
+        #F: Efecto del pool: cada fallo es una partida que esperó la generación del tablero
+        with self.candado:
+            total = self.aciertos + self.fallos
+            return {"aciertos": self.aciertos, "fallos": self.fallos, "tasa_aciertos": self.aciertos / total if total else 0.0}
+
+    def cerrar(self):
+        #E:
+        #S:
+        #R:
+        #F: Cancela los trabajos en cola y espera a los procesos de trabajo (a lo sumo el tablero que estén preparando);
+        #   salir sin esperarlos hace fallar al hook de salida de concurrent.futures
+        if self.ejecutor is not None:
+            self.ejecutor.shutdown(wait=True, cancel_futures=True)
+            self.ejecutor = None
+
+def mover_enemigos_lote(filas_e, columnas_e, objetivo, mascara):
+    #E: arrays numpy de filas y columnas, tupla (fila, columna), matriz booleana numpy
+    #S: Tupla (nuevas filas, nuevas columnas) como arrays numpy
+    #R: Requiere numpy
+    #F: Evalúa a la vez los cuatro movimientos de todos los enemigos; mismo resultado que mover_enemigo_hacia
+    alto, ancho = mascara.shape
+    todos = np.arange(len(filas_e))
+    cand_f = filas_e[None, :] + np.array([-1, 1, 0, 0])[:, None]
+    cand_c = columnas_e[None, :] + np.array([0, 0, -1, 1])[:, None]
+    dentro = (cand_f >= 0) & (cand_f < alto) & (cand_c >= 0) & (cand_c < ancho)
+    validos = dentro & mascara[np.clip(cand_f, 0, alto - 1), np.clip(cand_c, 0, ancho - 1)]
+    dist = np.where(validos, np.abs(cand_f - objetivo[0]) + np.abs(cand_c - objetivo[1]), np.iinfo(np.int64).max)
+    mejor = dist.argmin(axis=0)
+    actual = np.abs(filas_e - objetivo[0]) + np.abs(columnas_e - objetivo[1])
+    mover = dist[mejor, todos] < actual
+    return np.where(mover, cand_f[mejor, todos], filas_e), np.where(mover, cand_c[mejor, todos], columnas_e)
+
+def posiciones_en_arrays(enemigos):
+    #E: Lista de Enemigo
+    #S: Tupla de arrays numpy (filas, columnas)
+    #R: Requiere numpy
+    #F: Copia las posiciones de los enemigos a arrays contiguos
+    n = len(enemigos)
+    filas_e = np.fromiter((e.posicion.fila for e in enemigos), dtype=np.int64, count=n)
+    columnas_e = np.fromiter((e.posicion.columna for e in enemigos), dtype=np.int64, count=n)
+    return filas_e, columnas_e
+
+class PerfilTick:
+    #E: Int (muestras por fase)
+    #S:
+    #R:
+    #F: Tiempos por fase del tick (perf_counter_ns) en buffers circulares, con percentiles y exportación
+    def __init__(self, capacidad=CAPACIDAD_PERFIL):
+        self.capacidad = capacidad
+        self.muestras = {}
+        self.cuentas = {}
+
+    def registrar(self, fase, nanos):
+        #E: String, Int
+        #S:
+        #R:
+        #F: Guarda una muestra; al llenarse el buffer se sobrescribe la más vieja
+        buffer = self.muestras.get(fase)
+        if buffer is None:
+            buffer = self.muestras[fase] = array("q", bytes(8 * self.capacidad))
+            self.cuentas[fase] = 0
+        cuenta = self.cuentas[fase]
+        buffer[cuenta % self.capacidad] = nanos
+        self.cuentas[fase] = cuenta + 1
+
+    def marcar(self, fase, desde):
+        #E: String, Int (perf_counter_ns del inicio de la fase)
+        #S: Int (instante actual, inicio de la fase siguiente)
+        #R:
+        #F: Registra lo transcurrido desde "desde" y devuelve el instante actual
+        ahora = time.perf_counter_ns()
+        self.registrar(fase, ahora - desde)
+        return ahora
+
+    def valores(self, fase):
+        #E: String
+        #S: Lista de Int
+        #R:
+        #F: Muestras vigentes de una fase
+        cuenta = self.cuentas.get(fase, 0)
+        return list(self.muestras[fase][:min(cuenta, self.capacidad)]) if cuenta else []
+
+    def ultimo(self, fase):
+        #E: String
+        #S: Int (ns) o 0
+        #R:
+        #F: Muestra más reciente de una fase
+        cuenta = self.cuentas.get(fase, 0)
+        return self.muestras[fase][(cuenta - 1) % self.capacidad] if cuenta else 0
+
+    def resumen(self):
+        #E:
+        #S: Diccionario fase -> {"n", "p50_ms", "p95_ms", "p99_ms", "max_ms"}
+        #R:
+        #F: Percentiles (rango más cercano) de cada fase
+        datos = {}
+        for fase in self.muestras:
+            valores = sorted(self.valores(fase))
+            n = len(valores)
+            percentil = lambda p: valores[min(n - 1, max(0, -(-p * n // 100) - 1))] / 1e6
+            datos[fase] = {"n": self.cuentas[fase], "p50_ms": percentil(50), "p95_ms": percentil(95),
+                           "p99_ms": percentil(99), "max_ms": valores[-1] / 1e6}
+        return datos
+
+    def exportar(self, ruta=ARCHIVO_PERFIL, extra=None):
+        #E: String, Diccionario o None (datos adicionales, p. ej. el pool de tableros)
+        #S:
+        #R:
+        #F: Escribe el resumen en un archivo JSON
+        datos = self.resumen()
+        datos.update(extra or {})
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(datos, f, indent=2)
+
+class PlanificadorFijo:
+    #E: Float (segundos por paso lógico), Float (segundos mínimos entre cuadros), Int
+    #S:
+    #R:
+    #F: Paso fijo con acumulador sobre un reloj monótono; el render va a su propia tasa máxima
+    def __init__(self, paso_logico=DURACION_TICK, intervalo_render=1.0 / FPS_MAXIMO, max_pasos=MAX_PASOS_POR_CUADRO, reloj=time.perf_counter):
+        self.paso_logico = paso_logico
+        self.intervalo_render = intervalo_render
+        self.max_pasos = max_pasos
+        self.reloj = reloj
+        self.anterior = None
+        self.acumulado = 0.0
+        self.ultimo_render = None
+        self.pasos_descartados = 0
+
+    def reiniciar(self):
+        #E:
+        #S:
+        #R:
+        #F: Olvida el tiempo acumulado (al empezar una partida)
+        self.anterior = self.reloj()
+        self.acumulado = 0.0
+        self.ultimo_render = None
+
+    def avanzar(self):
+        #E:
+        #S: Tupla (pasos lógicos a ejecutar, Bool si toca dibujar)
+        #R:
+        #F: Acumula el tiempo real transcurrido y lo convierte en pasos fijos, recuperando atrasos con tope
+        ahora = self.reloj()
+        if self.anterior is None:
+            self.anterior = ahora
+        self.acumulado += ahora - self.anterior
+        self.anterior = ahora
+        pasos = min(int(self.acumulado / self.paso_logico), self.max_pasos)
+        self.acumulado -= pasos * self.paso_logico
+        if self.acumulado >= self.paso_logico:
+            #Demasiado atraso: se descarta para no entrar en espiral
+            self.pasos_descartados += int(self.acumulado / self.paso_logico)
+            self.acumulado %= self.paso_logico
+        dibujar = self.ultimo_render is None or ahora - self.ultimo_render >= self.intervalo_render
+        if dibujar:
+            self.ultimo_render = ahora
+        return pasos, dibujar
+
+    def cuadro_adelantado(self):
+        #E:
+        #S:
+        #R:
+        #F: Registra un cuadro dibujado antes de su turno (para mostrar entrada) y reinicia la espera del siguiente
+        self.ultimo_render = self.reloj()
+
+    def espera_ms(self):
+        #E:
+        #S: Int
+        #R:
+        #F: Milisegundos hasta el próximo paso lógico o cuadro, lo que ocurra primero
+        if self.anterior is None:
+            return max(1, int(1000 * self.paso_logico))
+        ahora = self.reloj()
+        hasta_paso = self.paso_logico - self.acumulado - (ahora - self.anterior)
+        hasta_cuadro = self.intervalo_render - (ahora - self.ultimo_render) if self.ultimo_render is not None else 0.0
+        return max(1, int(1000 * min(hasta_paso, hasta_cuadro)))
+
+class ColaEntrada:
+    #E: Int (capacidad), función reloj en ns
+    #S:
+    #R:
+    #F: Cola acotada de acciones del jugador con el instante en que llegaron; une las repeticiones de un mismo movimiento
+    def __init__(self, capacidad=CAPACIDAD_COLA_ENTRADA, reloj=time.perf_counter_ns):
+        self.capacidad = capacidad
+        self.reloj = reloj
+        self.pendientes = deque()
+        self.unidas = 0
+        self.descartadas = 0
+
+    def __len__(self):
+        return len(self.pendientes)
+
+    def agregar(self, accion):
+        #E: String (acción de aplicar_accion; los movimientos en su tecla canónica)
+        #S: Bool (si se agregó una entrada nueva)
+        #R:
+        #F: Un movimiento igual al último pendiente (autorepetición del teclado) se une con él y conserva el instante más viejo;
+        #   con la cola llena se descarta la entrada más vieja
+        pendientes = self.pendientes
+        if pendientes and accion in MOVIMIENTOS and pendientes[-1][0] == accion:
+            self.unidas += 1
+            return False
+        if len(pendientes) >= self.capacidad:
+            pendientes.popleft()
+            self.descartadas += 1
+        pendientes.append((accion, self.reloj()))
+        return True
+
+    def tomar_paso(self):
+        #E:
+        #S: Lista de tuplas (acción, instante de llegada en ns)
+        #R:
+        #F: Entradas para un paso lógico: las pendientes hasta el primer movimiento inclusive, a lo sumo un movimiento por paso
+        tomadas = []
+        pendientes = self.pendientes
+        while pendientes:
+            entrada = pendientes.popleft()
+            tomadas.append(entrada)
+            if entrada[0] in MOVIMIENTOS:
+                break
+        return tomadas
+
+    def vaciar(self):
+        #E:
+        #S:
+        #R:
+        #F: Descarta las entradas pendientes (al empezar una partida)
+        self.pendientes.clear()
+
+class EstadoJuego:
+    #E: String, String, Int o None, Diccionario de tablero o None, Int o None, Enteros (si no hay tablero), BusEventos o None
+    #S:
+    #R: modo es "Escapa" o "Cazador"
+    #F: Estado y reglas de una partida, sin Tkinter; el tiempo es un reloj lógico que avanza un tick por paso
+    def __init__(self, modo, nombre_jugador=None, semilla=None, tablero=None, num_enemigos=None, filas=FILAS, columnas=COLUMNAS, bus=None):
+        self.modo = modo
+        self.nombre_jugador = nombre_jugador
+        if tablero is None:
+            if semilla is None:
+                semilla = random.randrange(2 ** 31)
+            tablero = preparar_tablero(modo, semilla, num_enemigos, filas, columnas)
+        self.semilla = tablero["semilla"]
+        self.rng = random.Random(self.semilla + 1)
+        mapa = tablero["mapa"]
+        self.mapa = mapa
+        self.filas = len(mapa)
+        self.columnas = len(mapa[0])
+        self.indice_libres = tablero.get("libres")
+        self.pos_jugador = Posicion(1, 1)
+        self.pos_salida = Posicion(self.filas - 2, self.columnas - 2)
+        self.campo_salida = None
+        self.campo_salida_bloqueado = None
+        self.celda_bloqueo = None
+        self.mascara = None
+        self.campo_persecucion = tablero.get("persecucion") if modo == "Escapa" else None
+        self.trampas = []
+        self.trampas_por_celda = {}
+        self.expiracion_trampas = []
+        self.secuencia_trampas = 0
+        self.tiempo_ultima_trampa = -999.0
+        self.puntaje = 0
+        self.tick = 0
+        self.turnos = 0
+        self.tiempo = 0.0
+        self.jugando = True
+        self.resultado = None
+        self.energia = 100
+        self.energia_max = 100
+        self.corriendo = False
+        self.bus = bus if bus is not None else BusEventos()
+        self.grabador = None
+        self.perfil = None
+
+        self.enemigos = [Enemigo(i + 1, Posicion(fila, columna)) for i, (fila, columna) in enumerate(tablero["spawns"])]
+        self.enemigos_por_celda = {}
+        for e in self.enemigos:
+            self.enemigos_por_celda.setdefault(e.posicion, []).append(e)
+
+    @property
+    def celdas_libres(self):
+        #Se construye al primer uso: una partida retomada no recorre el tablero al cargar
+        if self.indice_libres is None:
+            self.indice_libres = IndiceCeldasLibres(self.mapa)
+        return self.indice_libres
+
+    def ubicar_enemigo(self, enemigo, posicion):
+        #E: Enemigo, Posicion
+        #S:
+        #R: enemigo está vivo
+        #F: Mueve al enemigo y mantiene el índice de ocupación por celda
+        anterior = enemigo.posicion
+        if anterior == posicion:
+            return
+        ocupantes = self.enemigos_por_celda[anterior]
+        if len(ocupantes) == 1:
+            del self.enemigos_por_celda[anterior]
+        else:
+            ocupantes.remove(enemigo)
+        enemigo.posicion = posicion
+        self.enemigos_por_celda.setdefault(posicion, []).append(enemigo)
+
+    def matar_enemigo(self, enemigo):
+        #E: Enemigo
+        #S:
+        #R: enemigo está vivo
+        #F: Marca al enemigo como muerto y lo saca del índice de ocupación
+        enemigo.muerto = True
+        enemigo.tiempo_muerte = self.tiempo
+        ocupantes = self.enemigos_por_celda[enemigo.posicion]
+        if len(ocupantes) == 1:
+            del self.enemigos_por_celda[enemigo.posicion]
+        else:
+            ocupantes.remove(enemigo)
+
+    def revivir_enemigo(self, enemigo, posicion):
+        #E: Enemigo, Posicion
+        #S:
+        #R: enemigo está muerto
+        #F: Reaparece al enemigo en la posición y lo vuelve a indexar
+        enemigo.posicion = posicion
+        enemigo.muerto = False
+        enemigo.tiempo_muerte = None
+        self.enemigos_por_celda.setdefault(posicion, []).append(enemigo)
+
+    def cambiar_celda(self, fila, columna, tipo):
+        #E: Enteros, Int
+        #S:
+        #R:
+        #F: Cambia el tipo de una casilla, mantiene los índices derivados del mapa y avisa por el bus para que la vista
+        #   y los clientes remotos repinten solo esa casilla. Ninguna regla del juego cambia casillas: es el punto de entrada
+        #   para pruebas y para quien edite el tablero desde fuera (p. ej. el servidor)
+        self.mapa[fila][columna] = tipo
+        self.celdas_libres.actualizar(fila, columna, tipo)
+        #Un cambio puede unir o partir componentes y abrir ciclos; como es raro, los campos se descartan y se recalculan
+        #completos al siguiente turno en lugar de repararse
+        self.campo_salida = None
+        self.celda_bloqueo = None
+        self.mascara = None
+        self.campo_persecucion = None
+        self.publicar(EVENTO_CELDA, "", posicion=Posicion(fila, columna))
+
+    def publicar(self, tipo, texto, puntos=0, posicion=None):
+        #E: String (EVENTO_*), String, Int, Posicion o None
+        #S:
+        #R: Llamar después de actualizar el puntaje
+        #F: Publica un evento en el bus sin esperar a los suscriptores
+        self.bus.publicar(EventoJuego(tipo, self.tick, texto, puntos, self.puntaje, posicion))
+
+    def tomar_eventos(self):
+        #E:
+        #S: Lista de EventoJuego
+        #R:
+        #F: Despacha los eventos pendientes a los suscriptores del bus y los devuelve
+        return self.bus.despachar()
+
+    def mover_jugador(self, delta_fila, delta_columna):
+        #E: Enteros
+        #S: Bool
+        #R:
+        #F: Mueve al jugador (dos casillas si corre) y resuelve colisiones
+        if not self.jugando:
+            return False
+        pasos = 2 if self.corriendo and self.energia > 0 else 1
+        movido = False
+        validos = (CAMINO, TUNEL)
+
+        for _ in range(pasos):
+            nueva_fila = self.pos_jugador.fila + delta_fila
+            nueva_columna = self.pos_jugador.columna + delta_columna
+            if 0 <= nueva_fila < self.filas and 0 <= nueva_columna < self.columnas:
+                tipo = self.mapa[nueva_fila][nueva_columna]
+                if tipo in validos:
+                    self.pos_jugador = Posicion(nueva_fila, nueva_columna)
+                    movido = True
+                    if self.campo_persecucion is not None:
+                        self.campo_persecucion.mover_raiz(self.pos_jugador)
+        if self.corriendo and movido:
+            self.energia = max(0, self.energia - 6)
+            if self.energia == 0:
+                self.corriendo = False
+
+        self.verificar_colisiones_movimiento()
+        return movido
+
+    def alternar_correr(self):
+        #E:
+        #S: Bool
+        #R:
+        #F: Activa o desactiva modo correr
+        if not self.jugando:
+            return False
+        if self.energia <= 0:
+            self.publicar(EVENTO_AVISO, "Sin energía para correr. Espera a recuperar.")
+            return False
+        self.corriendo = not self.corriendo
+        return True
+
+    def colocar_trampa(self):
+        #E:
+        #S: Bool
+        #R:
+        #F: Intenta colocar una trampa en la posición actual
+        if not self.jugando:
+            return False
+        ahora = self.tiempo
+        activas = sum(len(lista) for lista in self.trampas_por_celda.values())
+        if activas >= MAX_TRAMPAS_ACTIVAS:
+            self.publicar(EVENTO_AVISO, f"Máximo {MAX_TRAMPAS_ACTIVAS} trampas activas.")
+            return False
+        if ahora - self.tiempo_ultima_trampa < TIEMPO_RECARGA_TRAMPA:
+            restante = TIEMPO_RECARGA_TRAMPA - (ahora - self.tiempo_ultima_trampa)
+            self.publicar(EVENTO_AVISO, f"Espera {restante:.1f}s para volver a colocar.")
+            return False
+        
+        trampa = Trampa(self.pos_jugador, ahora)
+        self.trampas.append(trampa)
+        self.trampas_por_celda.setdefault(trampa.posicion, []).append(trampa)
+        self.secuencia_trampas += 1
+        heapq.heappush(self.expiracion_trampas, (ahora, self.secuencia_trampas, trampa))
+        self.tiempo_ultima_trampa = ahora
+        return True
+
+    def terminar(self, resultado, puntaje):
+        #E: String, int
+        #S:
+        #R:
+        #F: Cierra la partida con su resultado y puntaje final
+        self.puntaje = puntaje
+        self.resultado = resultado
+        self.jugando = False
+
+    def verificar_colision_enemigo_jugador(self):
+        #E:
+        #S: Bool
+        #R:
+        #F: Verifica si hay colisión entre jugador y enemigos consultando el índice de ocupación
+        ocupantes = self.enemigos_por_celda.get(self.pos_jugador)
+        if not ocupantes:
+            return False
+        if self.modo == "Escapa":
+            self.terminar("derrota", self.puntaje)
+            self.publicar(EVENTO_DERROTA, "Un enemigo te alcanzó. Perdiste.")
+            return True
+        for e in sorted(ocupantes, key=lambda e: e.id_enemigo):
+            pts = 50
+            self.puntaje += pts
+            self.matar_enemigo(e)
+            self.publicar(EVENTO_CAZA, f"Cazaste a un enemigo! +{pts} pts", pts)
+        return False
+
+    def verificar_colisiones_movimiento(self):
+        #E:
+        #S:
+        #R:
+        #F: Verifica condiciones de victoria o derrota tras movimiento
+        if self.modo == "Escapa" and self.pos_jugador == self.pos_salida:
+            pts = max(10, int(1000 - self.tiempo))
+            final = self.puntaje + pts
+            self.terminar("victoria", final)
+            self.publicar(EVENTO_VICTORIA, f"¡Has escapado! Puntos ganados: {pts}\nTotal: {final}", pts)
+            return
+
+        self.verificar_colision_enemigo_jugador()
+
+    def campo_hacia_salida(self):
+        #E:
+        #S: array plano de distancias
+        #R:
+        #F: Devuelve el campo de distancias a la salida, recalculándolo solo si el jugador bloquea un camino más corto
+        if self.campo_salida is None:
+            self.campo_salida = calcular_campo_distancias(self.mapa, (self.pos_salida.fila, self.pos_salida.columna), (CAMINO, LIANA))
+        campo = self.campo_salida
+        fila, columna = self.pos_jugador.fila, self.pos_jugador.columna
+        distancia = campo[fila * self.columnas + columna]
+        if distancia < 0:
+            return campo
+        bloquea = False
+        for delta_fila, delta_columna in DIRECCIONES:
+            nueva_fila, nueva_columna = fila + delta_fila, columna + delta_columna
+            if 0 <= nueva_fila < self.filas and 0 <= nueva_columna < self.columnas and campo[nueva_fila * self.columnas + nueva_columna] == distancia + 1:
+                bloquea = True
+                break
+        if not bloquea:
+            return campo
+        if self.celda_bloqueo != (fila, columna):
+            self.campo_salida_bloqueado = calcular_campo_distancias(self.mapa, (self.pos_salida.fila, self.pos_salida.columna), (CAMINO, LIANA), obstaculo=(fila, columna))
+            self.celda_bloqueo = (fila, columna)
+        return self.campo_salida_bloqueado
+
+    def siguiente_paso_campo(self, inicio, campo, obstaculo=None):
+        #E: Posicion, array plano de distancias, Posicion o None
+        #S: Posicion
+        #R:
+        #F: Elige el vecino más cercano al objetivo del campo sin pisar el obstáculo (empates al azar)
+        if inicio == self.pos_salida:
+            return inicio
+        mejores = []
+        mejor_dist = -1
+        for delta_fila, delta_columna in DIRECCIONES:
+            nf, nc = inicio.fila + delta_fila, inicio.columna + delta_columna
+            if 0 <= nf < self.filas and 0 <= nc < self.columnas:
+                d = campo[nf * self.columnas + nc]
+                if d < 0 or (obstaculo is not None and obstaculo.fila == nf and obstaculo.columna == nc):
+                    continue
+                if mejor_dist < 0 or d < mejor_dist:
+                    mejor_dist = d
+                    mejores = [(nf, nc)]
+                elif d == mejor_dist:
+                    mejores.append((nf, nc))
+        if not mejores:
+            return inicio
+        nf, nc = self.rng.choice(mejores)
+        return Posicion(nf, nc)
+
+    def avanzar(self):
+        #E:
+        #S:
+        #R:
+        #F: Ejecuta un paso lógico (DURACION_TICK); los enemigos y la energía se mueven por turnos de DURACION_TURNO
+        if not self.jugando:
+            return
+        self.tick += 1
+        self.tiempo = self.tick * DURACION_TICK
+        ahora = self.tiempo
+        perfil = self.perfil
+        marca = time.perf_counter_ns() if perfil is not None else 0
+        while self.tiempo + 1e-9 >= (self.turnos + 1) * DURACION_TURNO:
+            self.turnos += 1
+            self.turno_enemigos()
+
+        for e in self.enemigos:
+            if e.muerto and self.modo == "Escapa" and e.tiempo_muerte is not None and (ahora - e.tiempo_muerte >= TIEMPO_REAPARICION_ENEMIGO):
+                self.revivir_enemigo(e, self.celdas_libres.elegir(self.rng, cerca_borde=True))
+        if perfil is not None:
+            marca = perfil.marcar("ia_enemigos", marca)
+        
+        if self.verificar_colision_enemigo_jugador():
+            return
+        if perfil is not None:
+            marca = perfil.marcar("colisiones", marca)
+
+        if self.trampas_por_celda:
+            for celda in [c for c in self.trampas_por_celda if c in self.enemigos_por_celda]:
+                victima = min(self.enemigos_por_celda[celda], key=lambda e: e.id_enemigo)
+                self.matar_enemigo(victima)
+                for t in self.trampas_por_celda.pop(celda):
+                    t.activa = False
+                    self.puntaje += 30
+                    self.publicar(EVENTO_TRAMPA, "Trampa activada +30 pts", 30)
+                    if ahora - t.tiempo_colocacion >= 0.6:
+                        self.trampas.remove(t)
+
+        expiracion = self.expiracion_trampas
+        while expiracion and ahora - expiracion[0][0] >= 0.6:
+            t = heapq.heappop(expiracion)[2]
+            #Si se activó en este mismo tick ya se quitó arriba
+            if not t.activa and t in self.trampas:
+                self.trampas.remove(t)
+        if perfil is not None:
+            marca = perfil.marcar("trampas", marca)
+
+        if self.modo == "Cazador" and self.pos_salida in self.enemigos_por_celda:
+            for e in sorted(self.enemigos_por_celda[self.pos_salida], key=lambda e: e.id_enemigo):
+                perdida = 40
+                self.puntaje = max(0, self.puntaje - perdida)
+                self.matar_enemigo(e)
+                self.publicar(EVENTO_ESCAPE, f"Enemigo escapó a la salida: -{perdida} pts", -perdida)
+        if perfil is not None:
+            perfil.marcar("escapes", marca)
+
+    def turno_enemigos(self):
+        #E:
+        #S:
+        #R:
+        #F: Recupera energía y mueve a los enemigos vivos un paso
+        if not self.corriendo:
+            self.energia = min(self.energia_max, self.energia + 2)
+        if self.modo == "Escapa":
+            if self.campo_persecucion is None:
+                self.campo_persecucion = CampoPersecucion(self.mapa, self.pos_jugador)
+            campo = self.campo_persecucion
+            campo.mover_raiz(self.pos_jugador)
+            sin_camino = []
+            for e in self.enemigos:
+                if not e.muerto:
+                    destino = campo.paso(e.posicion)
+                    if destino is None:
+                        sin_camino.append(e)
+                    else:
+                        self.ubicar_enemigo(e, destino)
+            #Los enemigos sin camino hasta el jugador se acercan en línea recta
+            if len(sin_camino) >= UMBRAL_MOVIMIENTO_LOTE and usar_numpy():
+                self.mover_enemigos_hacia(sin_camino, self.pos_jugador)
+            else:
+                for e in sin_camino:
+                    self.mover_enemigo_hacia(e, self.pos_jugador)
+            return
+        campo = self.campo_hacia_salida()
+        for e in self.enemigos:
+            if not e.muerto:
+                self.ubicar_enemigo(e, self.siguiente_paso_campo(e.posicion, campo, obstaculo=self.pos_jugador))
+
+    def mascara_enemigos(self):
+        #E:
+        #S: Matriz booleana numpy
+        #R: Requiere numpy
+        #F: Celdas transitables por enemigos (CAMINO, LIANA), calculada una vez por mapa
+        if self.mascara is None:
+            celdas = np.frombuffer(b"".join(bytes(fila) for fila in self.mapa), dtype=np.uint8).reshape(self.filas, self.columnas)
+            self.mascara = (celdas == CAMINO) | (celdas == LIANA)
+        return self.mascara
+
+    def mover_enemigos_hacia(self, enemigos, objetivo):
+        #E: Lista de Enemigo, Posicion
+        #S:
+        #R: Requiere numpy
+        #F: Versión en lote de mover_enemigo_hacia para hordas
+        filas_e, columnas_e = posiciones_en_arrays(enemigos)
+        filas_n, columnas_n = mover_enemigos_lote(filas_e, columnas_e, (objetivo.fila, objetivo.columna), self.mascara_enemigos())
+        for e, fila, columna in zip(enemigos, filas_n.tolist(), columnas_n.tolist()):
+            self.ubicar_enemigo(e, Posicion(fila, columna))
+
+    def aplicar_accion(self, accion):
+        #E: String ("w", "a", "s", "d", flechas, "correr" o "trampa")
+        #S: Bool (si la acción tuvo efecto)
+        #R:
+        #F: Punto único de entrada del jugador; si hay grabador, registra la acción con su tick
+        if not self.jugando:
+            return False
+        if accion in MOVIMIENTOS:
+            delta = MOVIMIENTOS[accion]
+            if self.grabador is not None:
+                self.grabador.registrar(self.tick, TECLA_CANONICA[delta])
+            return self.mover_jugador(*delta)
+        if self.grabador is not None:
+            self.grabador.registrar(self.tick, accion)
+        if accion == "correr":
+            return self.alternar_correr()
+        if accion == "trampa":
+            return self.colocar_trampa()
+        return False
+
+    def paso(self, acciones=()):
+        #E: Iterable de acciones ("w", "a", "s", "d", "correr", "trampa")
+        #S: Lista de eventos del paso
+        #R:
+        #F: Aplica las acciones del jugador y luego ejecuta un tick
+        for accion in acciones:
+            self.aplicar_accion(accion)
+        self.avanzar()
+        return self.tomar_eventos()
+
+    def es_celda_enemigo_valida(self, pos):
+        #E: Posicion
+        #S: Bool
+        #R:
+        #F: Verifica si un enemigo puede estar en esa celda
+        if not (0 <= pos.fila < self.filas and 0 <= pos.columna < self.columnas):
+            return False
+        tipo = self.mapa[pos.fila][pos.columna]
+        return tipo in (CAMINO, LIANA)
+
+    def mover_enemigo_hacia(self, enemigo, objetivo):
+        #E: Enemigo, Posicion
+        #S:
+        #R:
+        #F: Mueve al enemigo acercándolo al objetivo
+        mejor = enemigo.posicion
+        mejor_dist = abs(enemigo.posicion.fila - objetivo.fila) + abs(enemigo.posicion.columna - objetivo.columna)
+        for delta_fila, delta_columna in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            cand = Posicion(enemigo.posicion.fila + delta_fila, enemigo.posicion.columna + delta_columna)
+            if self.es_celda_enemigo_valida(cand):
+                d = abs(cand.fila - objetivo.fila) + abs(cand.columna - objetivo.columna)
+                if d < mejor_dist:
+                    mejor_dist = d
+                    mejor = cand
+        self.ubicar_enemigo(enemigo, mejor)
+
+    def mover_enemigo_lejos(self, enemigo, desde_pos):
+        #E: Enemigo, Posicion
+        #S:
+        #R:
+        #F: Mueve al enemigo alejándolo de la posición
+        mejor = enemigo.posicion
+        opciones = []
+        for delta_fila, delta_columna in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            cand = Posicion(enemigo.posicion.fila + delta_fila, enemigo.posicion.columna + delta_columna)
+            if self.es_celda_enemigo_valida(cand):
+                d = abs(cand.fila - desde_pos.fila) + abs(cand.columna - desde_pos.columna)
+                opciones.append((d, cand))
+        if opciones:
+            opciones.sort(key=lambda x: x[0], reverse=True)
+            mejor = opciones[0][1]
+        self.ubicar_enemigo(enemigo, mejor)
+
+def simular_partida(modo, semilla=None, max_ticks=2000, politica=None, num_enemigos=None, filas=FILAS, columnas=COLUMNAS):
+    #E: String, Int o None, Int, función(EstadoJuego) -> lista de acciones o None, Int o None, Enteros
+    #S: EstadoJuego al terminar
+    #R:
+    #F: Juega una partida sin interfaz; por defecto el jugador se mueve al azar
+    estado = EstadoJuego(modo, nombre_jugador="sim", semilla=semilla, num_enemigos=num_enemigos, filas=filas, columnas=columnas)
+    if politica is None:
+        teclas = ("w", "a", "s", "d")
+        politica = lambda e: (e.rng.choice(teclas),)
+    while estado.jugando and estado.tick < max_ticks:
+        estado.paso(politica(estado))
+    return estado
+
+class GrabadorPartida:
+    #E: String (ruta), EstadoJuego
+    #S:
+    #R:
+    #F: Escribe una repetición JSONL de solo anexado: cabecera, una línea por acción y un cierre
+    def __init__(self, ruta, estado):
+        self.ruta = ruta
+        self.archivo = open(ruta, "a", encoding="utf-8", buffering=1)
+        self.escribir({"v": VERSION_REPETICION, "modo": estado.modo, "semilla": estado.semilla,
+                       "filas": estado.filas, "columnas": estado.columnas, "algoritmo": ALGORITMO_LABERINTO,
+                       "tps": TICKS_LOGICOS_POR_SEGUNDO, "turno_ms": INTERVALO_TICK_MS, "enemigos": len(estado.enemigos),
+                       "jugador": estado.nombre_jugador})
+
+    def escribir(self, registro):
+        #E: Diccionario
+        #S:
+        #R:
+        #F: Agrega una línea compacta al archivo
+        self.archivo.write(json.dumps(registro, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def registrar(self, tick, accion):
+        #E: Int, String
+        #S:
+        #R:
+        #F: Registra una acción del jugador en el tick indicado
+        self.escribir({"t": tick, "a": accion})
+
+    def cerrar(self, estado):
+        #E: EstadoJuego
+        #S:
+        #R:
+        #F: Escribe el resultado final y cierra el archivo
+        if self.archivo.closed:
+            return
+        self.escribir({"fin": estado.tick, "resultado": estado.resultado, "puntaje": estado.puntaje})
+        self.archivo.close()
+
+def grabar_partida(estado):
+    #E: EstadoJuego
+    #S: GrabadorPartida
+    #R:
+    #F: Conecta un grabador nuevo al estado, en el directorio de repeticiones; conserva solo las MAX_REPETICIONES más recientes
+    os.makedirs(DIRECTORIO_REPETICIONES, exist_ok=True)
+    anteriores = sorted(nombre for nombre in os.listdir(DIRECTORIO_REPETICIONES) if nombre.endswith(".jsonl"))
+    for nombre in anteriores[:max(0, len(anteriores) - MAX_REPETICIONES + 1)]:
+        try:
+            os.remove(os.path.join(DIRECTORIO_REPETICIONES, nombre))
+        except OSError:
+            pass
+    nombre = f"{time.strftime('%Y%m%d-%H%M%S')}_{estado.modo}_{estado.semilla}.jsonl"
+    estado.grabador = GrabadorPartida(os.path.join(DIRECTORIO_REPETICIONES, nombre), estado)
+    return estado.grabador
+
+def leer_repeticion(ruta):
+    #E: String
+    #S: Tupla (cabecera, acciones por tick, cierre o None)
+    #R: Archivo generado por GrabadorPartida
+    #F: Lee una repetición JSONL
+    acciones = {}
+    cierre = None
+    with open(ruta, "r", encoding="utf-8") as f:
+        cabecera = json.loads(f.readline())
+        for linea in f:
+            registro = json.loads(linea)
+            if "fin" in registro:
+                cierre = registro
+            else:
+                acciones.setdefault(registro["t"], []).append(registro["a"])
+    if cabecera.get("v") != VERSION_REPETICION:
+        raise ValueError(f"Versión de repetición no soportada: {cabecera.get('v')}")
+    return cabecera, acciones, cierre
+
+def reproducir_partida(ruta, max_ticks=None):
+    #E: String, Int o None
+    #S: Tupla (EstadoJuego final, cierre grabado o None)
+    #R: El tablero debe generarse con el mismo algoritmo que al grabar
+    #F: Re-ejecuta una repetición sin interfaz, a máxima velocidad
+    cabecera, acciones, cierre = leer_repeticion(ruta)
+    if cabecera["algoritmo"] != ALGORITMO_LABERINTO:
+        raise ValueError("La repetición se grabó con otro algoritmo de laberinto")
+    if (cabecera.get("tps", 4), cabecera.get("turno_ms", 250)) != (TICKS_LOGICOS_POR_SEGUNDO, INTERVALO_TICK_MS):
+        raise ValueError("La repetición se grabó con otra frecuencia de ticks")
+    estado = EstadoJuego(cabecera["modo"], nombre_jugador=cabecera.get("jugador"), semilla=cabecera["semilla"], num_enemigos=cabecera.get("enemigos"),
+                         filas=cabecera["filas"], columnas=cabecera["columnas"])
+    if max_ticks is None:
+        max_ticks = cierre["fin"] if cierre else max(acciones, default=0)
+    while estado.jugando:
+        for accion in acciones.get(estado.tick, ()):
+            estado.aplicar_accion(accion)
+        if estado.tick >= max_ticks:
+            break
+        estado.avanzar()
+    estado.tomar_eventos()
+    return estado, cierre
+
+def instante_desde_restante(ahora, duracion, restante):
+    #E: Floats (tiempo actual, duración del temporizador, segundos restantes)
+    #S: Float
+    #R:
+    #F: Instante en que empezó un temporizador; se redondea al tick porque el reloj lógico solo toma valores tick * DURACION_TICK
+    return round((ahora - duracion + restante) / DURACION_TICK) * DURACION_TICK
+
+def guardar_partida(estado, ruta=ARCHIVO_PARTIDA):
+    #E: EstadoJuego, String
+    #S: Int (bytes escritos)
+    #R:
+    #F: Instantánea binaria: cabecera, nombre, generador aleatorio, grilla uint8 de casillas (una fila tras otra), componentes
+    #   del campo de persecución si los hay y registros empaquetados de enemigos y trampas; los temporizadores se guardan
+    #   como tiempo restante o transcurrido
+    ahora = estado.tiempo
+    _, interno, gauss = estado.rng.getstate()
+    nombre = (estado.nombre_jugador or "").encode("utf-8")
+    recarga = max(0.0, TIEMPO_RECARGA_TRAMPA - (ahora - estado.tiempo_ultima_trampa))
+    campo = estado.campo_persecucion
+    banderas = PARTIDA_JUGANDO * estado.jugando | PARTIDA_CORRIENDO * estado.corriendo
+    if campo is not None:
+        banderas |= PARTIDA_COMPONENTES | PARTIDA_BOSQUE * campo.es_bosque
+    partes = [struct.pack(FORMATO_CABECERA_PARTIDA, MAGIA_PARTIDA, VERSION_PARTIDA, MODOS_PARTIDA.index(estado.modo),
+                          banderas, RESULTADOS_PARTIDA.index(estado.resultado), estado.filas,
+                          estado.columnas, estado.semilla, estado.tick, estado.turnos, estado.puntaje, estado.energia,
+                          estado.energia_max, estado.pos_jugador.fila, estado.pos_jugador.columna, recarga,
+                          float("nan") if gauss is None else gauss, len(estado.enemigos), len(estado.trampas), len(nombre)),
+              nombre, struct.pack(FORMATO_ESTADO_RNG, *interno)]
+    partes.extend(estado.mapa)
+    if campo is not None:
+        inicio = sum(len(parte) for parte in partes)
+        partes.append(bytes(-inicio % 4))
+        componentes = array("i", campo.componentes)
+        if sys.byteorder != "little":
+            componentes.byteswap()
+        partes.append(componentes.tobytes())
+    for e in estado.enemigos:
+        reaparece = float("nan") if e.tiempo_muerte is None else TIEMPO_REAPARICION_ENEMIGO - (ahora - e.tiempo_muerte)
+        partes.append(struct.pack(FORMATO_ENEMIGO, e.id_enemigo, e.posicion.fila, e.posicion.columna, e.muerto, reaparece))
+    for t in estado.trampas:
+        partes.append(struct.pack(FORMATO_TRAMPA, t.posicion.fila, t.posicion.columna, t.activa, ahora - t.tiempo_colocacion))
+    datos = b"".join(partes)
+    escribir_atomico(ruta, datos)
+    return len(datos)
+
+def cargar_partida(ruta=ARCHIVO_PARTIDA, bus=None):
+    #E: String, BusEventos o None
+    #S: EstadoJuego
+    #R: Archivo escrito por guardar_partida con la misma VERSION_PARTIDA
+    #F: Mapea el archivo en memoria (copia privada: los cambios no llegan al disco) y usa las secciones de casillas y de
+    #   componentes directamente, sin parsearlas; solo se desempaquetan la cabecera y los registros. El índice de celdas
+    #   libres se reconstruye al primer uso. Un archivo ajeno, de otra versión o truncado da ValueError
+    import mmap
+    tamano_cabecera = struct.calcsize(FORMATO_CABECERA_PARTIDA)
+    with open(ruta, "rb") as f:
+        if os.fstat(f.fileno()).st_size < len(MAGIA_PARTIDA) + 2:
+            raise ValueError(f"{ruta} no es una partida guardada")
+        datos = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    if datos[:len(MAGIA_PARTIDA)] != MAGIA_PARTIDA:
+        raise ValueError(f"{ruta} no es una partida guardada")
+    version = struct.unpack_from("<H", datos, len(MAGIA_PARTIDA))[0]
+    if version != VERSION_PARTIDA:
+        raise ValueError(f"Versión de partida guardada no soportada: {version}")
+    if len(datos) < tamano_cabecera:
+        raise ValueError(f"{ruta} está incompleto")
+    (_, _, modo, banderas, resultado, filas, columnas, semilla, tick, turnos, puntaje, energia, energia_max,
+     fila_jugador, columna_jugador, recarga, gauss, num_enemigos, num_trampas, largo_nombre) = struct.unpack_from(FORMATO_CABECERA_PARTIDA, datos)
+    tamano_enemigo = struct.calcsize(FORMATO_ENEMIGO)
+    tamano_trampa = struct.calcsize(FORMATO_TRAMPA)
+    #Tamaño esperado antes de tocar las secciones: los cortes a mitad de sección no llegan a unpack_from ni a cast
+    inicio_mapa = tamano_cabecera + largo_nombre + struct.calcsize(FORMATO_ESTADO_RNG)
+    fin_mapa = inicio_mapa + filas * columnas
+    if banderas & PARTIDA_COMPONENTES:
+        fin_mapa += -fin_mapa % 4 + 4 * filas * columnas
+    if len(datos) != fin_mapa + num_enemigos * tamano_enemigo + num_trampas * tamano_trampa:
+        raise ValueError(f"{ruta} está incompleto")
+    inicio = tamano_cabecera
+    nombre = datos[inicio:inicio + largo_nombre].decode("utf-8")
+    inicio += largo_nombre
+    interno = struct.unpack_from(FORMATO_ESTADO_RNG, datos, inicio)
+    inicio += struct.calcsize(FORMATO_ESTADO_RNG)
+    vista = memoryview(datos)
+    mapa = [vista[inicio + fila * columnas:inicio + (fila + 1) * columnas] for fila in range(filas)]
+    inicio += filas * columnas
+    componentes = None
+    if banderas & PARTIDA_COMPONENTES:
+        inicio += -inicio % 4
+        componentes = vista[inicio:inicio + 4 * filas * columnas].cast("i")
+        if sys.byteorder != "little":
+            componentes = array("i", componentes)
+            componentes.byteswap()
+        inicio += 4 * filas * columnas
+
+    estado = EstadoJuego(MODOS_PARTIDA[modo], nombre_jugador=nombre or None, tablero={"semilla": semilla, "mapa": mapa, "spawns": []}, bus=bus)
+    estado.rng.setstate((3, interno, None if gauss != gauss else gauss))
+    estado.pos_jugador = Posicion(fila_jugador, columna_jugador)
+    estado.tick = tick
+    estado.turnos = turnos
+    estado.tiempo = ahora = tick * DURACION_TICK
+    estado.puntaje = puntaje
+    estado.energia = energia
+    estado.energia_max = energia_max
+    estado.jugando = bool(banderas & PARTIDA_JUGANDO)
+    estado.corriendo = bool(banderas & PARTIDA_CORRIENDO)
+    estado.resultado = RESULTADOS_PARTIDA[resultado]
+    if componentes is not None:
+        estado.campo_persecucion = CampoPersecucion(mapa, estado.pos_jugador, componentes=componentes, es_bosque=bool(banderas & PARTIDA_BOSQUE))
+    if recarga > 0:
+        estado.tiempo_ultima_trampa = instante_desde_restante(ahora, TIEMPO_RECARGA_TRAMPA, recarga)
+
+    for id_enemigo, fila, columna, muerto, reaparece in struct.iter_unpack(FORMATO_ENEMIGO, datos[inicio:inicio + num_enemigos * tamano_enemigo]):
+        e = Enemigo(id_enemigo, Posicion(fila, columna))
+        if reaparece == reaparece:
+            e.tiempo_muerte = instante_desde_restante(ahora, TIEMPO_REAPARICION_ENEMIGO, reaparece)
+        e.muerto = bool(muerto)
+        estado.enemigos.append(e)
+        if not e.muerto:
+            estado.enemigos_por_celda.setdefault(e.posicion, []).append(e)
+    inicio += num_enemigos * tamano_enemigo
+
+    for fila, columna, activa, edad in struct.iter_unpack(FORMATO_TRAMPA, datos[inicio:]):
+        t = Trampa(Posicion(fila, columna), instante_desde_restante(ahora, 0.0, -edad))
+        t.activa = bool(activa)
+        estado.trampas.append(t)
+        if t.activa:
+            estado.trampas_por_celda.setdefault(t.posicion, []).append(t)
+        estado.secuencia_trampas += 1
+        if ahora - t.tiempo_colocacion < 0.6:
+            heapq.heappush(estado.expiracion_trampas, (t.tiempo_colocacion, estado.secuencia_trampas, t))
+    return estado
+
+class SesionRemota:
+    #E: StreamWriter de asyncio, función(EventoJuego) o None para guardar puntajes
+    #S:
+    #R:
+    #F: Una partida del servidor: su estado, su cola de entrada y lo último enviado al cliente, para mandar solo lo que cambia
+    def __init__(self, escritor, guardar=None):
+        self.escritor = escritor
+        self.guardar = guardar
+        self.estado = None
+        self.cola_entrada = ColaEntrada()
+        self.enviado = {}
+        self.enemigos_enviados = {}
+        self.aplicadas = []
+        self.atrasada = False
+        self.reenviar_mapa = False
+
+    def enviar(self, mensaje):
+        #E: Diccionario
+        #S: Bool (si se envió)
+        #R:
+        #F: Escribe una línea JSON sin esperar; si el cliente no lee y el buffer pasa el límite, descarta y pide resincronizar
+        transporte = self.escritor.transport
+        if transporte.is_closing():
+            return False
+        if transporte.get_write_buffer_size() > LIMITE_BUFFER_SESION:
+            self.atrasada = True
+            return False
+        self.escritor.write((json.dumps(mensaje, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8"))
+        return True
+
+    def empezar(self, estado):
+        #E: EstadoJuego
+        #S:
+        #R:
+        #F: Manda el mapa completo una sola vez y luego todas las entidades como primer delta
+        self.estado = estado
+        if self.guardar is not None:
+            estado.bus.suscribir(self.guardar, EVENTOS_FIN)
+        self.cola_entrada.vaciar()
+        self.aplicadas = []
+        self.enviado = {}
+        self.enemigos_enviados = {}
+        self.reenviar_mapa = not self.enviar(self.mensaje_inicio())
+        self.enviar_delta([])
+
+    def mensaje_inicio(self):
+        #E:
+        #S: Diccionario
+        #R:
+        #F: Datos fijos de la partida y el mapa completo tal como está ahora, en base64
+        import base64
+        estado = self.estado
+        return {"tipo": "inicio", "modo": estado.modo, "semilla": estado.semilla, "filas": estado.filas, "columnas": estado.columnas,
+                "salida": [estado.pos_salida.fila, estado.pos_salida.columna],
+                "mapa": base64.b64encode(b"".join(estado.mapa)).decode("ascii")}
+
+    def delta(self):
+        #E:
+        #S: Diccionario con lo que cambió desde el último envío (vacío si nada)
+        #R:
+        #F: Compara jugador, puntaje, energía, trampas y enemigos (None = muerto) contra lo enviado y lo actualiza
+        estado = self.estado
+        cambios = {}
+        actual = {"jugador": (estado.pos_jugador.fila, estado.pos_jugador.columna), "puntaje": estado.puntaje,
+                  "energia": estado.energia, "corriendo": estado.corriendo,
+                  "trampas": tuple((t.posicion.fila, t.posicion.columna) for t in estado.trampas if t.activa)}
+        for clave, valor in actual.items():
+            if self.enviado.get(clave) != valor:
+                self.enviado[clave] = cambios[clave] = valor
+        enemigos = {}
+        for e in estado.enemigos:
+            valor = None if e.muerto else (e.posicion.fila, e.posicion.columna)
+            if self.enemigos_enviados.get(e.id_enemigo, 0) != valor:
+                self.enemigos_enviados[e.id_enemigo] = enemigos[e.id_enemigo] = valor
+        if enemigos:
+            cambios["enemigos"] = enemigos
+        return cambios
 
-def guardar_puntajes(datos):
-    #E: Diccionario
+    def enviar_delta(self, eventos):
+        #E: Lista de EventoJuego
+        #S:
+        #R:
+        #F: Envía el delta del tick (si hay algo), con las casillas que cambiaron como [fila, columna, tipo]; tras un atraso
+        #   reenvía el mapa completo si se perdió el inicio o algún cambio de casilla, y todas las entidades
+        if self.atrasada:
+            if self.escritor.transport.get_write_buffer_size() > LIMITE_BUFFER_SESION // 2:
+                return
+            self.atrasada = False
+            self.enviado = {}
+            self.enemigos_enviados = {}
+            if self.reenviar_mapa and self.enviar(self.mensaje_inicio()):
+                self.reenviar_mapa = False
+        mensaje = self.delta()
+        if eventos:
+            mapa = self.estado.mapa
+            celdas = [[e.posicion.fila, e.posicion.columna, mapa[e.posicion.fila][e.posicion.columna]] for e in eventos if e.tipo == EVENTO_CELDA]
+            avisos = [[e.tipo, e.texto] for e in eventos if e.tipo != EVENTO_CELDA]
+            if celdas:
+                mensaje["celdas"] = celdas
+            if avisos:
+                mensaje["eventos"] = avisos
+        if not self.estado.jugando:
+            mensaje["fin"] = self.estado.resultado
+        if mensaje:
+            mensaje["tipo"] = "delta"
+            mensaje["tick"] = self.estado.tick
+            if not self.enviar(mensaje):
+                self.enviado = {}
+                self.enemigos_enviados = {}
+                self.reenviar_mapa = self.reenviar_mapa or "celdas" in mensaje
+
+    def tick(self, perfil):
+        #E: PerfilTick
+        #S:
+        #R:
+        #F: Aplica la entrada que toca, avanza un paso lógico y envía el delta; registra la latencia de cada entrada hasta el envío
+        estado = self.estado
+        if estado is None:
+            return
+        if not estado.jugando:
+            #El fin pudo perderse mientras el cliente no leía
+            if self.atrasada:
+                self.enviar_delta([])
+            return
+        for accion, instante in self.cola_entrada.tomar_paso():
+            estado.aplicar_accion(accion)
+            self.aplicadas.append(instante)
+        estado.avanzar()
+        self.enviar_delta(estado.tomar_eventos())
+        if self.aplicadas:
+            ahora = time.perf_counter_ns()
+            for instante in self.aplicadas:
+                perfil.registrar("entrada", ahora - instante)
+            self.aplicadas = []
+
+class ServidorJuego:
+    #E: Enteros (dimensiones de los tableros), Bool
     #S:
     #R:
-    #F: Guarda los puntajes en archivo JSON
-    with open(ARCHIVO_PUNTAJES, "w", encoding="utf-8") as f:
-        json.dump(datos, f, ensure_ascii=False, indent=2)
+    #F: Muchas partidas independientes en un solo loop de asyncio con un paso fijo compartido; protocolo de líneas JSON
+    def __init__(self, filas=FILAS, columnas=COLUMNAS, guardar_puntajes=True):
+        self.sesiones = set()
+        self.pool_tableros = PoolTableros(capacidad=TABLEROS_SERVIDOR, filas=filas, columnas=columnas)
+        self.planificador = PlanificadorFijo(intervalo_render=DURACION_TICK)
+        self.guardar_puntajes = guardar_puntajes
+        self.perfil = PerfilTick()
+        self.ticks = 0
+        self.pasos_descartados = 0
+        self.inicio_cpu = time.process_time()
+        self.inicio_reloj = time.perf_counter()
 
-def actualizar_puntajes(modo, nombre, puntaje):
-    #E: Strings, int
+    def guardar(self, sesion):
+        #E: SesionRemota
+        #S: función(EventoJuego)
+        #R:
+        #F: Suscriptor de fin de partida que guarda el puntaje final de la sesión
+        return lambda evento: actualizar_puntajes(sesion.estado.modo, sesion.estado.nombre_jugador or "anónimo", evento.total)
+
+    async def atender(self, lector, escritor):
+        #E: StreamReader, StreamWriter
+        #S:
+        #R:
+        #F: Una conexión = una sesión. Mensajes: {"tipo": "nueva", "modo", "nombre"}, {"tipo": "accion", "accion"} y
+        #   {"tipo": "estadisticas", "reiniciar"}
+        import asyncio
+        sesion = SesionRemota(escritor)
+        if self.guardar_puntajes:
+            sesion.guardar = self.guardar(sesion)
+        self.sesiones.add(sesion)
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                try:
+                    mensaje = json.loads(linea)
+                    self.recibir(sesion, mensaje)
+                except (ValueError, KeyError, TypeError) as error:
+                    sesion.enviar({"tipo": "error", "texto": str(error)})
+        except (ConnectionError, asyncio.CancelledError):
+            #Al cerrar el servidor las conexiones se cancelan; terminar normalmente evita un error por cada una
+            pass
+        finally:
+            self.sesiones.discard(sesion)
+            escritor.close()
+
+    def recibir(self, sesion, mensaje):
+        #E: SesionRemota, Diccionario
+        #S:
+        #R:
+        #F: Atiende un mensaje del cliente; las acciones se encolan y se aplican en el próximo paso lógico
+        tipo = mensaje["tipo"]
+        if tipo == "accion":
+            accion = mensaje["accion"]
+            if sesion.estado is not None and sesion.estado.jugando:
+                sesion.cola_entrada.agregar(TECLA_CANONICA[MOVIMIENTOS[accion]] if accion in MOVIMIENTOS else accion)
+        elif tipo == "nueva":
+            modo = mensaje.get("modo", "Escapa")
+            if modo not in MODOS_PARTIDA:
+                raise ValueError(f"Modo desconocido: {modo}")
+            sesion.empezar(EstadoJuego(modo, nombre_jugador=mensaje.get("nombre"), tablero=self.pool_tableros.obtener(modo)))
+        elif tipo == "estadisticas":
+            sesion.enviar(self.estadisticas())
+            if mensaje.get("reiniciar"):
+                self.perfil = PerfilTick()
+                self.ticks = 0
+                self.pasos_descartados = self.planificador.pasos_descartados
+                self.inicio_cpu = time.process_time()
+                self.inicio_reloj = time.perf_counter()
+        else:
+            raise ValueError(f"Mensaje desconocido: {tipo}")
+
+    def estadisticas(self):
+        #E:
+        #S: Diccionario
+        #R:
+        #F: Sesiones, ticks, pasos descartados por atraso, uso de CPU, aciertos del pool de tableros y percentiles de tick, retraso y latencia de entrada
+        segundos = time.perf_counter() - self.inicio_reloj
+        return {"tipo": "estadisticas", "sesiones": len(self.sesiones), "ticks": self.ticks, "segundos": segundos,
+                "descartados": self.planificador.pasos_descartados - self.pasos_descartados,
+                "cpu": (time.process_time() - self.inicio_cpu) / segundos if segundos > 0 else 0.0,
+                "tableros": self.pool_tableros.estadisticas(), "fases": self.perfil.resumen()}
+
+    async def ciclo(self):
+        #E:
+        #S:
+        #R:
+        #F: Loop compartido: cada paso lógico avanza todas las sesiones; "tick" mide el costo del paso y "retraso" cuánto
+        #   tarde empezó respecto de su momento
+        import asyncio
+        planificador = self.planificador
+        planificador.reiniciar()
+        while True:
+            pasos, _ = planificador.avanzar()
+            if pasos:
+                self.perfil.registrar("retraso", max(0, int(planificador.acumulado * 1e9)))
+            for _ in range(pasos):
+                inicio = time.perf_counter_ns()
+                perfil = self.perfil
+                for sesion in list(self.sesiones):
+                    sesion.tick(perfil)
+                self.ticks += 1
+                perfil.registrar("tick", time.perf_counter_ns() - inicio)
+            await asyncio.sleep(planificador.espera_ms() / 1000)
+
+    async def servir(self, anfitrion, puerto):
+        #E: String, Int (0 = puerto libre cualquiera)
+        #S:
+        #R:
+        #F: Abre el socket, anuncia el puerto en la salida estándar y corre el loop de ticks hasta que se cancele
+        import asyncio
+        servidor = await asyncio.start_server(self.atender, anfitrion, puerto)
+        print(f"Servidor escuchando en {anfitrion}:{servidor.sockets[0].getsockname()[1]}", flush=True)
+        self.pool_tableros.rellenar()
+        try:
+            async with servidor:
+                await self.ciclo()
+        finally:
+            self.pool_tableros.cerrar()
+
+def servir(puerto=PUERTO_SERVIDOR, anfitrion="127.0.0.1", filas=FILAS, columnas=COLUMNAS):
+    #E: Int, String, Enteros
     #S:
     #R:
-    #F: Actualiza la lista de mejores puntajes
-    datos = cargar_puntajes()
-    lista = datos.get(modo, [])
-    lista.append({"name": nombre, "score": puntaje})
-    lista = sorted(lista, key=lambda x: x["score"], reverse=True)[:5]
-    datos[modo] = lista
-    guardar_puntajes(datos)
+    #F: Modo servidor sin interfaz (termina con Ctrl+C); al salir vuelca el almacén de puntajes, como la interfaz
+    import asyncio
+    try:
+        asyncio.run(ServidorJuego(filas, columnas).servir(anfitrion, puerto))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        almacen_puntajes().compactar()
 
 class AplicacionJuego:
-    #E: Tk root
+    #E: Tk root, Enteros (dimensiones del tablero)
     #S:
-    #R:
-    #F: Clase principal de la interfaz y lógica del juego
-    def __init__(self, root):
+    #R: Dimensiones impares
+    #F: Interfaz Tk; dibuja y traduce la entrada hacia un EstadoJuego, con una cámara que sigue al jugador
+    def __init__(self, root, filas=FILAS, columnas=COLUMNAS):
+        importar_gui()
         self.root = root
         root.title("Escapa / Cazador - Proyecto")
 
         self.nombre_jugador = None
-        self.modo = None
-        self.mapa = None
-        self.pos_jugador = Posicion(1, 1)
-        self.pos_salida = Posicion(FILAS - 2, COLUMNAS - 2)
-        self.enemigos = []
-        self.trampas = []
-        self.tiempo_ultima_trampa = -999.0
-        self.puntaje = 0
-        self.tiempo_inicio = None
-        self.jugando = False
-        self.energia = 100
-        self.energia_max = 100
-        self.corriendo = False
+        self.estado = None
+        self.puntaje_guardado = False
+        self.filas = filas
+        self.columnas = columnas
+        self.vista_filas = min(VISTA_FILAS, filas)
+        self.vista_columnas = min(VISTA_COLUMNAS, columnas)
+        self.bloques = {}
+        self.bloques_libres = []
+        self.imagenes_libres = []
+        self.imagen_celdas = None
+        self.colores_hex = {}
+        self.pool_tableros = PoolTableros(capacidad=2, filas=filas, columnas=columnas)
+        self.perfil = PerfilTick() if PERFILAR else None
+        self.id_overlay = None
+        self.planificador = PlanificadorFijo()
+        self.cola_entrada = ColaEntrada()
+        self.entradas_sin_dibujar = []
+        self.avisos = deque()
+        self.avisos_cambiados = False
+        self.bus = BusEventos()
+        self.bus.perfil = self.perfil
+        self.bus.suscribir(self.mostrar_aviso, EVENTOS_AVISO)
+        self.bus.suscribir(self.guardar_puntaje, EVENTOS_FIN)
+        self.bus.suscribir(self.al_cambiar_celda, (EVENTO_CELDA,))
+        self.registro_eventos = RegistroEventos(ARCHIVO_EVENTOS) if ARCHIVO_EVENTOS else None
+        if self.registro_eventos is not None:
+            self.bus.suscribir(self.registro_eventos.escribir)
+        self.pasos_ventana = 0
+        self.cuadros_ventana = 0
+        self.inicio_ventana = self.planificador.reloj()
 
         self.frame_superior = tk.Frame(root)
         self.frame_superior.pack(side=tk.TOP, fill=tk.X)
@@ -201,11 +2459,14 @@ class AplicacionJuego:
         tk.Button(self.frame_superior, text="Modo Escapa", command=lambda: self.iniciar_modo("Escapa")).pack(side=tk.LEFT, padx=4)
         tk.Button(self.frame_superior, text="Modo Cazador", command=lambda: self.iniciar_modo("Cazador")).pack(side=tk.LEFT, padx=4)
         tk.Button(self.frame_superior, text="Ver Top 5", command=self.mostrar_top5).pack(side=tk.LEFT, padx=4)
+        tk.Button(self.frame_superior, text="Guardar", command=self.guardar).pack(side=tk.LEFT, padx=4)
+        tk.Button(self.frame_superior, text="Continuar", command=self.continuar).pack(side=tk.LEFT, padx=4)
         tk.Button(self.frame_superior, text="Salir", command=root.quit).pack(side=tk.RIGHT, padx=4)
 
-        ancho_canvas = COLUMNAS * TAMANO_CELDA
-        alto_canvas = FILAS * TAMANO_CELDA
-        self.canvas = tk.Canvas(self.frame_izquierdo, width=ancho_canvas, height=alto_canvas, bg="black")
+        ancho_canvas = self.vista_columnas * TAMANO_CELDA
+        alto_canvas = self.vista_filas * TAMANO_CELDA
+        self.canvas = tk.Canvas(self.frame_izquierdo, width=ancho_canvas, height=alto_canvas, bg="black", highlightthickness=0,
+                                xscrollincrement=TAMANO_CELDA, yscrollincrement=TAMANO_CELDA)
         self.canvas.pack()
 
         self.lbl_nombre = tk.Label(self.frame_derecho, text="Jugador: -")
@@ -228,8 +2489,12 @@ class AplicacionJuego:
         root.bind("<Key>", self.al_presionar_tecla)
 
         self.dibujar_inicio()
-        cargar_puntajes()
-        self.root.after(INTERVALO_TICK_MS, self.ciclo_juego)
+        self.pool_tableros.rellenar()
+        self.root.after(self.planificador.espera_ms(), self.ciclo_juego)
+
+    @property
+    def jugando(self):
+        return self.estado is not None and self.estado.jugando
 
     def dibujar_inicio(self):
         #E:
@@ -237,60 +2502,274 @@ class AplicacionJuego:
         #R:
         #F: Dibuja pantalla inicial
         self.canvas.delete("all")
-        self.canvas.create_text(COLUMNAS * TAMANO_CELDA // 2, FILAS * TAMANO_CELDA // 2, text="Registra y elige modo", fill="white", font=("Arial", 16))
+        self.reiniciar_items_canvas()
+        self.canvas.xview_moveto(0)
+        self.canvas.yview_moveto(0)
+        self.canvas.create_text(self.vista_columnas * TAMANO_CELDA // 2, self.vista_filas * TAMANO_CELDA // 2, text="Registra y elige modo", fill="white", font=("Arial", 16))
 
-    def dibujar_mapa(self):
+    def reiniciar_items_canvas(self):
+        #E:
+        #S:
+        #R:
+        #F: Olvida los IDs de items del canvas (tras un delete("all"))
+        self.imagenes_libres.extend(imagen for imagen, _ in self.bloques.values())
+        self.imagenes_libres.extend(imagen for imagen, _ in self.bloques_libres)
+        self.bloques = {}
+        self.bloques_libres = []
+        self.camara = None
+        self.id_jugador = None
+        self.ids_enemigos = {}
+        self.ids_trampas = {}
+        self.id_overlay = None
+        self.id_avisos = None
+        self.coords_items = {}
+        self.items_ocultos = set()
+        self.ops_canvas = 0
+        self.ops_ultimo_cuadro = 0
+
+    def color_celda(self, tipo):
+        #E: Int
+        #S: String
+        #R:
+        #F: Color de relleno de una casilla según su tipo y el modo
+        if tipo == PARED: return "gray20"
+        if tipo == CAMINO: return "lightgray"
+        if tipo == TUNEL:
+            return "sandybrown" if self.estado.modo == "Escapa" else "saddlebrown"
+        if tipo == LIANA:
+            return "darkgreen" if self.estado.modo == "Escapa" else "olivedrab"
+        return "black"
+
+    def color_hex(self, nombre):
+        #E: String (nombre de color Tk)
+        #S: String "#rrggbb"
+        #R:
+        #F: Traduce un color a hexadecimal para PhotoImage.put, con caché
+        hexa = self.colores_hex.get(nombre)
+        if hexa is None:
+            rojo, verde, azul = self.root.winfo_rgb(nombre)
+            hexa = f"#{rojo >> 8:02x}{verde >> 8:02x}{azul >> 8:02x}"
+            self.colores_hex[nombre] = hexa
+        return hexa
+
+    def color_casilla(self, fila, columna):
+        #E: Enteros
+        #S: String "#rrggbb"
+        #R:
+        #F: Color de la capa estática en una casilla (la salida va pintada en la capa)
+        if fila == self.estado.pos_salida.fila and columna == self.estado.pos_salida.columna:
+            return self.color_hex("gold")
+        return self.color_hex(self.color_celda(self.estado.mapa[fila][columna]))
+
+    def mover_item(self, item, x1, y1, x2, y2):
+        #E: Int, enteros
+        #S:
+        #R:
+        #F: Mueve un item del canvas solo si sus coordenadas cambiaron, y lo vuelve a mostrar si estaba oculto
+        if item in self.items_ocultos:
+            self.canvas.itemconfig(item, state="normal")
+            self.items_ocultos.discard(item)
+            self.ops_canvas += 1
+        coords = (x1, y1, x2, y2)
+        if self.coords_items.get(item) != coords:
+            self.canvas.coords(item, x1, y1, x2, y2)
+            self.coords_items[item] = coords
+            self.ops_canvas += 1
+
+    def ocultar_item(self, item):
+        #E: Int
+        #S:
+        #R:
+        #F: Oculta un item del canvas sin borrarlo (para reusarlo), solo si no estaba oculto
+        if item not in self.items_ocultos:
+            self.canvas.itemconfig(item, state="hidden")
+            self.items_ocultos.add(item)
+            self.ops_canvas += 1
+
+    def crear_capa_estatica(self):
         #E:
         #S:
         #R:
-        #F: Dibuja el estado actual del juego
+        #F: Crea los bloques visibles de la capa estática (más un margen) y los sprites fijos
         self.canvas.delete("all")
-        for fila in range(FILAS):
-            for columna in range(COLUMNAS):
-                x1 = columna * TAMANO_CELDA
-                y1 = fila * TAMANO_CELDA
-                x2 = x1 + TAMANO_CELDA
-                y2 = y1 + TAMANO_CELDA
-                tipo = self.mapa[fila][columna]
-                color = "black"
-                if tipo == PARED: color = "gray20"
-                elif tipo == CAMINO: color = "lightgray"
-                elif tipo == TUNEL:
-                    color = "sandybrown" if self.modo == "Escapa" else "saddlebrown"
-                elif tipo == LIANA:
-                    color = "darkgreen" if self.modo == "Escapa" else "olivedrab"
-                self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="black")
-        
-        ex1 = self.pos_salida.columna * TAMANO_CELDA
-        ey1 = self.pos_salida.fila * TAMANO_CELDA
-        self.canvas.create_rectangle(ex1, ey1, ex1 + TAMANO_CELDA, ey1 + TAMANO_CELDA, fill="gold", outline="black")
+        self.reiniciar_items_canvas()
+        estado = self.estado
+        self.canvas.configure(scrollregion=(0, 0, estado.columnas * TAMANO_CELDA, estado.filas * TAMANO_CELDA))
+        self.actualizar_camara()
 
-        for t in self.trampas:
-            x = t.posicion.columna * TAMANO_CELDA + TAMANO_CELDA // 4
-            y = t.posicion.fila * TAMANO_CELDA + TAMANO_CELDA // 4
-            self.canvas.create_oval(x, y, x + TAMANO_CELDA // 2, y + TAMANO_CELDA // 2, fill="red")
+        for e in estado.enemigos:
+            self.ids_enemigos[e.id_enemigo] = self.canvas.create_rectangle(0, 0, 0, 0, fill="blue")
+        self.id_jugador = self.canvas.create_oval(0, 0, 0, 0, fill="orange")
+        self.id_avisos = self.canvas.create_text(0, 0, anchor="sw", text="", fill="white", font=("Arial", 11, "bold"))
+        self.ubicar_avisos()
+        if self.perfil is not None:
+            fila0, columna0 = self.camara
+            self.id_overlay = self.canvas.create_text(columna0 * TAMANO_CELDA + 4, fila0 * TAMANO_CELDA + 2, anchor="nw", text="", fill="yellow", font=("Courier", 9))
 
-        for e in self.enemigos:
-            if not e.muerto:
+    def actualizar_camara(self):
+        #E:
+        #S: Bool (si la cámara se movió)
+        #R:
+        #F: Centra la vista en el jugador sin salirse del tablero y prepara los bloques que entran en pantalla
+        estado = self.estado
+        fila0 = min(max(0, estado.pos_jugador.fila - self.vista_filas // 2), estado.filas - self.vista_filas)
+        columna0 = min(max(0, estado.pos_jugador.columna - self.vista_columnas // 2), estado.columnas - self.vista_columnas)
+        if self.camara == (fila0, columna0):
+            return False
+        self.camara = (fila0, columna0)
+        self.canvas.xview_moveto(columna0 / estado.columnas)
+        self.canvas.yview_moveto(fila0 / estado.filas)
+        self.ops_canvas += 2
+        if self.id_overlay is not None:
+            self.canvas.coords(self.id_overlay, columna0 * TAMANO_CELDA + 4, fila0 * TAMANO_CELDA + 2)
+            self.ops_canvas += 1
+        if self.id_avisos is not None:
+            self.ubicar_avisos()
+
+        self.actualizar_bloques()
+        return True
+
+    def actualizar_bloques(self):
+        #E:
+        #S:
+        #R: Cámara ya ubicada
+        #F: Deja dibujados solo los bloques de la capa estática que tocan la vista más el margen; los demás se reciclan
+        fila0, columna0 = self.camara
+        estado = self.estado
+        filas_bloque = range(max(0, fila0 - MARGEN_VISTA) // TAMANO_BLOQUE,
+                             (min(estado.filas, fila0 + self.vista_filas + MARGEN_VISTA) - 1) // TAMANO_BLOQUE + 1)
+        columnas_bloque = range(max(0, columna0 - MARGEN_VISTA) // TAMANO_BLOQUE,
+                                (min(estado.columnas, columna0 + self.vista_columnas + MARGEN_VISTA) - 1) // TAMANO_BLOQUE + 1)
+        necesarios = [(fila_b, columna_b) for fila_b in filas_bloque for columna_b in columnas_bloque]
+        for clave in [clave for clave in self.bloques if clave not in necesarios]:
+            imagen, item = self.bloques.pop(clave)
+            self.canvas.itemconfig(item, state="hidden")
+            self.bloques_libres.append((imagen, item))
+            self.ops_canvas += 1
+        for clave in necesarios:
+            if clave not in self.bloques:
+                self.bloques[clave] = self.crear_bloque(*clave)
+
+    def crear_bloque(self, fila_b, columna_b):
+        #E: Enteros (coordenadas del bloque)
+        #S: Tupla (PhotoImage, item del canvas)
+        #R:
+        #F: Ubica un bloque de la capa estática reutilizando imágenes e items libres, y lo pinta
+        lado = TAMANO_BLOQUE * TAMANO_CELDA
+        x, y = columna_b * lado, fila_b * lado
+        if self.bloques_libres:
+            imagen, item = self.bloques_libres.pop()
+            self.canvas.coords(item, x, y)
+            self.canvas.itemconfig(item, state="normal")
+        else:
+            imagen = self.imagenes_libres.pop() if self.imagenes_libres else tk.PhotoImage(master=self.root, width=lado, height=lado)
+            item = self.canvas.create_image(x, y, image=imagen, anchor="nw", tags=("capa",))
+            self.canvas.tag_lower(item)
+        self.ops_canvas += 2
+        self.pintar_bloque(imagen, fila_b, columna_b)
+        return imagen, item
+
+    def pintar_bloque(self, imagen, fila_b, columna_b):
+        #E: PhotoImage, Enteros
+        #S:
+        #R:
+        #F: Rasteriza las casillas del bloque: un put masivo a un pixel por casilla, zoom nativo de Tk y las líneas de la grilla
+        estado = self.estado
+        if self.imagen_celdas is None:
+            self.imagen_celdas = tk.PhotoImage(master=self.root, width=TAMANO_BLOQUE, height=TAMANO_BLOQUE)
+        celdas = self.imagen_celdas
+        filas = range(fila_b * TAMANO_BLOQUE, min(estado.filas, (fila_b + 1) * TAMANO_BLOQUE))
+        columnas = range(columna_b * TAMANO_BLOQUE, min(estado.columnas, (columna_b + 1) * TAMANO_BLOQUE))
+        celdas.blank()
+        imagen.blank()
+        celdas.put(" ".join("{" + " ".join(self.color_casilla(fila, columna) for columna in columnas) + "}" for fila in filas), to=(0, 0))
+        imagen.tk.call(imagen.name, "copy", celdas.name, "-zoom", TAMANO_CELDA, TAMANO_CELDA)
+        alto, ancho = len(filas) * TAMANO_CELDA, len(columnas) * TAMANO_CELDA
+        for i in range(len(filas)):
+            imagen.put("#000000", to=(0, i * TAMANO_CELDA, ancho, i * TAMANO_CELDA + 1))
+        for j in range(len(columnas)):
+            imagen.put("#000000", to=(j * TAMANO_CELDA, 0, j * TAMANO_CELDA + 1, alto))
+        self.ops_canvas += 3 + len(filas) + len(columnas)
+
+    def en_region(self, posicion):
+        #E: Posicion
+        #S: Bool
+        #R: Cámara ya ubicada
+        #F: Indica si la posición cae en la zona dibujada (vista más margen)
+        fila0, columna0 = self.camara
+        return (fila0 - MARGEN_VISTA <= posicion.fila < fila0 + self.vista_filas + MARGEN_VISTA
+                and columna0 - MARGEN_VISTA <= posicion.columna < columna0 + self.vista_columnas + MARGEN_VISTA)
+
+    def actualizar_celda(self, fila, columna):
+        #E: Enteros
+        #S:
+        #R:
+        #F: Repinta en su bloque los pixeles de una casilla cuyo tipo cambió, si el bloque está dibujado
+        bloque = self.bloques.get((fila // TAMANO_BLOQUE, columna // TAMANO_BLOQUE))
+        if bloque is not None:
+            x = (columna % TAMANO_BLOQUE) * TAMANO_CELDA
+            y = (fila % TAMANO_BLOQUE) * TAMANO_CELDA
+            bloque[0].put(self.color_casilla(fila, columna), to=(x + 1, y + 1, x + TAMANO_CELDA, y + TAMANO_CELDA))
+            self.ops_canvas += 1
+
+    def dibujar_mapa(self):
+        #E:
+        #S:
+        #R:
+        #F: Actualiza solo los sprites que cambiaron desde el cuadro anterior
+        self.ops_canvas = 0
+        if self.id_jugador is None:
+            self.crear_capa_estatica()
+        estado = self.estado
+        self.actualizar_camara()
+
+        vigentes = set()
+        for t in estado.trampas:
+            vigentes.add(t)
+            if t not in self.ids_trampas:
+                x = t.posicion.columna * TAMANO_CELDA + TAMANO_CELDA // 4
+                y = t.posicion.fila * TAMANO_CELDA + TAMANO_CELDA // 4
+                self.ids_trampas[t] = self.canvas.create_oval(x, y, x + TAMANO_CELDA // 2, y + TAMANO_CELDA // 2, fill="red")
+                self.canvas.tag_raise(self.ids_trampas[t], "capa")
+                self.ops_canvas += 2
+        for t in [t for t in self.ids_trampas if t not in vigentes]:
+            self.canvas.delete(self.ids_trampas.pop(t))
+            self.ops_canvas += 1
+
+        for e in estado.enemigos:
+            item = self.ids_enemigos.get(e.id_enemigo)
+            if item is None:
+                item = self.canvas.create_rectangle(0, 0, 0, 0, fill="blue", state="hidden")
+                self.ids_enemigos[e.id_enemigo] = item
+                self.items_ocultos.add(item)
+                self.canvas.tag_raise(self.id_jugador)
+                self.ops_canvas += 2
+            if e.muerto or not self.en_region(e.posicion):
+                self.ocultar_item(item)
+            else:
                 x = e.posicion.columna * TAMANO_CELDA + 3
                 y = e.posicion.fila * TAMANO_CELDA + 3
-                self.canvas.create_rectangle(x, y, x + TAMANO_CELDA - 6, y + TAMANO_CELDA - 6, fill="blue")
+                self.mover_item(item, x, y, x + TAMANO_CELDA - 6, y + TAMANO_CELDA - 6)
 
-        x = self.pos_jugador.columna * TAMANO_CELDA + 3
-        y = self.pos_jugador.fila * TAMANO_CELDA + 3
-        self.canvas.create_oval(x, y, x + TAMANO_CELDA - 6, y + TAMANO_CELDA - 6, fill="orange")
+        x = estado.pos_jugador.columna * TAMANO_CELDA + 3
+        y = estado.pos_jugador.fila * TAMANO_CELDA + 3
+        self.mover_item(self.id_jugador, x, y, x + TAMANO_CELDA - 6, y + TAMANO_CELDA - 6)
+        self.actualizar_avisos()
+        self.ops_ultimo_cuadro = self.ops_canvas
 
     def actualizar_etiquetas_ui(self):
         #E:
         #S:
         #R:
         #F: Actualiza textos y barras de la interfaz
+        estado = self.estado
         self.lbl_nombre.config(text=f"Jugador: {self.nombre_jugador or '-'}")
-        self.lbl_modo.config(text=f"Modo: {self.modo or '-'}")
-        self.lbl_puntaje.config(text=f"Puntaje: {self.puntaje}")
+        self.lbl_modo.config(text=f"Modo: {estado.modo if estado else '-'}")
+        self.lbl_puntaje.config(text=f"Puntaje: {estado.puntaje if estado else 0}")
+        self.btn_correr.config(text=f"Correr: {'ON' if estado and estado.corriendo else 'OFF'}")
         
         self.canvas_energia.delete("all")
-        ancho = int((self.energia / self.energia_max) * 150)
+        ancho = int((estado.energia / estado.energia_max) * 150) if estado else 150
         self.canvas_energia.create_rectangle(0, 0, ancho, 20, fill="green")
         self.canvas_energia.create_rectangle(ancho, 0, 150, 20, fill="white")
 
@@ -328,326 +2807,363 @@ class AplicacionJuego:
         if not self.nombre_jugador:
             messagebox.showwarning("Registro", "Registre su nombre antes de jugar.")
             return
-        self.modo = modo
-        self.puntaje = 0
-        self.corriendo = False
-        self.btn_correr.config(text="Correr: OFF")
-        
-        self.mapa = generar_laberinto(FILAS, COLUMNAS)
-        distribuir_celdas_especiales(self.mapa, modo, frac_tunel=0.03, frac_liana=0.04)
-        
-        self.pos_jugador = Posicion(1, 1)
-        self.pos_salida = Posicion(FILAS - 2, COLUMNAS - 2)
-        
-        self.enemigos = []
-        num_enemigos = 3 if modo == "Escapa" else 4
-        for i in range(num_enemigos):
-            while True:
-                spawn = self.encontrar_celda_libre(cerca_borde=True)
-                if modo == "Cazador":
-                    survivor_can_escape = self.verificar_alcanzabilidad(spawn, self.pos_salida, (CAMINO, LIANA))
-                    hunter_can_reach = self.verificar_alcanzabilidad(self.pos_jugador, spawn, (CAMINO, TUNEL))
-                    
-                    if survivor_can_escape and hunter_can_reach:
-                        break
-                else:
-                    break
-            self.enemigos.append(Enemigo(i + 1, spawn))
-            
-        self.trampas = []
-        self.tiempo_ultima_trampa = -999.0
-        self.tiempo_inicio = time.time()
-        self.jugando = True
-        self.energia = self.energia_max
+        self.terminar_grabacion()
+        self.empezar_partida(EstadoJuego(modo, nombre_jugador=self.nombre_jugador, tablero=self.pool_tableros.obtener(modo), bus=self.bus))
+        if GRABAR_PARTIDAS:
+            grabar_partida(self.estado)
+
+    def empezar_partida(self, estado):
+        #E: EstadoJuego (nuevo o retomado)
+        #S:
+        #R:
+        #F: Pone la partida en pantalla y reinicia el reloj, la entrada y los avisos
+        self.estado = estado
+        estado.perfil = self.perfil
+        self.planificador.reiniciar()
+        self.cola_entrada.vaciar()
+        self.entradas_sin_dibujar = []
+        self.avisos.clear()
+        self.puntaje_guardado = False
+        vista = (min(VISTA_FILAS, estado.filas), min(VISTA_COLUMNAS, estado.columnas))
+        if vista != (self.vista_filas, self.vista_columnas):
+            self.vista_filas, self.vista_columnas = vista
+            self.canvas.config(width=self.vista_columnas * TAMANO_CELDA, height=self.vista_filas * TAMANO_CELDA)
         
-        if modo == "Cazador":
+        if estado.modo == "Cazador":
             self.btn_correr.pack_forget()
             self.btn_trampa.pack_forget()
         else:
             self.btn_correr.pack(pady=6)
             self.btn_trampa.pack(pady=6)
         
+        self.crear_capa_estatica()
         self.dibujar_mapa()
         self.actualizar_etiquetas_ui()
 
-    def verificar_alcanzabilidad(self, inicio, fin, tipos_validos):
-        #E: Posicion, Posicion, tupla
-        #S: Bool
+    def guardar(self):
+        #E:
+        #S:
         #R:
-        #F: Verifica si existe un camino entre inicio y fin usando solo tipos_validos
-        cola = [inicio]
-        visitados = {inicio}
-        while cola:
-            actual = cola.pop(0)
-            if actual == fin:
-                return True
-            
-            direcciones = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-            for df, dc in direcciones:
-                nf, nc = actual.fila + df, actual.columna + dc
-                if 0 <= nf < FILAS and 0 <= nc < COLUMNAS:
-                    pos_n = Posicion(nf, nc)
-                    if pos_n not in visitados:
-                        tipo = self.mapa[nf][nc]
-                        if tipo in tipos_validos:
-                            visitados.add(pos_n)
-                            cola.append(pos_n)
-        return False
+        #F: Guarda la partida en curso en ARCHIVO_PARTIDA
+        if not self.jugando:
+            return
+        try:
+            guardar_partida(self.estado)
+        except OSError as error:
+            messagebox.showwarning("Guardar", f"No se pudo guardar la partida:\n{error}")
+            return
+        self.estado.publicar(EVENTO_AVISO, "Partida guardada")
 
-    def encontrar_celda_libre(self, cerca_borde=False):
-        #E: Bool
-        #S: Posicion
+    def continuar(self):
+        #E:
+        #S:
+        #R: Las partidas retomadas no se graban como repetición (empiezan a mitad de partida)
+        #F: Retoma la partida guardada en ARCHIVO_PARTIDA
+        if not os.path.exists(ARCHIVO_PARTIDA):
+            messagebox.showwarning("Continuar", "No hay partida guardada.")
+            return
+        try:
+            estado = cargar_partida(ARCHIVO_PARTIDA, bus=self.bus)
+        except (ValueError, OSError) as error:
+            messagebox.showwarning("Continuar", f"No se pudo cargar la partida guardada:\n{error}")
+            return
+        self.terminar_grabacion()
+        self.nombre_jugador = estado.nombre_jugador or self.nombre_jugador
+        self.empezar_partida(estado)
+
+    def procesar_eventos(self):
+        #E:
+        #S:
         #R:
-        #F: Encuentra una celda válida aleatoria
-        candidatos = []
-        for fila in range(1, FILAS - 1):
-            for columna in range(1, COLUMNAS - 1):
-                tipo = self.mapa[fila][columna]
-                if tipo in (CAMINO, LIANA):
-                    if cerca_borde:
-                        if fila <= 2 or columna <= 2 or fila >= FILAS - 3 or columna >= COLUMNAS - 3:
-                            candidatos.append(Posicion(fila, columna))
-                    else:
-                        candidatos.append(Posicion(fila, columna))
-        return random.choice(candidatos) if candidatos else Posicion(1, 1)
+        #F: Despacha los eventos del motor a los suscriptores (avisos, puntajes y registro opcional), una vez por cuadro
+        self.estado.tomar_eventos()
+
+    def guardar_puntaje(self, evento):
+        #E: EventoJuego (victoria o derrota)
+        #S:
+        #R:
+        #F: Suscriptor de fin de partida: guarda el puntaje final y cierra la grabación
+        if not self.puntaje_guardado:
+            self.puntaje_guardado = True
+            actualizar_puntajes(self.estado.modo, self.nombre_jugador, evento.total)
+            self.terminar_grabacion()
+
+    def mostrar_aviso(self, evento):
+        #E: EventoJuego
+        #S:
+        #R:
+        #F: Suscriptor de los eventos con aviso: agrega su texto a los avisos del canvas; los de fin de partida no vencen
+        vence = None if evento.tipo in EVENTOS_FIN else self.planificador.reloj() + DURACION_AVISO
+        self.avisos.append((evento.texto, vence))
+        if len(self.avisos) > MAX_AVISOS:
+            self.avisos.popleft()
+        self.avisos_cambiados = True
+
+    def al_cambiar_celda(self, evento):
+        #E: EventoJuego (EVENTO_CELDA)
+        #S:
+        #R:
+        #F: Suscriptor de cambios del mapa: repinta solo la casilla afectada en la capa estática
+        self.actualizar_celda(evento.posicion.fila, evento.posicion.columna)
+
+    def ubicar_avisos(self):
+        #E:
+        #S:
+        #R: Con cámara
+        #F: Fija el texto de avisos en la esquina inferior izquierda de la vista
+        fila0, columna0 = self.camara
+        self.canvas.coords(self.id_avisos, columna0 * TAMANO_CELDA + 6, (fila0 + self.vista_filas) * TAMANO_CELDA - 6)
+        self.canvas.tag_raise(self.id_avisos)
+        self.ops_canvas += 2
+
+    def actualizar_avisos(self):
+        #E:
+        #S:
+        #R:
+        #F: Quita los avisos vencidos y reescribe el texto solo si cambió
+        ahora = self.planificador.reloj()
+        if any(vence is not None and vence <= ahora for _, vence in self.avisos):
+            self.avisos = deque(aviso for aviso in self.avisos if aviso[1] is None or aviso[1] > ahora)
+            self.avisos_cambiados = True
+        if self.avisos_cambiados and self.id_avisos is not None:
+            self.avisos_cambiados = False
+            self.canvas.itemconfig(self.id_avisos, text="\n".join(texto for texto, _ in self.avisos))
+            self.canvas.tag_raise(self.id_avisos)
+            self.ops_canvas += 2
+
+    def terminar_grabacion(self):
+        #E:
+        #S:
+        #R:
+        #F: Cierra la repetición de la partida actual, si se está grabando
+        if self.estado is not None and self.estado.grabador is not None:
+            self.estado.grabador.cerrar(self.estado)
+            self.estado.grabador = None
 
     def al_presionar_tecla(self, event):
         #E: Evento Tk
         #S:
         #R:
-        #F: Maneja input de teclado
+        #F: Encola el movimiento; se aplica en el próximo paso lógico y se ve en el próximo cuadro
         if not self.jugando:
             return
         tecla = event.keysym.lower()
-        movimientos = {
-            'w': (-1, 0), 'up': (-1, 0),
-            's': (1, 0), 'down': (1, 0),
-            'a': (0, -1), 'left': (0, -1),
-            'd': (0, 1), 'right': (0, 1)
-        }
-        if tecla in movimientos:
-            delta_fila, delta_columna = movimientos[tecla]
-            pasos = 2 if self.corriendo and self.energia > 0 else 1
-            movido = False
-            
-            if self.modo == "Escapa":
-                validos = (CAMINO, TUNEL)
-            else:
-                validos = (CAMINO, TUNEL)
-
-            for _ in range(pasos):
-                nueva_fila = self.pos_jugador.fila + delta_fila
-                nueva_columna = self.pos_jugador.columna + delta_columna
-                if 0 <= nueva_fila < FILAS and 0 <= nueva_columna < COLUMNAS:
-                    tipo = self.mapa[nueva_fila][nueva_columna]
-                    if tipo in validos:
-                        self.pos_jugador = Posicion(nueva_fila, nueva_columna)
-                        movido = True
-            if self.corriendo and movido:
-                self.energia = max(0, self.energia - 6)
-                if self.energia == 0:
-                    self.corriendo = False
-                    self.btn_correr.config(text="Correr: OFF")
-            
-            self.verificar_colisiones_movimiento()
-            self.dibujar_mapa()
-            self.actualizar_etiquetas_ui()
+        if tecla in MOVIMIENTOS:
+            self.cola_entrada.agregar(TECLA_CANONICA[MOVIMIENTOS[tecla]])
 
     def alternar_correr(self):
         #E:
         #S:
         #R:
-        #F: Activa o desactiva modo correr
-        if not self.jugando:
-            return
-        if self.energia <= 0:
-            messagebox.showinfo("Energía", "Sin energía para correr. Espera a recuperar.")
-            return
-        self.corriendo = not self.corriendo
-        self.btn_correr.config(text=f"Correr: {'ON' if self.corriendo else 'OFF'}")
+        #F: Encola activar o desactivar el modo correr
+        if self.jugando:
+            self.cola_entrada.agregar("correr")
 
     def colocar_trampa(self):
         #E:
         #S:
         #R:
-        #F: Intenta colocar una trampa en la posición actual
-        if not self.jugando:
-            return
-        ahora = time.time()
-        activas = sum(1 for t in self.trampas if t.activa)
-        if activas >= MAX_TRAMPAS_ACTIVAS:
-            messagebox.showinfo("Trampa", f"Máximo {MAX_TRAMPAS_ACTIVAS} trampas activas.")
-            return
-        if ahora - self.tiempo_ultima_trampa < TIEMPO_RECARGA_TRAMPA:
-            restante = TIEMPO_RECARGA_TRAMPA - (ahora - self.tiempo_ultima_trampa)
-            messagebox.showinfo("Trampa", f"Espera {restante:.1f}s para volver a colocar.")
-            return
-        
-        self.trampas.append(Trampa(Posicion(self.pos_jugador.fila, self.pos_jugador.columna), ahora))
-        self.tiempo_ultima_trampa = ahora
-        self.dibujar_mapa()
-        self.actualizar_etiquetas_ui()
+        #F: Encola colocar una trampa en la posición actual
+        if self.jugando:
+            self.cola_entrada.agregar("trampa")
 
-    def verificar_colision_enemigo_jugador(self):
+    def aplicar_entrada(self):
         #E:
-        #S: Bool
+        #S:
         #R:
-        #F: Verifica si hay colisión entre jugador y enemigos
-        for e in self.enemigos:
-            if not e.muerto and e.posicion == self.pos_jugador:
-                if self.modo == "Escapa":
-                    messagebox.showinfo("Derrota", "Un enemigo te alcanzó. Perdiste.")
-                    actualizar_puntajes("Escapa", self.nombre_jugador, self.puntaje)
-                    self.jugando = False
-                    return True
-                elif self.modo == "Cazador":
-                    pts = 50
-                    self.puntaje += pts
-                    e.muerto = True
-                    e.tiempo_muerte = time.time()
-                    messagebox.showinfo("Cazador", f"Cazaste a un enemigo! +{pts} pts")
-                    self.dibujar_mapa()
-                    self.actualizar_etiquetas_ui()
-        return False
+        #F: Aplica al motor las entradas que tocan en este paso lógico y guarda su instante para medir la latencia
+        for accion, instante in self.cola_entrada.tomar_paso():
+            self.estado.aplicar_accion(accion)
+            self.entradas_sin_dibujar.append(instante)
 
-    def verificar_colisiones_movimiento(self):
+    def registrar_latencias(self):
         #E:
         #S:
-        #R:
-        #F: Verifica condiciones de victoria o derrota tras movimiento
-        if self.modo == "Escapa" and self.pos_jugador == self.pos_salida:
-            tiempo_transcurrido = time.time() - self.tiempo_inicio if self.tiempo_inicio else 0.0
-            pts = max(10, int(1000 - tiempo_transcurrido))
-            final = self.puntaje + pts
-            messagebox.showinfo("Victoria", f"¡Has escapado! Puntos ganados: {pts}\nTotal: {final}")
-            actualizar_puntajes("Escapa", self.nombre_jugador, final)
-            self.jugando = False
-            self.dibujar_mapa()
-            return
-
-        self.verificar_colision_enemigo_jugador()
-
-    def siguiente_paso_bfs(self, inicio, fin, tipos_validos, obstaculos=None):
-        #E: Posicion, Posicion, tupla, set
-        #S: Posicion
-        #R:
-        #F: Encuentra el siguiente paso hacia el objetivo usando BFS
-        cola = [(inicio, [])]
-        visitados = {inicio}
-        if obstaculos:
-            visitados.update(obstaculos)
-            
-        while cola:
-            actual, camino = cola.pop(0)
-            if actual == fin:
-                return camino[0] if camino else actual
-            
-            direcciones = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-            random.shuffle(direcciones)
-            for df, dc in direcciones:
-                nf, nc = actual.fila + df, actual.columna + dc
-                if 0 <= nf < FILAS and 0 <= nc < COLUMNAS:
-                    vecino = Posicion(nf, nc)
-                    if vecino not in visitados:
-                        if self.mapa[nf][nc] in tipos_validos:
-                            visitados.add(vecino)
-                            cola.append((vecino, camino + [vecino]))
-        return inicio
+        #R: Llamar al terminar un cuadro
+        #F: Latencia de entrada a pantalla: desde que llegó la tecla hasta el fin del cuadro que muestra su efecto
+        if self.perfil is not None:
+            ahora = time.perf_counter_ns()
+            for instante in self.entradas_sin_dibujar:
+                self.perfil.registrar("entrada", ahora - instante)
+        self.entradas_sin_dibujar.clear()
 
     def ciclo_juego(self):
         #E:
         #S:
         #R:
-        #F: Loop principal del juego (tick)
+        #F: Loop de la interfaz: ejecuta los pasos lógicos que tocan (aplicando la entrada encolada) y dibuja a lo sumo
+        #   FPS_MAXIMO veces por segundo, o antes si hay entrada aplicada que todavía no se ve o la partida terminó
+        pasos, dibujar = self.planificador.avanzar()
         if self.jugando:
-            ahora = time.time()
-            if not self.corriendo:
-                self.energia = min(self.energia_max, self.energia + 2)
+            perfil = self.perfil
+            marca = inicio = time.perf_counter_ns() if perfil is not None else 0
+            for _ in range(pasos):
+                self.aplicar_entrada()
+                if self.estado.jugando:
+                    self.estado.avanzar()
+                if not self.estado.jugando:
+                    break
+            self.pasos_ventana += pasos
+            if perfil is not None:
+                marca = perfil.marcar("logica", marca)
+            self.procesar_eventos()
+            if perfil is not None:
+                marca = perfil.marcar("eventos", marca)
+            if dibujar or self.entradas_sin_dibujar or not self.estado.jugando:
+                if not dibujar:
+                    self.planificador.cuadro_adelantado()
+                self.dibujar_mapa()
+                if perfil is not None:
+                    marca = perfil.marcar("render", marca)
+                self.actualizar_etiquetas_ui()
+                self.cuadros_ventana += 1
+                self.registrar_latencias()
+                if perfil is not None:
+                    perfil.marcar("etiquetas", marca)
+                    perfil.marcar("cuadro", inicio)
+                    self.actualizar_overlay()
 
-            for e in self.enemigos:
-                if e.muerto:
-                    if self.modo == "Escapa" and e.tiempo_muerte and (ahora - e.tiempo_muerte >= TIEMPO_REAPARICION_ENEMIGO):
-                        e.posicion = self.encontrar_celda_libre(cerca_borde=True)
-                        e.muerto = False
-                        e.tiempo_muerte = None
-                else:
-                    if self.modo == "Escapa":
-                        self.mover_enemigo_hacia(e, self.pos_jugador)
-                    else:
-                        paso = self.siguiente_paso_bfs(e.posicion, self.pos_salida, (CAMINO, LIANA), obstaculos={self.pos_jugador})
-                        e.posicion = paso
-            
-            self.verificar_colision_enemigo_jugador()
+        self.root.after(self.planificador.espera_ms(), self.ciclo_juego)
 
-            for e in self.enemigos:
-                if not e.muerto:
-                    for t in list(self.trampas):
-                        if t.activa and e.posicion == t.posicion:
-                            e.muerto = True
-                            e.tiempo_muerte = ahora
-                            t.activa = False
-                            self.puntaje += 30
-            
-            self.trampas = [t for t in self.trampas if t.activa or (ahora - t.tiempo_colocacion) < 0.6]
-
-            if self.modo == "Cazador":
-                for e in self.enemigos:
-                    if not e.muerto and e.posicion == self.pos_salida:
-                        perdida = 40
-                        self.puntaje = max(0, self.puntaje - perdida)
-                        e.muerto = True
-                        e.tiempo_muerte = ahora
-                        print(f"Enemigo escapó a la salida: -{perdida} pts")
-
-            self.dibujar_mapa()
-            self.actualizar_etiquetas_ui()
-
-        self.root.after(INTERVALO_TICK_MS, self.ciclo_juego)
+    def actualizar_overlay(self):
+        #E:
+        #S:
+        #R: Solo con perfilado activo
+        #F: Muestra en el canvas cuadros y pasos lógicos por segundo, el costo y las operaciones de canvas del último cuadro y
+        #   la última latencia de entrada
+        ahora = self.planificador.reloj()
+        transcurrido = ahora - self.inicio_ventana
+        if transcurrido < 0.5 or self.id_overlay is None:
+            return
+        fps = self.cuadros_ventana / transcurrido
+        tps = self.pasos_ventana / transcurrido
+        costo = self.perfil.ultimo("cuadro") / 1e6
+        latencia = self.perfil.ultimo("entrada") / 1e6
+        presupuesto = 1000.0 / FPS_MAXIMO
+        texto = f"{fps:4.1f} fps  {tps:4.1f} tps  cuadro {costo:5.2f} ms ({100 * costo / presupuesto:4.1f}%, {self.ops_ultimo_cuadro} ops)  entrada {latencia:5.1f} ms"
+        self.canvas.itemconfig(self.id_overlay, text=texto)
+        self.canvas.tag_raise(self.id_overlay)
+        self.inicio_ventana = ahora
+        self.pasos_ventana = 0
+        self.cuadros_ventana = 0
 
-    def es_celda_enemigo_valida(self, pos):
-        #E: Posicion
-        #S: Bool
-        #R:
-        #F: Verifica si un enemigo puede estar en esa celda
-        if not (0 <= pos.fila < FILAS and 0 <= pos.columna < COLUMNAS):
-            return False
-        tipo = self.mapa[pos.fila][pos.columna]
-        return tipo in (CAMINO, LIANA)
+def leer_tamano(texto):
+    #E: String ("N" o "FILASxCOLUMNAS")
+    #S: Tupla (filas, columnas)
+    #R: Dimensiones impares y al menos 5
+    #F: Interpreta el tamaño de tablero pedido por línea de comandos
+    partes = texto.lower().split("x")
+    try:
+        filas, columnas = int(partes[0]), int(partes[-1])
+    except ValueError:
+        filas = columnas = 0
+    if len(partes) > 2 or min(filas, columnas) < 5 or filas % 2 == 0 or columnas % 2 == 0:
+        raise ValueError(f"Tamaño de tablero inválido: {texto} (se esperan dimensiones impares >= 5)")
+    return filas, columnas
 
-    def mover_enemigo_hacia(self, enemigo, objetivo):
-        #E: Enemigo, Posicion
-        #S:
-        #R:
-        #F: Mueve al enemigo acercándolo al objetivo
-        mejor = enemigo.posicion
-        mejor_dist = abs(enemigo.posicion.fila - objetivo.fila) + abs(enemigo.posicion.columna - objetivo.columna)
-        for delta_fila, delta_columna in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            cand = Posicion(enemigo.posicion.fila + delta_fila, enemigo.posicion.columna + delta_columna)
-            if self.es_celda_enemigo_valida(cand):
-                d = abs(cand.fila - objetivo.fila) + abs(cand.columna - objetivo.columna)
-                if d < mejor_dist:
-                    mejor_dist = d
-                    mejor = cand
-        enemigo.posicion = mejor
+def leer_puerto(texto):
+    #E: String
+    #S: Int
+    #R: Entre 0 y 65535 (0 = cualquier puerto libre)
+    #F: Interpreta el puerto del servidor pedido por línea de comandos
+    puerto = int(texto)
+    if not 0 <= puerto <= 65535:
+        raise ValueError(f"Puerto inválido: {texto} (se espera un número entre 0 y 65535)")
+    return puerto
 
-    def mover_enemigo_lejos(self, enemigo, desde_pos):
-        #E: Enemigo, Posicion
-        #S:
-        #R:
-        #F: Mueve al enemigo alejándolo de la posición
-        mejor = enemigo.posicion
-        opciones = []
-        for delta_fila, delta_columna in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            cand = Posicion(enemigo.posicion.fila + delta_fila, enemigo.posicion.columna + delta_columna)
-            if self.es_celda_enemigo_valida(cand):
-                d = abs(cand.fila - desde_pos.fila) + abs(cand.columna - desde_pos.columna)
-                opciones.append((d, cand))
-        if opciones:
-            opciones.sort(key=lambda x: x[0], reverse=True)
-            mejor = opciones[0][1]
-        enemigo.posicion = mejor
+def leer_archivo(texto):
+    #E: String (ruta)
+    #S: String
+    #R: Archivo existente y legible
+    #F: Valida un archivo de entrada pedido por línea de comandos antes de abrirlo
+    if not os.path.isfile(texto):
+        raise ValueError(f"No existe el archivo: {texto}")
+    if not os.access(texto, os.R_OK):
+        raise ValueError(f"No se puede leer el archivo: {texto}")
+    return texto
 
-if __name__ == "__main__":
+def crear_parser():
+    #E:
+    #S: ArgumentParser
+    #R:
+    #F: Opciones de línea de comandos; los valores inválidos terminan con el uso y un mensaje en lugar de una traza
+    import argparse
+
+    def tipo(funcion):
+        def convertir(texto):
+            try:
+                return funcion(texto)
+            except ValueError as error:
+                raise argparse.ArgumentTypeError(str(error))
+        return convertir
+
+    parser = argparse.ArgumentParser(prog="proyecto2.py", description="Escapa / Cazador")
+    parser.add_argument("--perfil", action="store_true", help="activa la instrumentación por fase y el overlay")
+    parser.add_argument("--tamano", type=tipo(leer_tamano), default=(FILAS, COLUMNAS), metavar="N|FxC",
+                        help="tamaño del tablero (dimensiones impares >= 5)")
+    parser.add_argument("--eventos", metavar="ARCHIVO", help="registra los eventos de partida en JSON por línea")
+    parser.add_argument("--grabar", action="store_true",
+                        help=f"graba cada partida en {DIRECTORIO_REPETICIONES}/ para --reproducir (guarda las {MAX_REPETICIONES} más recientes)")
+    sin_interfaz = parser.add_mutually_exclusive_group()
+    sin_interfaz.add_argument("--reproducir", type=tipo(leer_archivo), metavar="ARCHIVO", help="re-ejecuta una repetición sin interfaz")
+    sin_interfaz.add_argument("--top", action="store_true", help="muestra los mejores puntajes")
+    sin_interfaz.add_argument("--servidor", type=tipo(leer_puerto), nargs="?", const=PUERTO_SERVIDOR, metavar="PUERTO",
+                              help=f"atiende partidas remotas en 127.0.0.1 (puerto {PUERTO_SERVIDOR} por omisión)")
+    return parser
+
+def main(argumentos):
+    #E: Lista de argumentos de línea de comandos
+    #S: Int (código de salida)
+    #R:
+    #F: Abre el juego o, con --reproducir, --top o --servidor, trabaja sin interfaz (ver crear_parser)
+    global PERFILAR, ARCHIVO_EVENTOS, GRABAR_PARTIDAS
+    parser = crear_parser()
+    opciones = parser.parse_args(argumentos)
+    if opciones.perfil:
+        PERFILAR = True
+    if opciones.eventos:
+        ARCHIVO_EVENTOS = opciones.eventos
+    if opciones.grabar:
+        GRABAR_PARTIDAS = True
+    filas, columnas = opciones.tamano
+    if opciones.reproducir is not None:
+        inicio = time.perf_counter()
+        try:
+            estado, cierre = reproducir_partida(opciones.reproducir)
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            parser.error(f"argument --reproducir: repetición ilegible o inválida ({error.__class__.__name__}: {error})")
+        segundos = time.perf_counter() - inicio
+        print(f"{estado.modo} semilla={estado.semilla} ticks={estado.tick} resultado={estado.resultado} puntaje={estado.puntaje}")
+        print(f"{estado.tick / segundos:.0f} ticks/s")
+        if cierre is not None and (cierre["resultado"], cierre["puntaje"]) != (estado.resultado, estado.puntaje):
+            print(f"No coincide con lo grabado: resultado={cierre['resultado']} puntaje={cierre['puntaje']}")
+            return 1
+        return 0
+    if opciones.servidor is not None:
+        servir(opciones.servidor, filas=filas, columnas=columnas)
+        return 0
+    if opciones.top:
+        datos = cargar_puntajes()
+        for modo in ("Escapa", "Cazador"):
+            print(f"Top {TOP_PUNTAJES} - {modo}")
+            for i, e in enumerate(datos.get(modo, []), start=1):
+                print(f"{i}. {e['name']} - {e['score']}")
+        return 0
+    importar_gui()
     root = tk.Tk()
-    app = AplicacionJuego(root)
+    app = AplicacionJuego(root, filas, columnas)
     root.mainloop()
+    app.terminar_grabacion()
+    app.pool_tableros.cerrar()
+    if app.registro_eventos is not None:
+        app.registro_eventos.cerrar()
+    almacen_puntajes().compactar()
+    if app.perfil is not None:
+        tableros = app.pool_tableros.estadisticas()
+        app.perfil.exportar(extra={"tableros": tableros})
+        print(f"Perfil de ticks guardado en {ARCHIVO_PERFIL}")
+        print(f"Tableros: {tableros['aciertos']} listos desde el pool, {tableros['fallos']} preparados en el momento")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,32 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import proyecto2
+
+@pytest.fixture
+def pared_interior():
+    #F: Función que da la primera pared interior de un tablero, para abrirla con cambiar_celda
+    def buscar(estado):
+        return next((f, c) for f in range(1, estado.filas - 1) for c in range(1, estado.columnas - 1) if estado.mapa[f][c] == proyecto2.PARED)
+    return buscar
+
+@pytest.fixture
+def aplicacion(tmp_path, monkeypatch):
+    #F: AplicacionJuego real con un jugador registrado, trabajando en un directorio temporal; se salta sin pantalla para Tk
+    tk = pytest.importorskip("tkinter")
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("sin pantalla para Tk")
+    monkeypatch.chdir(tmp_path)
+    app = proyecto2.AplicacionJuego(root, 21, 21)
+    app.nombre_jugador = "prueba"
+    try:
+        yield app
+    finally:
+        app.pool_tableros.cerrar()
+        root.destroy()
@@ -0,0 +1,94 @@
+import random
+from collections import deque
+
+import pytest
+
+import proyecto2
+
+def distancias_sin(estado, objetivo, bloqueada):
+    #F: BFS de referencia desde el objetivo por CAMINO y LIANA sin pasar por la casilla bloqueada
+    distancias = {objetivo: 0}
+    cola = deque([objetivo])
+    while cola:
+        fila, columna = cola.popleft()
+        for delta_fila, delta_columna in proyecto2.DIRECCIONES:
+            vecina = (fila + delta_fila, columna + delta_columna)
+            if (0 <= vecina[0] < estado.filas and 0 <= vecina[1] < estado.columnas and vecina not in distancias
+                    and vecina != bloqueada and estado.mapa[vecina[0]][vecina[1]] in (proyecto2.CAMINO, proyecto2.LIANA)):
+                distancias[vecina] = distancias[(fila, columna)] + 1
+                cola.append(vecina)
+    return distancias
+
+def pasos_esperados(estado, inicio, distancias):
+    #F: Vecinos que más acercan al objetivo según la referencia; sin ninguno alcanzable el enemigo se queda
+    vecinas = [(inicio[0] + df, inicio[1] + dc) for df, dc in proyecto2.DIRECCIONES]
+    alcanzables = [v for v in vecinas if v in distancias]
+    if not alcanzables:
+        return {inicio}
+    minima = min(distancias[v] for v in alcanzables)
+    return {v for v in alcanzables if distancias[v] == minima}
+
+def abrir_ciclos(mapa, rng, cantidad):
+    #F: Copia del mapa con paredes abiertas entre dos caminos, para que el laberinto tenga ciclos
+    mapa = [bytearray(fila) for fila in mapa]
+    paredes = [(f, c) for f in range(1, len(mapa) - 1) for c in range(1, len(mapa[0]) - 1) if mapa[f][c] == proyecto2.PARED
+               and (mapa[f - 1][c] == mapa[f + 1][c] == proyecto2.CAMINO or mapa[f][c - 1] == mapa[f][c + 1] == proyecto2.CAMINO)]
+    for fila, columna in rng.sample(paredes, cantidad):
+        mapa[fila][columna] = proyecto2.CAMINO
+    return mapa
+
+@pytest.mark.parametrize("semilla,ciclos", [(1, 0), (2, 0), (3, 0), (4, 6)])
+def test_campo_persecucion_incremental_igual_que_desde_cero(semilla, ciclos):
+    #F: Paseo al azar del jugador por caminos y túneles (con saltos a casillas lejanas); en cada paso el campo mantenido con
+    #   mover_raiz da el mismo paso para cada casilla que uno construido desde cero. Cubre el atajo de dos punteros, la entrada
+    #   y salida de túneles y la BFS con marcas de generación (saltos y laberintos con ciclos)
+    rng = random.Random(semilla)
+    mapa = proyecto2.preparar_tablero("Escapa", semilla, None, 31, 31)["mapa"]
+    if ciclos:
+        mapa = abrir_ciclos(mapa, rng, ciclos)
+    filas, columnas = len(mapa), len(mapa[0])
+    pisables = {(f, c) for f in range(filas) for c in range(columnas) if mapa[f][c] in (proyecto2.CAMINO, proyecto2.TUNEL)}
+    campo = proyecto2.CampoPersecucion(mapa, proyecto2.Posicion(1, 1))
+    assert campo.es_bosque == (ciclos == 0)
+    actual, previa = (1, 1), None
+    en_tunel = 0
+    for _ in range(400):
+        if rng.random() < 0.02:
+            actual, previa = rng.choice(sorted(pisables)), None
+        else:
+            opciones = [(actual[0] + df, actual[1] + dc) for df, dc in proyecto2.DIRECCIONES if (actual[0] + df, actual[1] + dc) in pisables]
+            adelante = [celda for celda in opciones if celda != previa] or opciones
+            actual, previa = rng.choice(adelante), actual
+        en_tunel += mapa[actual[0]][actual[1]] == proyecto2.TUNEL
+        raiz = proyecto2.Posicion(*actual)
+        campo.mover_raiz(raiz)
+        nuevo = proyecto2.CampoPersecucion(mapa, raiz)
+        for fila in range(filas):
+            for columna in range(columnas):
+                posicion = proyecto2.Posicion(fila, columna)
+                assert campo.paso(posicion) == nuevo.paso(posicion), (raiz, posicion)
+    assert en_tunel > 0
+
+def test_paso_hacia_salida_esquiva_al_jugador():
+    #F: Con el jugador en cada casilla, el paso de los enemigos que huyen coincide con una BFS que trata su casilla como pared,
+    #   incluido el caso en que el jugador ocupa el único pasillo y el enemigo queda encerrado
+    estado = proyecto2.EstadoJuego("Cazador", semilla=11, filas=21, columnas=21)
+    salida = (estado.pos_salida.fila, estado.pos_salida.columna)
+    libres = [(f, c) for f in range(estado.filas) for c in range(estado.columnas) if estado.mapa[f][c] in (proyecto2.CAMINO, proyecto2.LIANA)]
+    encerrados = 0
+    for jugador in libres:
+        if jugador == salida:
+            continue
+        estado.pos_jugador = proyecto2.Posicion(*jugador)
+        campo = estado.campo_hacia_salida()
+        referencia = distancias_sin(estado, salida, jugador)
+        for inicio in libres:
+            if inicio in (jugador, salida):
+                continue
+            esperados = pasos_esperados(estado, inicio, referencia)
+            if esperados == {inicio} and inicio not in referencia:
+                encerrados += 1
+            for _ in range(3):
+                paso = estado.siguiente_paso_campo(proyecto2.Posicion(*inicio), campo, obstaculo=estado.pos_jugador)
+                assert (paso.fila, paso.columna) in esperados, (jugador, inicio)
+    assert encerrados > 0
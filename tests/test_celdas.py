@@ -0,0 +1,39 @@
+import proyecto2
+
+def test_cambiar_celda_actualiza_indices_y_publica_evento(pared_interior):
+    estado = proyecto2.EstadoJuego("Cazador", semilla=5, filas=21, columnas=21)
+    estado.tomar_eventos()
+    fila, columna = pared_interior(estado)
+    estado.cambiar_celda(fila, columna, proyecto2.CAMINO)
+    assert fila * estado.columnas + columna in estado.celdas_libres.lugar_libres
+    eventos = estado.tomar_eventos()
+    assert [(e.tipo, e.posicion) for e in eventos] == [(proyecto2.EVENTO_CELDA, proyecto2.Posicion(fila, columna))]
+    estado.cambiar_celda(fila, columna, proyecto2.PARED)
+    assert fila * estado.columnas + columna not in estado.celdas_libres.lugar_libres
+
+def test_tras_cambiar_celda_la_persecucion_usa_el_mapa_nuevo(pared_interior):
+    #F: El campo descartado se reconstruye en el siguiente turno con las componentes del mapa cambiado
+    estado = proyecto2.EstadoJuego("Escapa", semilla=5, filas=21, columnas=21)
+    fila, columna = pared_interior(estado)
+    estado.cambiar_celda(fila, columna, proyecto2.CAMINO)
+    estado.turno_enemigos()
+    campo = estado.campo_persecucion
+    assert list(campo.componentes) == list(proyecto2.etiquetar_componentes(estado.mapa, (proyecto2.CAMINO, proyecto2.LIANA)))
+    assert campo.componentes[fila * estado.columnas + columna] >= 0
+
+def test_la_vista_repinta_la_casilla_cambiada(aplicacion, pared_interior):
+    #F: El cambio llega por el bus a AplicacionJuego, que repinta solo esa casilla en su bloque de la capa estática
+    aplicacion.iniciar_modo("Cazador")
+    aplicacion.dibujar_mapa()
+    estado = aplicacion.estado
+    fila, columna = pared_interior(estado)
+    imagen = aplicacion.bloques[(fila // proyecto2.TAMANO_BLOQUE, columna // proyecto2.TAMANO_BLOQUE)][0]
+    centro = lambda f, c: ((c % proyecto2.TAMANO_BLOQUE) * proyecto2.TAMANO_CELDA + proyecto2.TAMANO_CELDA // 2,
+                           (f % proyecto2.TAMANO_BLOQUE) * proyecto2.TAMANO_CELDA + proyecto2.TAMANO_CELDA // 2)
+    camino = next((f, c) for f in range(proyecto2.TAMANO_BLOQUE) for c in range(proyecto2.TAMANO_BLOQUE)
+                  if estado.mapa[f][c] == proyecto2.CAMINO and (f, c) != (estado.pos_jugador.fila, estado.pos_jugador.columna))
+    antes = imagen.get(*centro(fila, columna))
+    estado.cambiar_celda(fila, columna, proyecto2.CAMINO)
+    aplicacion.procesar_eventos()
+    assert imagen.get(*centro(fila, columna)) != antes
+    assert imagen.get(*centro(fila, columna)) == imagen.get(*centro(*camino))
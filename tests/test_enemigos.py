@@ -0,0 +1,33 @@
+import random
+
+import pytest
+
+import proyecto2
+
+@pytest.mark.parametrize("semilla", [1, 2, 3])
+def test_horda_en_lote_igual_que_uno_por_uno(semilla):
+    #F: mover_enemigos_hacia (numpy) deja cada enemigo y el índice por celda igual que mover_enemigo_hacia en un bucle,
+    #   con hordas al azar (varios por casilla, alguno sobre el objetivo) y objetivos dentro y fuera del laberinto
+    pytest.importorskip("numpy")
+    assert proyecto2.usar_numpy()
+    rng = random.Random(semilla)
+    lote = proyecto2.EstadoJuego("Escapa", semilla=semilla, filas=41, columnas=41, num_enemigos=proyecto2.UMBRAL_MOVIMIENTO_LOTE * 3)
+    uno = proyecto2.EstadoJuego("Escapa", semilla=semilla, filas=41, columnas=41, num_enemigos=proyecto2.UMBRAL_MOVIMIENTO_LOTE * 3)
+    libres = [proyecto2.Posicion(f, c) for f in range(lote.filas) for c in range(lote.columnas) if lote.es_celda_enemigo_valida(proyecto2.Posicion(f, c))]
+    for estado in (lote, uno):
+        for e in estado.enemigos:
+            estado.ubicar_enemigo(e, libres[0])
+    for _ in range(20):
+        objetivo = rng.choice(libres) if rng.random() < 0.5 else proyecto2.Posicion(rng.randrange(lote.filas), rng.randrange(lote.columnas))
+        elegidos = [i for i in range(len(lote.enemigos)) if rng.random() < 0.7]
+        amontonados = libres[:5] + ([objetivo] if objetivo in libres else [])
+        for i in elegidos:
+            destino = rng.choice(amontonados) if rng.random() < 0.2 else rng.choice(libres)
+            lote.ubicar_enemigo(lote.enemigos[i], destino)
+            uno.ubicar_enemigo(uno.enemigos[i], destino)
+        lote.mover_enemigos_hacia([lote.enemigos[i] for i in elegidos], objetivo)
+        for i in elegidos:
+            uno.mover_enemigo_hacia(uno.enemigos[i], objetivo)
+        assert [e.posicion for e in lote.enemigos] == [e.posicion for e in uno.enemigos]
+        assert {p: sorted(e.id_enemigo for e in o) for p, o in lote.enemigos_por_celda.items()} == \
+               {p: sorted(e.id_enemigo for e in o) for p, o in uno.enemigos_por_celda.items()}
@@ -0,0 +1,28 @@
+import pytest
+
+import proyecto2
+
+@pytest.mark.parametrize("argumentos", [["--tamano", "4"], ["--tamano"], ["--tamano", "7x"], ["--tamano", "9x9x9"],
+                                        ["--servidor", "70000"], ["--top", "--servidor"], ["--reproducir"], ["--desconocida"]])
+def test_argumentos_invalidos_dan_error_de_uso(argumentos, capsys):
+    with pytest.raises(SystemExit) as salida:
+        proyecto2.main(argumentos)
+    assert salida.value.code == 2
+    assert "usage:" in capsys.readouterr().err
+
+def test_opciones_validas():
+    opciones = proyecto2.crear_parser().parse_args(["--tamano", "301x501", "--servidor"])
+    assert opciones.tamano == (301, 501)
+    assert opciones.servidor == proyecto2.PUERTO_SERVIDOR
+    assert proyecto2.crear_parser().parse_args(["--tamano", "11"]).tamano == (11, 11)
+    assert not opciones.grabar and proyecto2.crear_parser().parse_args(["--grabar"]).grabar
+
+@pytest.mark.parametrize("contenido", [None, "basura\n", '{"v": 2}\n', '{"v": 999}\n'])
+def test_reproducir_archivo_faltante_o_invalido(tmp_path, capsys, contenido):
+    ruta = tmp_path / "partida.jsonl"
+    if contenido is not None:
+        ruta.write_text(contenido, encoding="utf-8")
+    with pytest.raises(SystemExit) as salida:
+        proyecto2.main(["--reproducir", str(ruta)])
+    assert salida.value.code == 2
+    assert "--reproducir" in capsys.readouterr().err
@@ -0,0 +1,140 @@
+import os
+import random
+import struct
+
+import pytest
+
+import proyecto2
+
+ACCIONES = ("w", "a", "s", "d", "w", "a", "s", "d", "trampa", "correr")
+
+def jugar(estado, semilla, ticks):
+    rng = random.Random(semilla)
+    for _ in range(ticks):
+        if not estado.jugando:
+            break
+        estado.paso((rng.choice(ACCIONES),))
+
+def huella(estado):
+    #F: Lo que debe sobrevivir a guardar y cargar
+    return (estado.modo, estado.nombre_jugador, estado.semilla, estado.tick, estado.turnos, estado.puntaje, estado.energia,
+            estado.corriendo, estado.jugando, estado.resultado, estado.pos_jugador, estado.rng.getstate(),
+            b"".join(bytes(fila) for fila in estado.mapa),
+            [(e.id_enemigo, e.posicion, e.muerto, e.tiempo_muerte) for e in estado.enemigos],
+            [(t.posicion, t.activa, t.tiempo_colocacion) for t in estado.trampas])
+
+@pytest.fixture
+def guardada(tmp_path):
+    #F: Partida Escapa a mitad de juego guardada en disco, con su estado original
+    estado = proyecto2.EstadoJuego("Escapa", nombre_jugador="prueba ñ", semilla=41, filas=41, columnas=41, num_enemigos=8)
+    jugar(estado, 41, 300)
+    ruta = str(tmp_path / "partida.p2s")
+    proyecto2.guardar_partida(estado, ruta)
+    return estado, ruta
+
+@pytest.mark.parametrize("modo", proyecto2.MODOS_PARTIDA)
+def test_ida_y_vuelta(tmp_path, modo):
+    original = proyecto2.EstadoJuego(modo, nombre_jugador="prueba", semilla=7, filas=31, columnas=31, num_enemigos=6)
+    jugar(original, 7, 300)
+    ruta = str(tmp_path / "partida.p2s")
+    proyecto2.guardar_partida(original, ruta)
+    cargada = proyecto2.cargar_partida(ruta)
+    assert huella(cargada) == huella(original)
+    proyecto2.guardar_partida(cargada, ruta + ".2")
+    with open(ruta, "rb") as a, open(ruta + ".2", "rb") as b:
+        assert a.read() == b.read()
+    jugar(original, 8, 300)
+    jugar(cargada, 8, 300)
+    assert huella(cargada) == huella(original)
+
+def test_casillas_mapeadas_sin_escribir_el_archivo(guardada, pared_interior):
+    #F: Las filas del mapa cargado son vistas de la copia privada del mmap: cambiarlas no toca el archivo
+    original, ruta = guardada
+    with open(ruta, "rb") as f:
+        antes = f.read()
+    cargada = proyecto2.cargar_partida(ruta)
+    assert all(isinstance(fila, memoryview) for fila in cargada.mapa)
+    fila, columna = pared_interior(cargada)
+    cargada.cambiar_celda(fila, columna, proyecto2.CAMINO)
+    assert cargada.mapa[fila][columna] == proyecto2.CAMINO
+    with open(ruta, "rb") as f:
+        assert f.read() == antes
+
+def test_guardar_fallido_conserva_la_anterior(guardada, tmp_path, monkeypatch):
+    #F: Si la escritura falla no queda el temporal y el archivo anterior sigue entero
+    original, ruta = guardada
+    with open(ruta, "rb") as f:
+        antes = f.read()
+    def sin_espacio(origen, destino):
+        raise OSError(28, "No queda espacio en el dispositivo")
+    monkeypatch.setattr(os, "replace", sin_espacio)
+    with pytest.raises(OSError):
+        proyecto2.guardar_partida(original, ruta)
+    assert os.listdir(tmp_path) == ["partida.p2s"]
+    with open(ruta, "rb") as f:
+        assert f.read() == antes
+
+def avisos_de(aplicacion, monkeypatch):
+    #F: Títulos de las advertencias modales y textos de los avisos del bus que recibe la aplicación
+    advertencias, avisos = [], []
+    monkeypatch.setattr(proyecto2.messagebox, "showwarning", lambda titulo, texto: advertencias.append(titulo))
+    aplicacion.bus.suscribir(lambda evento: avisos.append(evento.texto), (proyecto2.EVENTO_AVISO,))
+    return advertencias, avisos
+
+def test_continuar_partida_ilegible_avisa_y_sigue_la_actual(aplicacion, monkeypatch):
+    #F: Una partida guardada corrupta no rompe la interfaz ni corta la grabación de la partida en curso
+    monkeypatch.setattr(proyecto2, "GRABAR_PARTIDAS", True)
+    advertencias, _ = avisos_de(aplicacion, monkeypatch)
+    aplicacion.iniciar_modo("Escapa")
+    actual = aplicacion.estado
+    with open(proyecto2.ARCHIVO_PARTIDA, "wb") as f:
+        f.write(b"P2SV basura")
+    aplicacion.continuar()
+    assert advertencias == ["Continuar"]
+    assert aplicacion.estado is actual and actual.grabador is not None
+
+def test_guardar_sin_poder_escribir_avisa(aplicacion, monkeypatch):
+    #F: Un error de disco se informa y "Partida guardada" solo aparece cuando de verdad se guardó
+    advertencias, avisos = avisos_de(aplicacion, monkeypatch)
+    aplicacion.iniciar_modo("Escapa")
+    os.mkdir(proyecto2.ARCHIVO_PARTIDA)
+    aplicacion.guardar()
+    aplicacion.procesar_eventos()
+    assert advertencias == ["Guardar"] and "Partida guardada" not in avisos
+    os.rmdir(proyecto2.ARCHIVO_PARTIDA)
+    aplicacion.guardar()
+    aplicacion.procesar_eventos()
+    assert "Partida guardada" in avisos and os.path.isfile(proyecto2.ARCHIVO_PARTIDA)
+
+def test_magia_incorrecta(guardada):
+    _, ruta = guardada
+    with open(ruta, "r+b") as f:
+        f.write(b"NOPE")
+    with pytest.raises(ValueError, match="no es una partida guardada"):
+        proyecto2.cargar_partida(ruta)
+
+def test_version_no_soportada(guardada):
+    _, ruta = guardada
+    with open(ruta, "r+b") as f:
+        f.seek(len(proyecto2.MAGIA_PARTIDA))
+        f.write(struct.pack("<H", proyecto2.VERSION_PARTIDA + 1))
+    with pytest.raises(ValueError, match="Versión"):
+        proyecto2.cargar_partida(ruta)
+
+def test_archivo_truncado(guardada, tmp_path):
+    #F: Cortes en cada sección (cabecera, nombre, generador, casillas, componentes, registros) y un byte de más
+    _, ruta = guardada
+    with open(ruta, "rb") as f:
+        datos = f.read()
+    cabecera = struct.calcsize(proyecto2.FORMATO_CABECERA_PARTIDA)
+    cortes = [0, 3, 6, cabecera - 1, cabecera + 3, cabecera + 100, len(datos) // 2, len(datos) - 1]
+    cortado = str(tmp_path / "cortado.p2s")
+    for corte in cortes:
+        with open(cortado, "wb") as f:
+            f.write(datos[:corte])
+        with pytest.raises(ValueError):
+            proyecto2.cargar_partida(cortado)
+    with open(cortado, "wb") as f:
+        f.write(datos + b"\0")
+    with pytest.raises(ValueError, match="incompleto"):
+        proyecto2.cargar_partida(cortado)
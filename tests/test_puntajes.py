@@ -0,0 +1,73 @@
+import multiprocessing
+import os
+import sqlite3
+
+import proyecto2
+
+ESCRITORES = 4
+PARTIDAS_POR_ESCRITOR = 30
+
+def escribir_puntajes(archivo_json, archivo_registro, escritor):
+    almacen = proyecto2.AlmacenPuntajes(archivo_json, archivo_registro, k=5, compactar_cada=7)
+    for i in range(PARTIDAS_POR_ESCRITOR):
+        almacen.agregar(("Escapa", "Cazador")[i % 2], f"j{escritor}", i * ESCRITORES + escritor)
+
+def test_registro_con_escritores_concurrentes(tmp_path):
+    #F: Varios procesos anexan y compactan a la vez; no se pierde ni se duplica ningún puntaje del top y compactar vacía el registro
+    archivo_json = str(tmp_path / "top.json")
+    archivo_registro = str(tmp_path / "top.log")
+    procesos = [multiprocessing.Process(target=escribir_puntajes, args=(archivo_json, archivo_registro, n)) for n in range(ESCRITORES)]
+    for proceso in procesos:
+        proceso.start()
+    for proceso in procesos:
+        proceso.join(60)
+        assert proceso.exitcode == 0
+    almacen = proyecto2.AlmacenPuntajes(archivo_json, archivo_registro, k=5)
+    for paridad, modo in enumerate(("Escapa", "Cazador")):
+        todos = sorted(((i * ESCRITORES + n, f"j{n}") for n in range(ESCRITORES) for i in range(paridad, PARTIDAS_POR_ESCRITOR, 2)), reverse=True)
+        esperado = [{"name": nombre, "score": puntaje} for puntaje, nombre in todos[:5]]
+        assert almacen.top(modo) == esperado
+    almacen.compactar()
+    assert os.path.getsize(archivo_registro) == 0
+    assert proyecto2.AlmacenPuntajes(archivo_json, archivo_registro, k=5).top("Escapa") == almacen.top("Escapa")
+
+def test_consultar_no_crea_el_bloqueo(tmp_path):
+    archivo_registro = str(tmp_path / "top.log")
+    almacen = proyecto2.AlmacenPuntajes(str(tmp_path / "top.json"), archivo_registro)
+    assert almacen.datos() == {} and almacen.top("Escapa") == []
+    assert not os.path.exists(archivo_registro + ".lock")
+    almacen.agregar("Escapa", "ana", 3)
+    assert os.path.exists(archivo_registro + ".lock")
+    assert almacen.top("Escapa") == [{"name": "ana", "score": 3}]
+
+def test_sqlite_resultado_visible_para_otra_conexion(tmp_path):
+    #F: Al terminar una partida el resultado ya está en la base, sin esperar a completar un lote ni a cerrar el proceso
+    ruta = str(tmp_path / "puntajes.sqlite3")
+    almacen = proyecto2.AlmacenPuntajesSQLite(ruta)
+    almacen.agregar("Escapa", "ana", 120)
+    otra = sqlite3.connect(ruta)
+    try:
+        assert otra.execute("SELECT modo, jugador, puntaje FROM partidas").fetchall() == [("Escapa", "ana", 120)]
+    finally:
+        otra.close()
+
+def test_sqlite_lote_se_vacia_por_tiempo(tmp_path):
+    #F: Con lote > 1 lo pendiente se inserta cuando el más viejo supera la espera máxima
+    ruta = str(tmp_path / "puntajes.sqlite3")
+    almacen = proyecto2.AlmacenPuntajesSQLite(ruta, lote=100, espera=0.0)
+    almacen.agregar("Cazador", "beto", 40)
+    otra = sqlite3.connect(ruta)
+    try:
+        assert otra.execute("SELECT COUNT(*) FROM partidas").fetchone()[0] == 1
+    finally:
+        otra.close()
+
+def test_sqlite_lote_acumula_dentro_de_la_espera(tmp_path):
+    ruta = str(tmp_path / "puntajes.sqlite3")
+    almacen = proyecto2.AlmacenPuntajesSQLite(ruta, lote=3, espera=3600.0)
+    almacen.agregar("Escapa", "ana", 1)
+    almacen.agregar("Escapa", "ana", 2)
+    assert len(almacen.pendientes) == 2
+    almacen.agregar("Escapa", "ana", 3)
+    assert almacen.pendientes == []
+    assert [e["score"] for e in almacen.top("Escapa")] == [3, 2, 1]
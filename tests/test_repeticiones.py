@@ -0,0 +1,22 @@
+import os
+
+import proyecto2
+
+def test_grabar_conserva_las_mas_recientes(tmp_path, monkeypatch):
+    #F: Cada grabación nueva borra las más viejas hasta dejar MAX_REPETICIONES; la última se puede reproducir
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(proyecto2, "MAX_REPETICIONES", 3)
+    directorio = tmp_path / proyecto2.DIRECTORIO_REPETICIONES
+    directorio.mkdir()
+    viejas = [f"2000010{i}-000000_Escapa_{i}.jsonl" for i in range(5)]
+    for nombre in viejas:
+        (directorio / nombre).write_text("", encoding="utf-8")
+    (directorio / "notas.txt").write_text("", encoding="utf-8")
+    estado = proyecto2.EstadoJuego("Escapa", nombre_jugador="prueba", semilla=9, filas=21, columnas=21)
+    grabador = proyecto2.grabar_partida(estado)
+    for _ in range(50):
+        estado.paso(("d",))
+    estado.grabador.cerrar(estado)
+    assert sorted(os.listdir(directorio)) == sorted(viejas[-2:] + ["notas.txt", os.path.basename(grabador.ruta)])
+    reproducido, cierre = proyecto2.reproducir_partida(grabador.ruta)
+    assert (reproducido.tick, reproducido.puntaje) == (cierre["fin"], cierre["puntaje"])
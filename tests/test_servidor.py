@@ -0,0 +1,100 @@
+import asyncio
+import base64
+import json
+import os
+import signal
+import sys
+
+import pytest
+
+import proyecto2
+
+RUTA_JUEGO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "proyecto2.py")
+
+@pytest.mark.skipif(sys.platform == "win32", reason="necesita enviar SIGINT al servidor")
+def test_protocolo_y_cierre_con_ctrl_c(tmp_path):
+    #F: Mapa completo una vez, deltas después, errores como mensajes; Ctrl+C cierra sin trazas y vuelca los puntajes
+    async def sesion():
+        entorno = dict(os.environ, PROYECTO2_PUNTAJES="sqlite")
+        proceso = await asyncio.create_subprocess_exec(sys.executable, RUTA_JUEGO, "--tamano", "21", "--servidor", "0",
+                                                       stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                                                       cwd=str(tmp_path), env=entorno)
+        try:
+            puerto = int((await asyncio.wait_for(proceso.stdout.readline(), 30)).rsplit(b":", 1)[1])
+            lector, escritor = await asyncio.open_connection("127.0.0.1", puerto, limit=2 ** 22)
+            recibir = lambda: asyncio.wait_for(lector.readline(), 30)
+            escritor.write(b"no es json\n")
+            assert json.loads(await recibir())["tipo"] == "error"
+            escritor.write(b'{"tipo": "nueva", "modo": "Cazador", "nombre": "prueba"}\n')
+            inicio = json.loads(await recibir())
+            assert inicio["tipo"] == "inicio" and (inicio["filas"], inicio["columnas"]) == (21, 21)
+            assert len(base64.b64decode(inicio["mapa"])) == 21 * 21
+            primero = json.loads(await recibir())
+            assert primero["tipo"] == "delta" and {"jugador", "puntaje", "energia", "enemigos"} <= set(primero)
+            escritor.write(b'{"tipo": "accion", "accion": "d"}\n{"tipo": "accion", "accion": "s"}\n')
+            siguiente = json.loads(await recibir())
+            assert siguiente["tipo"] == "delta" and "mapa" not in siguiente
+            escritor.close()
+        finally:
+            proceso.send_signal(signal.SIGINT)
+            _, errores = await asyncio.wait_for(proceso.communicate(), 30)
+        return proceso.returncode, errores
+
+    codigo, errores = asyncio.run(sesion())
+    assert codigo == 0
+    assert errores == b""
+    assert (tmp_path / proyecto2.ARCHIVO_BD_PUNTAJES).exists()
+
+class Transporte:
+    def __init__(self):
+        self.buffer = 0
+
+    def is_closing(self):
+        return False
+
+    def get_write_buffer_size(self):
+        return self.buffer
+
+class Escritor:
+    #F: Lo mínimo de StreamWriter que usa SesionRemota; guarda los mensajes ya decodificados
+    def __init__(self):
+        self.transport = Transporte()
+        self.mensajes = []
+
+    def write(self, datos):
+        self.mensajes.append(json.loads(datos))
+
+def test_cambio_de_casilla_llega_como_delta(pared_interior):
+    escritor = Escritor()
+    sesion = proyecto2.SesionRemota(escritor)
+    sesion.empezar(proyecto2.EstadoJuego("Cazador", semilla=3, filas=21, columnas=21))
+    fila, columna = pared_interior(sesion.estado)
+    sesion.estado.cambiar_celda(fila, columna, proyecto2.CAMINO)
+    sesion.tick(proyecto2.PerfilTick())
+    assert escritor.mensajes[-1]["celdas"] == [[fila, columna, proyecto2.CAMINO]]
+    assert "eventos" not in escritor.mensajes[-1]
+
+def test_tras_atraso_reenvia_mapa_y_entidades(pared_interior):
+    #F: Con el buffer lleno se pierden el inicio y un cambio de casilla; al vaciarse llega el mapa actual y todo el estado
+    escritor = Escritor()
+    escritor.transport.buffer = 10 ** 9
+    sesion = proyecto2.SesionRemota(escritor)
+    sesion.empezar(proyecto2.EstadoJuego("Escapa", semilla=3, filas=21, columnas=21))
+    fila, columna = pared_interior(sesion.estado)
+    sesion.estado.cambiar_celda(fila, columna, proyecto2.CAMINO)
+    perfil = proyecto2.PerfilTick()
+    for _ in range(5):
+        sesion.tick(perfil)
+    assert escritor.mensajes == [] and sesion.atrasada
+    escritor.transport.buffer = 0
+    sesion.tick(perfil)
+    inicio, delta = escritor.mensajes[:2]
+    assert inicio["tipo"] == "inicio"
+    assert base64.b64decode(inicio["mapa"])[fila * 21 + columna] == proyecto2.CAMINO
+    assert {"jugador", "puntaje", "energia", "enemigos"} <= set(delta)
+    sesion.estado.terminar("Perdiste", 0)
+    escritor.transport.buffer = 10 ** 9
+    sesion.enviar_delta([])
+    escritor.transport.buffer = 0
+    sesion.tick(perfil)
+    assert escritor.mensajes[-1]["fin"] == "Perdiste"